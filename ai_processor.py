@@ -1,7 +1,27 @@
+import re
 import openai
-from typing import List, Dict
+from typing import Dict, Iterator, List, Optional, Tuple
 from config import Config
+from context_builder import ContextBuilder, truncate_to_tokens
 from conversation_manager import ConversationManager
+from listing import Listing
+from llm_cache import get_llm_cache
+from query_parser import parse_query
+from session_backend import SessionConflict
+
+SEARCH_RESPONSE_FALLBACK = "I'll help you find the perfect car! Let me search for some options."
+CONVERSATION_RESPONSE_FALLBACK = "I'm here to help you find your ideal car! What kind of vehicle are you looking for?"
+FOLLOW_UP_FALLBACK = "I found some great options for you! Would you like to refine your search or see more details about any specific car?"
+ANALYSIS_FALLBACK = "Found listings but unable to provide detailed analysis."
+NO_LISTINGS_ANALYSIS = "No car listings found for your search criteria."
+
+FOLLOW_UP_MARKER = "FOLLOW-UP:"
+FOLLOW_UP_MARKER_RE = re.compile(r'^[\s*#]*follow[- ]?up[\s*]*:[\s*]*', re.I | re.M)
+FOLLOW_UP_INSTRUCTIONS = f"""
+            Then, on a new line starting with "{FOLLOW_UP_MARKER}", write a brief, encouraging
+            follow-up message to the user asking if they'd like to refine their search or
+            see more details about any specific car.
+            """
 
 class AIProcessor:
     def __init__(self):
@@ -11,6 +31,69 @@ class AIProcessor:
         openai.api_key = Config.OPENAI_API_KEY
         self.client = openai.OpenAI(api_key=Config.OPENAI_API_KEY)
         self.conversation_manager = ConversationManager()
+        self.llm_cache = get_llm_cache()
+        self.context_builder = ContextBuilder(
+            summarize=self.summarize_conversation if Config.CONTEXT_SUMMARY_ENABLED else None
+        )
+    
+    def _complete(self, request: Dict, similar_to: str = None) -> str:
+        """Completion text for the request, served from the LLM cache when possible.
+        
+        similar_to names the user text inside the prompt, enabling similarity lookups.
+        API errors propagate so callers keep their own fallbacks (which are not cached).
+        """
+        if self.llm_cache:
+            cached = self.llm_cache.get(request, similar_to)
+            if cached is not None:
+                return cached
+        
+        response = self.client.chat.completions.create(**request)
+        text = response.choices[0].message.content.strip()
+        
+        if self.llm_cache and text:
+            self.llm_cache.set(request, text, similar_to)
+        return text
+    
+    def _stream_cached(self, request: Dict, fallback: str, similar_to: str = None) -> Iterator[str]:
+        """Streaming variant of _complete; a cached completion arrives as a single chunk"""
+        if self.llm_cache:
+            cached = self.llm_cache.get(request, similar_to)
+            if cached is not None:
+                return iter([cached])
+        
+        def store(text: str) -> None:
+            if self.llm_cache and text:
+                self.llm_cache.set(request, text, similar_to)
+        
+        return self._stream_completion(request, fallback, on_complete=store)
+    
+    def _stream_completion(self, request: Dict, fallback: str, on_complete=None) -> Iterator[str]:
+        """Yield completion text as it arrives from the API.
+        
+        Leading whitespace is dropped to match the .strip() of the blocking calls.
+        If the call fails before any text was sent, the fallback is yielded instead.
+        on_complete(text) is called with the full text once the stream finishes cleanly.
+        """
+        sent = False
+        parts = []
+        try:
+            stream = self.client.chat.completions.create(stream=True, **request)
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta and not sent:
+                    delta = delta.lstrip()
+                if delta:
+                    sent = True
+                    parts.append(delta)
+                    yield delta
+            if on_complete is not None:
+                on_complete(''.join(parts).strip())
+        except Exception as e:
+            print(f"Error streaming completion: {e}")
+            if not sent:
+                yield fallback
     
     def process_query(self, user_query: str) -> str:
         """Process user query to extract car search parameters"""
@@ -36,7 +119,7 @@ class AIProcessor:
             Mileage: [mileage preferences or "any"]
             """
             
-            response = self.client.chat.completions.create(
+            return self._complete(dict(
                 model="gpt-3.5-turbo",
                 messages=[
                     {"role": "system", "content": "You are a car search assistant that extracts structured information from user queries."},
@@ -44,18 +127,14 @@ class AIProcessor:
                 ],
                 max_tokens=300,
                 temperature=0.1
-            )
-            
-            return response.choices[0].message.content.strip()
+            ), similar_to=user_query)
             
         except Exception as e:
             print(f"Error processing query with AI: {e}")
             return f"Make: any\nModel: any\nYear: any\nPrice: any\nFeatures: none\nMileage: any"
     
-    def enhance_search_query(self, user_query: str) -> str:
-        """Enhance the user query for better web scraping"""
-        try:
-            prompt = f"""
+    def _enhance_request(self, user_query: str) -> Dict:
+        prompt = f"""
             Convert this car search request into a clear, search-optimized query for car listing websites:
             Original query: "{user_query}"
             
@@ -66,35 +145,52 @@ class AIProcessor:
             
             Keep it under 10 words and use common car terminology.
             """
-            
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are a car search optimization assistant."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=100,
-                temperature=0.3
-            )
-            
-            return response.choices[0].message.content.strip()
+        
+        return dict(
+            model="gpt-3.5-turbo",
+            messages=[
+                {"role": "system", "content": "You are a car search optimization assistant."},
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=100,
+            temperature=0.3
+        )
+    
+    def _parse_locally(self, user_query: str):
+        """Deterministic parse of the query, or None when the LLM should rewrite it"""
+        parsed = parse_query(user_query)
+        if parsed.confidence >= Config.QUERY_PARSER_MIN_CONFIDENCE:
+            print(f"⚡ Parsed query locally: {parsed.search_query()!r} (confidence {parsed.confidence:.2f})")
+            return parsed
+        return None
+    
+    def enhance_search_query(self, user_query: str) -> str:
+        """Enhance the user query for better web scraping"""
+        parsed = self._parse_locally(user_query)
+        if parsed:
+            return parsed.search_query()
+        
+        try:
+            return self._complete(self._enhance_request(user_query), similar_to=user_query)
             
         except Exception as e:
             print(f"Error enhancing search query: {e}")
             return user_query
     
-    def analyze_listings(self, listings: List[Dict], user_query: str) -> str:
-        """Analyze car listings and provide insights"""
-        if not listings:
-            return "No car listings found for your search criteria."
+    def stream_enhance_search_query(self, user_query: str) -> Iterator[str]:
+        """Streaming variant of enhance_search_query"""
+        parsed = self._parse_locally(user_query)
+        if parsed:
+            return iter([parsed.search_query()])
+        return self._stream_cached(self._enhance_request(user_query), user_query, similar_to=user_query)
+    
+    def _analysis_request(self, listings: List[Listing], user_query: str) -> Dict:
+        # Prepare listings data for analysis
+        listings_text = ""
+        for i, listing in enumerate(listings[:5], 1):  # Analyze top 5
+            listings_text += f"{i}. {listing.title} - {listing.price} - {listing.mileage}\n"
         
-        try:
-            # Prepare listings data for analysis
-            listings_text = ""
-            for i, listing in enumerate(listings[:5], 1):  # Analyze top 5
-                listings_text += f"{i}. {listing['title']} - {listing['price']} - {listing['mileage']}\n"
-            
-            prompt = f"""
+        prompt = f"""
             Analyze these car listings and provide insights based on the user's original query:
             
             User Query: "{user_query}"
@@ -111,59 +207,99 @@ class AIProcessor:
             
             Keep response concise but informative.
             """
+        
+        return dict(
+            model="gpt-3.5-turbo",
+            messages=[
+                {"role": "system", "content": "You are a car buying expert that analyzes listings and provides helpful insights."},
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=400,
+            temperature=0.2
+        )
+    
+    def analyze_listings(self, listings: List[Listing], user_query: str) -> str:
+        """Analyze car listings and provide insights"""
+        if not listings:
+            return NO_LISTINGS_ANALYSIS
+        
+        try:
+            return self._complete(self._analysis_request(listings, user_query))
             
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are a car buying expert that analyzes listings and provides helpful insights."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=400,
-                temperature=0.2
-            )
+        except Exception as e:
+            print(f"Error analyzing listings: {e}")
+            return ANALYSIS_FALLBACK
+    
+    def analyze_listings_with_follow_up(self, listings: List[Listing], user_query: str) -> Tuple[str, str]:
+        """Analysis and chat follow-up from one completion instead of two; returns (analysis, follow_up)"""
+        if not listings:
+            return NO_LISTINGS_ANALYSIS, self.generate_follow_up(listings, NO_LISTINGS_ANALYSIS)
+        
+        try:
+            request = self._analysis_request(listings, user_query)
+            request["messages"][1]["content"] += FOLLOW_UP_INSTRUCTIONS
+            request["max_tokens"] += 100
             
-            return response.choices[0].message.content.strip()
+            content = self._complete(request)
             
         except Exception as e:
             print(f"Error analyzing listings: {e}")
-            return "Found listings but unable to provide detailed analysis."
+            return ANALYSIS_FALLBACK, FOLLOW_UP_FALLBACK
+        
+        parts = FOLLOW_UP_MARKER_RE.split(content, maxsplit=1)
+        if len(parts) == 2 and parts[0].strip() and parts[1].strip():
+            return parts[0].strip(), parts[1].strip()
+        
+        # The model ignored the format; ask for the follow-up separately
+        return content, self.generate_follow_up(listings, content)
+    
+    def stream_analyze_listings(self, listings: List[Listing], user_query: str) -> Iterator[str]:
+        """Streaming variant of analyze_listings"""
+        if not listings:
+            return iter([NO_LISTINGS_ANALYSIS])
+        return self._stream_cached(self._analysis_request(listings, user_query), ANALYSIS_FALLBACK)
+    
+    def classify_conversational_message(self, user_message: str, user_id: str) -> Tuple[Dict, List[Dict]]:
+        """Record the user message and decide whether it is a search; returns (result, history)"""
+        # Add user message to conversation
+        self.conversation_manager.add_message(user_id, "user", user_message)
+        
+        # Get conversation history for context
+        conversation_history = self.conversation_manager.get_conversation_history(user_id)
+        
+        # Check if user wants to search for cars, or to refine the last search
+        intent = self.conversation_manager.classify_intent(user_id, user_message)
+        print(f"🧭 Message intent: {intent.label} ({intent.confidence:.2f})")
+        
+        if intent.wants_search:
+            # Extract criteria and generate search query
+            criteria = self.conversation_manager.extract_car_criteria(user_message)
+            if intent.is_refinement:
+                criteria = self.conversation_manager.refine_criteria(user_id, criteria)
+            search_query = self.conversation_manager.generate_search_query(criteria)
+            
+            return {
+                "type": "search_request",
+                "search_query": search_query,
+                "criteria": criteria
+            }, conversation_history
+        
+        return {
+            "type": "conversation",
+            "search_query": None,
+            "criteria": None
+        }, conversation_history
     
     def process_conversational_message(self, user_message: str, user_id: str = "default") -> Dict:
         """Process a conversational message and determine the response"""
         try:
-            # Add user message to conversation
-            self.conversation_manager.add_message(user_id, "user", user_message)
-            
-            # Get conversation history for context
-            conversation_history = self.conversation_manager.get_conversation_history(user_id)
-            
-            # Check if user wants to search for cars
-            should_search = self.conversation_manager.should_search_for_cars(user_message, conversation_history)
+            result, conversation_history = self.classify_conversational_message(user_message, user_id)
             
-            if should_search:
-                # Extract criteria and generate search query
-                criteria = self.conversation_manager.extract_car_criteria(user_message)
-                search_query = self.conversation_manager.generate_search_query(criteria)
-                
-                # Generate conversational response
-                response = self._generate_conversational_response(user_message, conversation_history, should_search=True)
-                
-                return {
-                    "type": "search_request",
-                    "response": response,
-                    "search_query": search_query,
-                    "criteria": criteria
-                }
-            else:
-                # Generate conversational response without search
-                response = self._generate_conversational_response(user_message, conversation_history, should_search=False)
-                
-                return {
-                    "type": "conversation",
-                    "response": response,
-                    "search_query": None,
-                    "criteria": None
-                }
+            # Generate conversational response
+            result["response"] = self.generate_conversational_response(
+                user_message, conversation_history, should_search=result["type"] == "search_request"
+            )
+            return result
                 
         except Exception as e:
             print(f"Error in conversational processing: {e}")
@@ -174,62 +310,131 @@ class AIProcessor:
                 "criteria": None
             }
     
-    def _generate_conversational_response(self, user_message: str, conversation_history: List[Dict], should_search: bool = False) -> str:
-        """Generate a conversational response using OpenAI"""
+    def stream_conversational_message(self, user_message: str, user_id: str = "default") -> Tuple[Dict, Iterator[str]]:
+        """Streaming variant of process_conversational_message.
+        
+        Returns the result without its "response" plus an iterator over the response text.
+        """
         try:
-            # Prepare conversation context
-            messages = conversation_history[-10:]  # Last 10 messages for context
-            
-            if should_search:
-                system_message = """You are a helpful car buying assistant. The user has indicated they want to search for cars. 
+            result, conversation_history = self.classify_conversational_message(user_message, user_id)
+        except SessionConflict:
+            raise
+        except Exception as e:
+            print(f"Error in conversational processing: {e}")
+            return {
+                "type": "error",
+                "search_query": None,
+                "criteria": None
+            }, iter(["I'm sorry, I encountered an error. Could you please try again?"])
+        
+        should_search = result["type"] == "search_request"
+        return result, self.stream_conversational_response(user_message, conversation_history, should_search)
+    
+    def _conversational_request(self, conversation_history: List[Dict], should_search: bool) -> Dict:
+        if should_search:
+            system_message = """You are a helpful car buying assistant. The user has indicated they want to search for cars. 
                 Be encouraging and let them know you're searching for their ideal car. Keep your response brief and friendly."""
-            else:
-                system_message = """You are a helpful car buying assistant. The user is having a conversation with you. 
+        else:
+            system_message = """You are a helpful car buying assistant. The user is having a conversation with you. 
                 Be friendly, helpful, and guide them toward telling you what kind of car they're looking for. 
                 Ask clarifying questions if needed."""
-            
-            # Add system message if not already present
-            if not messages or messages[0]["role"] != "system":
-                messages.insert(0, {"role": "system", "content": system_message})
-            
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=messages,
-                max_tokens=150,
-                temperature=0.7
-            )
-            
+        
+        # Recent turns within the token budget, older ones folded into a summary
+        messages = self.context_builder.build(conversation_history, system_message)
+        
+        return dict(
+            model="gpt-3.5-turbo",
+            messages=messages,
+            max_tokens=150,
+            temperature=0.7
+        )
+    
+    def generate_conversational_response(self, user_message: str, conversation_history: List[Dict], should_search: bool = False) -> str:
+        """Generate a conversational response using OpenAI"""
+        try:
+            response = self.client.chat.completions.create(**self._conversational_request(conversation_history, should_search))
             return response.choices[0].message.content.strip()
             
         except Exception as e:
             print(f"Error generating conversational response: {e}")
             if should_search:
-                return "I'll help you find the perfect car! Let me search for some options."
+                return SEARCH_RESPONSE_FALLBACK
             else:
-                return "I'm here to help you find your ideal car! What kind of vehicle are you looking for?"
+                return CONVERSATION_RESPONSE_FALLBACK
+    
+    def stream_conversational_response(self, user_message: str, conversation_history: List[Dict],
+                                       should_search: bool = False) -> Iterator[str]:
+        """Streaming variant of generate_conversational_response"""
+        fallback = SEARCH_RESPONSE_FALLBACK if should_search else CONVERSATION_RESPONSE_FALLBACK
+        return self._stream_completion(self._conversational_request(conversation_history, should_search), fallback)
+    
+    def summarize_conversation(self, previous_summary: Optional[str], turns: List[Dict]) -> str:
+        """Running summary of older chat turns for the context builder"""
+        # Long pasted messages are cut so the summary prompt stays bounded too
+        transcript = "\n".join(f"{turn['role']}: {truncate_to_tokens(turn['content'], Config.CONTEXT_TOKEN_BUDGET // 4)}"
+                               for turn in turns)
+        prompt = f"""
+            Update the summary of a car buying conversation with the new messages below.
+            Keep every car preference the user stated (makes, models, budget, years, mileage,
+            features) and any cars already discussed. Use at most {Config.CONTEXT_SUMMARY_MAX_TOKENS} tokens.
+            
+            Current summary: {previous_summary or "(none)"}
+            
+            New messages:
+            {transcript}
+            """
+        
+        return self._complete(dict(
+            model="gpt-3.5-turbo",
+            messages=[
+                {"role": "system", "content": "You summarize conversations between a car buyer and an assistant."},
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=Config.CONTEXT_SUMMARY_MAX_TOKENS,
+            temperature=0.2
+        ))
+    
+    def _follow_up_request(self, listings: List[Listing], analysis: str) -> Dict:
+        follow_up_prompt = f"""Based on the car search results I just provided, generate a helpful follow-up response. 
+            The search found {len(listings)} cars. Be encouraging and ask if they'd like to refine their search or see more details about any specific car."""
+        
+        return dict(
+            model="gpt-3.5-turbo",
+            messages=[
+                {"role": "system", "content": follow_up_prompt},
+                {"role": "user", "content": f"I found {len(listings)} cars for you. Here's what I found: {analysis[:200]}..."}
+            ],
+            max_tokens=100,
+            temperature=0.7
+        )
+    
+    def generate_follow_up(self, listings: List[Listing], analysis: str) -> str:
+        """Follow-up message for search results, without touching the conversation"""
+        try:
+            response = self.client.chat.completions.create(**self._follow_up_request(listings, analysis))
+            return response.choices[0].message.content.strip()
+            
+        except Exception as e:
+            print(f"Error generating follow-up: {e}")
+            return FOLLOW_UP_FALLBACK
+    
+    def record_search_follow_up(self, user_id: str, search_query: str, listings: List[Listing], follow_up: str) -> None:
+        """Save search results and the follow-up to the conversation"""
+        try:
+            self.conversation_manager.save_search_results(user_id, search_query, listings)
+            self.conversation_manager.add_message(user_id, "assistant", follow_up)
+        except SessionConflict as e:
+            # The results are still returned; only this turn's history is lost
+            print(f"⚠️ Search results not saved to the conversation: {e}")
     
-    def update_conversation_with_search_results(self, user_id: str, search_query: str, listings: List[Dict], analysis: str) -> str:
+    def update_conversation_with_search_results(self, user_id: str, search_query: str, listings: List[Listing], analysis: str) -> str:
         """Update conversation with search results and generate follow-up response"""
         try:
             # Save search results
             self.conversation_manager.save_search_results(user_id, search_query, listings)
             
             # Generate follow-up response
-            conversation_history = self.conversation_manager.get_conversation_history(user_id)
-            
-            follow_up_prompt = f"""Based on the car search results I just provided, generate a helpful follow-up response. 
-            The search found {len(listings)} cars. Be encouraging and ask if they'd like to refine their search or see more details about any specific car."""
-            
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": follow_up_prompt},
-                    {"role": "user", "content": f"I found {len(listings)} cars for you. Here's what I found: {analysis[:200]}..."}
-                ],
-                max_tokens=100,
-                temperature=0.7
-            )
-            
+            response = self.client.chat.completions.create(**self._follow_up_request(listings, analysis))
             follow_up_response = response.choices[0].message.content.strip()
             
             # Add assistant response to conversation
@@ -239,6 +444,15 @@ class AIProcessor:
             
         except Exception as e:
             print(f"Error updating conversation with search results: {e}")
-            return "I found some great options for you! Would you like to refine your search or see more details about any specific car?"
-
-
+            return FOLLOW_UP_FALLBACK
+    
+    def stream_conversation_with_search_results(self, user_id: str, search_query: str, listings: List[Listing],
+                                                analysis: str) -> Iterator[str]:
+        """Streaming variant of update_conversation_with_search_results"""
+        parts = []
+        for delta in self._stream_completion(self._follow_up_request(listings, analysis), FOLLOW_UP_FALLBACK):
+            parts.append(delta)
+            yield delta
+        
+        # Save the results with the complete assistant response
+        self.record_search_follow_up(user_id, search_query, listings, ''.join(parts).strip())
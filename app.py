@@ -3,25 +3,39 @@
 Flask Web Application for Car Listing Agent
 """
 
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, render_template, request, jsonify, stream_with_context
 from flask_cors import CORS
 import json
 from car_scraper import CarScraper
+from crawler import start_background_crawler
+from fetch_engine import get_fetch_engine
 from ai_processor import AIProcessor
+from chat_orchestrator import ChatOrchestrator, SEARCH_ERROR_MESSAGE
 from config import Config
+from session_backend import SessionConflict
+
+# Shown when a conversation keeps changing under concurrent requests for the same user
+SESSION_BUSY_MESSAGE = "This conversation is being updated by another request. Please try again in a moment."
 
 app = Flask(__name__)
 CORS(app)
 
 # Initialize the agent components
 try:
-    scraper = CarScraper()
+    # All request threads share one scraper and its pooled connections
+    scraper = CarScraper(fetch_engine=get_fetch_engine())
+    # Pre-scrape popular searches so requests usually read from the inventory
+    crawler = start_background_crawler(scraper)
     ai_processor = AIProcessor()
+    # Overlaps the independent LLM calls and the scrape of each chat turn
+    orchestrator = ChatOrchestrator(ai_processor, scraper)
     print("🚗 Car Listing Agent Web App initialized successfully!")
 except Exception as e:
     print(f"❌ Error initializing web app: {e}")
     scraper = None
+    crawler = None
     ai_processor = None
+    orchestrator = None
 
 @app.route('/')
 def index():
@@ -57,7 +71,7 @@ def search_cars():
             'success': True,
             'query': query,
             'enhanced_query': enhanced_query,
-            'listings': listings,
+            'listings': [listing.to_dict() for listing in listings],
             'analysis': analysis,
             'total_found': len(listings)
         }
@@ -70,6 +84,64 @@ def search_cars():
             'error': f'An error occurred: {str(e)}'
         }), 500
 
+def ndjson(event: dict) -> str:
+    """One newline-delimited JSON event for the streaming endpoints"""
+    return json.dumps(event) + '\n'
+
+def listings_event(source, listings) -> str:
+    """Listings from one source as it finishes, or the final result set when source is None"""
+    if source is None:
+        return ndjson({
+            'type': 'results',
+            'listings': [listing.to_dict() for listing in listings],
+            'total_found': len(listings)
+        })
+    return ndjson({
+        'type': 'listings',
+        'source': source,
+        'listings': [listing.to_dict() for listing in listings]
+    })
+
+def streaming_response(events):
+    """Send events to the browser as they are produced, without proxy buffering"""
+    return Response(stream_with_context(events), mimetype='application/x-ndjson',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/search/stream', methods=['POST'])
+def search_cars_stream():
+    """Streaming car search: listings per site as they are parsed, then the analysis"""
+    data = request.get_json()
+    query = data.get('query', '').strip()
+    
+    if not query:
+        return jsonify({'error': 'Query is required'}), 400
+    
+    if not scraper or not ai_processor:
+        return jsonify({'error': 'Agent not properly initialized'}), 500
+    
+    def events():
+        try:
+            yield ndjson({'type': 'query', 'query': query})
+            
+            parts = []
+            for delta in ai_processor.stream_enhance_search_query(query):
+                parts.append(delta)
+                yield ndjson({'type': 'enhanced_query', 'delta': delta})
+            enhanced_query = ''.join(parts).strip()
+            
+            # The last batch (source None) is the final merged result set
+            for source, listings in scraper.iter_search_all_sites(enhanced_query):
+                yield listings_event(source, listings)
+            
+            for delta in ai_processor.stream_analyze_listings(listings, query):
+                yield ndjson({'type': 'analysis', 'delta': delta})
+            yield ndjson({'type': 'done'})
+            
+        except Exception as e:
+            yield ndjson({'type': 'error', 'error': f'An error occurred: {str(e)}'})
+    
+    return streaming_response(events())
+
 @app.route('/chat', methods=['POST'])
 def chat():
     """API endpoint for conversational chat"""
@@ -81,11 +153,11 @@ def chat():
         if not message:
             return jsonify({'error': 'Message is required'}), 400
         
-        if not ai_processor:
+        if not ai_processor or not orchestrator:
             return jsonify({'error': 'Agent not properly initialized'}), 500
         
-        # Process conversational message
-        result = ai_processor.process_conversational_message(message, user_id)
+        # Reply, query enhancement and scraping run concurrently where they don't depend on each other
+        result = orchestrator.run(message, user_id)
         
         response = {
             'success': True,
@@ -95,37 +167,96 @@ def chat():
             'criteria': result.get('criteria')
         }
         
-        # If it's a search request, perform the search
-        if result['type'] == 'search_request' and result['search_query']:
-            try:
-                enhanced_query = ai_processor.enhance_search_query(result['search_query'])
-                listings = scraper.search_all_sites(enhanced_query)
-                analysis = ai_processor.analyze_listings(listings, result['search_query'])
-                
-                # Generate follow-up response
-                follow_up = ai_processor.update_conversation_with_search_results(
-                    user_id, result['search_query'], listings, analysis
-                )
-                
-                response.update({
-                    'listings': listings,
-                    'analysis': analysis,
-                    'total_found': len(listings),
-                    'follow_up': follow_up
-                })
-                
-            except Exception as e:
-                print(f"Error performing search: {e}")
-                response['search_error'] = "I found your search criteria, but encountered an error while searching. Please try again."
+        if 'listings' in result:
+            response.update({
+                'listings': [listing.to_dict() for listing in result['listings']],
+                'analysis': result['analysis'],
+                'total_found': result['total_found'],
+                'follow_up': result['follow_up']
+            })
+        elif 'search_error' in result:
+            response['search_error'] = result['search_error']
         
         return jsonify(response)
         
+    except SessionConflict as e:
+        print(f"⚠️ {e}")
+        return jsonify({
+            'success': False,
+            'error': SESSION_BUSY_MESSAGE
+        }), 409
+        
     except Exception as e:
         return jsonify({
             'success': False,
             'error': f'An error occurred: {str(e)}'
         }), 500
 
+@app.route('/chat/stream', methods=['POST'])
+def chat_stream():
+    """Streaming chat: the reply first, then listings per site, the analysis and the follow-up"""
+    data = request.get_json()
+    message = data.get('message', '').strip()
+    user_id = data.get('user_id', 'default')
+    
+    if not message:
+        return jsonify({'error': 'Message is required'}), 400
+    
+    if not ai_processor:
+        return jsonify({'error': 'Agent not properly initialized'}), 500
+    
+    def events():
+        try:
+            result, reply = ai_processor.stream_conversational_message(message, user_id)
+            yield ndjson({
+                'type': 'message',
+                'message_type': result['type'],
+                'search_query': result.get('search_query'),
+                'criteria': result.get('criteria')
+            })
+            
+            # Start enhancing and scraping now so the search runs while the reply streams
+            search = None
+            if result['type'] == 'search_request' and result['search_query'] and scraper:
+                search = orchestrator.start_search(result['search_query'], result['criteria'])
+            
+            for delta in reply:
+                yield ndjson({'type': 'response', 'delta': delta})
+            
+            if search is not None:
+                try:
+                    # The last batch (source None) is the final merged result set
+                    for source, listings in search:
+                        yield listings_event(source, listings)
+                    
+                    parts = []
+                    for delta in ai_processor.stream_analyze_listings(listings, result['search_query']):
+                        parts.append(delta)
+                        yield ndjson({'type': 'analysis', 'delta': delta})
+                    analysis = ''.join(parts).strip()
+                    
+                    for delta in ai_processor.stream_conversation_with_search_results(
+                            user_id, result['search_query'], listings, analysis):
+                        yield ndjson({'type': 'follow_up', 'delta': delta})
+                    
+                except Exception as e:
+                    print(f"Error performing search: {e}")
+                    yield ndjson({
+                        'type': 'search_error',
+                        'error': SEARCH_ERROR_MESSAGE
+                    })
+            
+            yield ndjson({'type': 'done'})
+            
+        except SessionConflict as e:
+            print(f"⚠️ {e}")
+            yield ndjson({'type': 'error', 'error': SESSION_BUSY_MESSAGE})
+            
+        except Exception as e:
+            yield ndjson({'type': 'error', 'error': f'An error occurred: {str(e)}'})
+    
+    return streaming_response(events())
+
 @app.route('/start-conversation', methods=['POST'])
 def start_conversation():
     """API endpoint to start a new conversation"""
@@ -144,6 +275,13 @@ def start_conversation():
             'welcome_message': welcome_message
         })
         
+    except SessionConflict as e:
+        print(f"⚠️ {e}")
+        return jsonify({
+            'success': False,
+            'error': SESSION_BUSY_MESSAGE
+        }), 409
+        
     except Exception as e:
         return jsonify({
             'success': False,
@@ -156,7 +294,12 @@ def health():
     return jsonify({
         'status': 'healthy',
         'scraper_available': scraper is not None,
-        'ai_processor_available': ai_processor is not None
+        'ai_processor_available': ai_processor is not None,
+        'search_cache': scraper.search_cache.stats() if scraper else None,
+        'http_cache': scraper.http_cache.stats() if scraper and scraper.http_cache else None,
+        'llm_cache': ai_processor.llm_cache.stats() if ai_processor and ai_processor.llm_cache else None,
+        'conversations': ai_processor.conversation_manager.stats() if ai_processor else None,
+        'crawler_running': crawler is not None
     })
 
 if __name__ == '__main__':
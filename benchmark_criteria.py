@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for chat criteria extraction
+Measures the per-message cost of should_search_for_cars + extract_car_criteria
+"""
+
+import time
+from criteria_extractor import scan_message
+from conversation_manager import ConversationManager
+
+SAMPLE_MESSAGES = [
+    "Hi there!",
+    "I'm looking for a Honda Civic under $20,000",
+    "Show me 2018 or newer Toyota RAV4s with AWD and a sunroof",
+    "chevy silverado 4x4 under 60k miles, max $35k",
+    "What's the difference between a crossover and an SUV?",
+    "Any Mercedes C-Class between $25,000 and $32,000 with navigation and heated seats?",
+    "I need a cheap reliable sedan for my daughter, low mileage, automatic",
+    "Thanks, that's really helpful",
+    "Can you find me a used Ford F-150 2015-2019 with a backup camera?",
+    "My name is Kiara and I'm just browsing for now",
+]
+
+
+def benchmark(manager: ConversationManager, messages, cold: bool) -> float:
+    """Average microseconds per message; cold clears the per-message scan cache first"""
+    start = time.perf_counter()
+    for message in messages:
+        if cold:
+            scan_message.cache_clear()
+        if manager.should_search_for_cars(message, []):
+            manager.extract_car_criteria(message)
+    return (time.perf_counter() - start) / len(messages) * 1e6
+
+
+def main():
+    """Run the benchmark"""
+    print("⏱️  Criteria extraction benchmark")
+    print("=" * 40)
+
+    manager = ConversationManager()
+    rounds = 2000
+    messages = SAMPLE_MESSAGES * rounds
+
+    # Warm up imports and the automaton before timing
+    benchmark(manager, SAMPLE_MESSAGES, cold=True)
+
+    cold = benchmark(manager, messages, cold=True)
+    warm = benchmark(manager, messages, cold=False)
+
+    print(f"Messages per run: {len(messages)}")
+    print(f"Cold (new message each time): {cold:.1f} µs/message")
+    print(f"Warm (repeated message):      {warm:.1f} µs/message")
+
+    print("\nSample extractions:")
+    for message in SAMPLE_MESSAGES[:5]:
+        criteria = manager.extract_car_criteria(message)
+        found = {key: value for key, value in criteria.items() if value}
+        print(f"- {message!r}: {found}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,15 +6,17 @@ A simple agent that searches for car listings based on user queries using web sc
 
 import os
 import sys
-from typing import List, Dict
+from typing import List
 from car_scraper import CarScraper
+from listing import Listing
+from fetch_engine import get_fetch_engine
 from ai_processor import AIProcessor
 from config import Config
 
 class CarAgent:
     def __init__(self):
         try:
-            self.scraper = CarScraper()
+            self.scraper = CarScraper(fetch_engine=get_fetch_engine())
             self.ai_processor = AIProcessor()
             print("🚗 Car Listing Agent initialized successfully!")
         except Exception as e:
@@ -51,19 +53,19 @@ class CarAgent:
         except Exception as e:
             print(f"❌ Error processing query: {e}")
     
-    def display_listings(self, listings: List[Dict]) -> None:
+    def display_listings(self, listings: List[Listing]) -> None:
         """Display car listings in a formatted way"""
         print(f"\n📋 Found {len(listings)} car listings:")
         print("=" * 80)
         
         for i, listing in enumerate(listings, 1):
-            print(f"\n{i}. {listing['title']}")
-            print(f"   💰 Price: {listing['price']}")
-            print(f"   🛣️  Mileage: {listing['mileage']}")
-            print(f"   📍 Location: {listing['location']}")
-            print(f"   🌐 Source: {listing['source']}")
-            if listing.get('url') and listing['url'] != 'N/A':
-                print(f"   🔗 URL: {listing['url']}")
+            print(f"\n{i}. {listing.title}")
+            print(f"   💰 Price: {listing.price}")
+            print(f"   🛣️  Mileage: {listing.mileage}")
+            print(f"   📍 Location: {listing.location}")
+            print(f"   🌐 Source: {listing.source.value}")
+            if listing.url and listing.url != 'N/A':
+                print(f"   🔗 URL: {listing.url}")
             print("-" * 40)
     
     def run_interactive_mode(self) -> None:
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Chat Orchestrator for Car Listing Agent
+Runs the independent LLM calls and the scrape of a chat turn concurrently
+"""
+
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from ai_processor import CONVERSATION_RESPONSE_FALLBACK, SEARCH_RESPONSE_FALLBACK
+from config import Config
+from listing import Listing
+from session_backend import SessionConflict
+
+SEARCH_ERROR_MESSAGE = "I found your search criteria, but encountered an error while searching. Please try again."
+
+_SEARCH_DONE = object()
+
+
+class TaskGraph:
+    """Runs named tasks on an executor as soon as the tasks they depend on finish.
+
+    Dependencies are chained with done-callbacks, so a task waiting on others
+    never occupies a worker thread.
+    """
+
+    def __init__(self, executor):
+        self.executor = executor
+        self._futures = {}
+
+    def add(self, name: str, func: Callable, *args, after: Tuple[str, ...] = ()) -> Future:
+        """Schedule func(*args, *results_of_after); a failed dependency fails this task too"""
+        future = Future()
+        dependencies = [self._futures[dependency] for dependency in after]
+        remaining = [len(dependencies)]
+        lock = threading.Lock()
+
+        def copy_outcome(inner: Future) -> None:
+            if inner.exception() is not None:
+                future.set_exception(inner.exception())
+            else:
+                future.set_result(inner.result())
+
+        def launch() -> None:
+            failed = next((d.exception() for d in dependencies if d.exception() is not None), None)
+            if failed is not None:
+                future.set_exception(failed)
+                return
+            try:
+                inner = self.executor.submit(func, *args, *(d.result() for d in dependencies))
+            except Exception as e:
+                # e.g. the executor is shutting down; waiters must not block forever
+                future.set_exception(e)
+                return
+            inner.add_done_callback(copy_outcome)
+
+        def dependency_done(_) -> None:
+            with lock:
+                remaining[0] -= 1
+                ready = remaining[0] == 0
+            if ready:
+                launch()
+
+        self._futures[name] = future
+        if not dependencies:
+            launch()
+        for dependency in dependencies:
+            dependency.add_done_callback(dependency_done)
+        return future
+
+    def result(self, name: str, timeout: float = None):
+        return self._futures[name].result(timeout)
+
+
+class ChatOrchestrator:
+    def __init__(self, ai_processor, scraper, executor: ThreadPoolExecutor = None):
+        self.ai_processor = ai_processor
+        self.scraper = scraper
+        self.executor = executor or ThreadPoolExecutor(max_workers=Config.CHAT_PIPELINE_WORKERS,
+                                                       thread_name_prefix='chat-pipeline')
+
+    def _analyze(self, search_query: str, listings: List[Listing]) -> Tuple[str, str]:
+        """(analysis, follow_up) for the search results"""
+        if Config.CHAT_MERGED_ANALYSIS:
+            return self.ai_processor.analyze_listings_with_follow_up(listings, search_query)
+        analysis = self.ai_processor.analyze_listings(listings, search_query)
+        return analysis, self.ai_processor.generate_follow_up(listings, analysis)
+
+    def run(self, message: str, user_id: str = "default") -> Dict:
+        """Handle one chat turn; returns the same fields as the /chat response.
+
+        The reply and query enhancement start together, the scrape starts as soon
+        as the enhanced query is ready, and analysis waits only on the scrape.
+        Each result is awaited for at most CHAT_TURN_TIMEOUT seconds; a failed
+        reply falls back to a canned one without discarding the search.
+        """
+        try:
+            result, history = self.ai_processor.classify_conversational_message(message, user_id)
+        except SessionConflict:
+            raise
+        except Exception as e:
+            print(f"Error in conversational processing: {e}")
+            return {
+                "type": "error",
+                "response": "I'm sorry, I encountered an error. Could you please try again?",
+                "search_query": None,
+                "criteria": None
+            }
+
+        search_query = result["search_query"]
+        should_search = result["type"] == "search_request"
+
+        graph = TaskGraph(self.executor)
+        graph.add('response', self.ai_processor.generate_conversational_response, message, history, should_search)
+
+        if should_search and search_query:
+            graph.add('enhanced_query', self.ai_processor.enhance_search_query, search_query)
+            graph.add('listings', lambda enhanced_query: self.scraper.search_all_sites(
+                enhanced_query, criteria=result["criteria"]), after=('enhanced_query',))
+            graph.add('analysis', self._analyze, search_query, after=('listings',))
+
+        try:
+            result["response"] = graph.result('response', Config.CHAT_TURN_TIMEOUT)
+        except Exception as e:
+            print(f"Error generating conversational response: {e}")
+            result["response"] = SEARCH_RESPONSE_FALLBACK if should_search else CONVERSATION_RESPONSE_FALLBACK
+        if not (should_search and search_query):
+            return result
+
+        try:
+            listings = graph.result('listings', Config.CHAT_TURN_TIMEOUT)
+            analysis, follow_up = graph.result('analysis', Config.CHAT_TURN_TIMEOUT)
+            self.ai_processor.record_search_follow_up(user_id, search_query, listings, follow_up)
+            result.update({
+                "listings": listings,
+                "analysis": analysis,
+                "total_found": len(listings),
+                "follow_up": follow_up
+            })
+        except Exception as e:
+            print(f"Error performing search: {e}")
+            result["search_error"] = SEARCH_ERROR_MESSAGE
+
+        return result
+
+    def start_search(self, search_query: str,
+                     criteria: Dict = None) -> Iterator[Tuple[Optional[str], List[Listing]]]:
+        """Enhance the query and scrape in the background, starting now.
+
+        Iterating the returned iterator yields the iter_search_all_sites batches as
+        they arrive, so callers can stream the chat reply while the search runs.
+        A failed search re-raises its exception from the iterator.
+        """
+        batches = queue.Queue()
+
+        def search() -> None:
+            try:
+                enhanced_query = self.ai_processor.enhance_search_query(search_query)
+                for batch in self.scraper.iter_search_all_sites(enhanced_query, criteria=criteria):
+                    batches.put(batch)
+            except Exception as e:
+                batches.put(e)
+            finally:
+                batches.put(_SEARCH_DONE)
+
+        self.executor.submit(search)
+
+        def drain() -> Iterator[Tuple[Optional[str], List[Listing]]]:
+            while True:
+                batch = batches.get()
+                if batch is _SEARCH_DONE:
+                    return
+                if isinstance(batch, Exception):
+                    raise batch
+                yield batch
+
+        return drain()
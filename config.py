@@ -18,6 +18,135 @@ class Config:
     HEADERS = {
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
     }
-
-
-
+    
+    # Multi-site search fan-out
+    SEARCH_CONCURRENT = os.getenv('SEARCH_CONCURRENT', 'true').lower() == 'true'
+    SEARCH_SITE_TIMEOUT = float(os.getenv('SEARCH_SITE_TIMEOUT', '45'))
+    SEARCH_SITE_TIMEOUTS = {
+        'cars.com': float(os.getenv('CARS_COM_TIMEOUT', '60')),
+        'autotrader.com': float(os.getenv('AUTOTRADER_TIMEOUT', '45'))
+    }
+    # Return listings from the sites that finished even if others failed or timed out;
+    # when off, a failed or timed-out site fails the whole search instead of falling back to demo data
+    SEARCH_ALLOW_PARTIAL = os.getenv('SEARCH_ALLOW_PARTIAL', 'true').lower() == 'true'
+    SEARCH_MAX_WORKERS = int(os.getenv('SEARCH_MAX_WORKERS', '8'))
+    
+    # Pooled async HTTP fetching shared by all scraper instances
+    ASYNC_FETCH = os.getenv('ASYNC_FETCH', 'true').lower() == 'true'
+    FETCH_MAX_IN_FLIGHT = int(os.getenv('FETCH_MAX_IN_FLIGHT', '32'))
+    FETCH_MAX_PER_HOST = int(os.getenv('FETCH_MAX_PER_HOST', '8'))
+    FETCH_KEEPALIVE_TIMEOUT = float(os.getenv('FETCH_KEEPALIVE_TIMEOUT', '30'))
+    FETCH_TIMEOUT = float(os.getenv('FETCH_TIMEOUT', '30'))
+    
+    # Per-host request pacing (token bucket)
+    RATE_LIMIT_PER_SECOND = float(os.getenv('RATE_LIMIT_PER_SECOND', '0.5'))
+    RATE_LIMIT_BURST = float(os.getenv('RATE_LIMIT_BURST', '3'))
+    RATE_LIMIT_JITTER = float(os.getenv('RATE_LIMIT_JITTER', '0.3'))
+    RATE_LIMIT_BACKOFF = float(os.getenv('RATE_LIMIT_BACKOFF', '15'))
+    RATE_LIMIT_MIN_SCALE = float(os.getenv('RATE_LIMIT_MIN_SCALE', '0.1'))
+    # Set to a file path to share rate limit state across worker processes
+    RATE_LIMIT_DB = os.getenv('RATE_LIMIT_DB')
+    
+    # Search area used for every site
+    SEARCH_ZIP = os.getenv('SEARCH_ZIP', '75001')
+    SEARCH_RADIUS = int(os.getenv('SEARCH_RADIUS', '50'))
+    
+    # Per-site search result cache
+    RESULT_CACHE_ENABLED = os.getenv('RESULT_CACHE_ENABLED', 'true').lower() == 'true'
+    RESULT_CACHE_MAX_ENTRIES = int(os.getenv('RESULT_CACHE_MAX_ENTRIES', '256'))
+    RESULT_CACHE_TTL = float(os.getenv('RESULT_CACHE_TTL', '600'))
+    RESULT_CACHE_TTLS = {
+        'cars.com': float(os.getenv('CARS_COM_CACHE_TTL', '600')),
+        'autotrader.com': float(os.getenv('AUTOTRADER_CACHE_TTL', '900'))
+    }
+    # Serve expired results for this long while refreshing them in the background (0 disables)
+    RESULT_CACHE_STALE_TTL = float(os.getenv('RESULT_CACHE_STALE_TTL', '1800'))
+    
+    # Persistent HTTP page cache (set HTTP_CACHE_PATH empty to disable)
+    HTTP_CACHE_PATH = os.getenv('HTTP_CACHE_PATH', os.path.join('cache', 'http_cache.sqlite3'))
+    # Serve stored pages without revalidating for this many seconds
+    HTTP_CACHE_MAX_AGE = float(os.getenv('HTTP_CACHE_MAX_AGE', '300'))
+    HTTP_CACHE_RETENTION = float(os.getenv('HTTP_CACHE_RETENTION', str(7 * 24 * 3600)))
+    
+    # Raw result page capture for debugging selectors (disabled unless a directory is set)
+    DEBUG_CAPTURE_DIR = os.getenv('DEBUG_CAPTURE_DIR')
+    DEBUG_CAPTURE_SAMPLE_RATE = float(os.getenv('DEBUG_CAPTURE_SAMPLE_RATE', '0.1'))
+    
+    # Parse result pages incrementally and stop once enough listing cards are found
+    STREAMING_PARSE = os.getenv('STREAMING_PARSE', 'true').lower() == 'true'
+    # Structured data replaces DOM parsing only with at least this many listings, each with a URL
+    STRUCTURED_MIN_LISTINGS = int(os.getenv('STRUCTURED_MIN_LISTINGS', '3'))
+    
+    # URL pattern selection: patterns are tried best-first by past success rate
+    URL_STRATEGY_MIN_RESULTS = int(os.getenv('URL_STRATEGY_MIN_RESULTS', '1'))
+    # Number of top patterns fetched concurrently (1 = try one at a time)
+    URL_STRATEGY_RACE_WIDTH = int(os.getenv('URL_STRATEGY_RACE_WIDTH', '1'))
+    
+    # Local inventory of scraped listings (set INVENTORY_DB_PATH empty to disable)
+    INVENTORY_DB_PATH = os.getenv('INVENTORY_DB_PATH', os.path.join('cache', 'inventory.sqlite3'))
+    # A make/model slice scraped within this many seconds is answered locally
+    INVENTORY_FRESH_AGE = float(os.getenv('INVENTORY_FRESH_AGE', '900'))
+    INVENTORY_RETENTION = float(os.getenv('INVENTORY_RETENTION', str(3 * 24 * 3600)))
+    INVENTORY_QUERY_LIMIT = int(os.getenv('INVENTORY_QUERY_LIMIT', '50'))
+    
+    # Paginated deep crawl: page 1 first, then up to this many pages fetched concurrently
+    DEEP_CRAWL_MAX_PAGES = int(os.getenv('DEEP_CRAWL_MAX_PAGES', '5'))
+    DEEP_CRAWL_CONCURRENCY = int(os.getenv('DEEP_CRAWL_CONCURRENCY', '3'))
+    # Stop a site once this many listings of at least DEEP_CRAWL_MIN_QUALITY completeness are found
+    DEEP_CRAWL_TARGET = int(os.getenv('DEEP_CRAWL_TARGET', '100'))
+    DEEP_CRAWL_MIN_QUALITY = float(os.getenv('DEEP_CRAWL_MIN_QUALITY', '0.0'))
+    
+    # Background crawler that keeps the most-requested inventory slices warm
+    CRAWLER_ENABLED = os.getenv('CRAWLER_ENABLED', 'false').lower() == 'true'
+    CRAWLER_INTERVAL = float(os.getenv('CRAWLER_INTERVAL', '300'))
+    CRAWLER_TOP_N = int(os.getenv('CRAWLER_TOP_N', '10'))
+    # Pull every result page of a slice instead of just the first one
+    CRAWLER_DEEP = os.getenv('CRAWLER_DEEP', 'true').lower() == 'true'
+    # Only slices searched within this many seconds count as popular
+    CRAWLER_DEMAND_WINDOW = float(os.getenv('CRAWLER_DEMAND_WINDOW', str(24 * 3600)))
+    # Re-scrape a slice once it is this old, before searches see it go stale
+    CRAWLER_REFRESH_AGE = float(os.getenv('CRAWLER_REFRESH_AGE', str(INVENTORY_FRESH_AGE * 0.6)))
+    # Between full crawls, deep crawls only read newest-first pages until nothing new turns up
+    CRAWLER_FULL_INTERVAL = float(os.getenv('CRAWLER_FULL_INTERVAL', str(6 * 3600)))
+    
+    # Chat turns: worker threads for overlapping LLM calls with the scrape
+    CHAT_PIPELINE_WORKERS = int(os.getenv('CHAT_PIPELINE_WORKERS', '8'))
+    # Ask for the analysis and the follow-up in a single completion
+    CHAT_MERGED_ANALYSIS = os.getenv('CHAT_MERGED_ANALYSIS', 'true').lower() == 'true'
+    # Longest a chat turn waits on each of its reply, scrape and analysis tasks
+    CHAT_TURN_TIMEOUT = float(os.getenv('CHAT_TURN_TIMEOUT', '120'))
+    
+    # Skip the LLM query rewrite when the local parser is at least this sure of make/model
+    QUERY_PARSER_MIN_CONFIDENCE = float(os.getenv('QUERY_PARSER_MIN_CONFIDENCE', '0.6'))
+    
+    # Cache of LLM completions keyed on model, temperature and the normalized prompt
+    LLM_CACHE_ENABLED = os.getenv('LLM_CACHE_ENABLED', 'true').lower() == 'true'
+    LLM_CACHE_MAX_ENTRIES = int(os.getenv('LLM_CACHE_MAX_ENTRIES', '512'))
+    LLM_CACHE_TTL = float(os.getenv('LLM_CACHE_TTL', '3600'))
+    # Also answer rephrased queries whose embedding is at least LLM_CACHE_SIMILARITY similar
+    LLM_CACHE_SEMANTIC = os.getenv('LLM_CACHE_SEMANTIC', 'false').lower() == 'true'
+    LLM_CACHE_SIMILARITY = float(os.getenv('LLM_CACHE_SIMILARITY', '0.9'))
+    
+    # Where chat sessions live: 'memory' (this process only), 'sqlite' (processes on one machine) or 'redis'
+    SESSION_BACKEND = os.getenv('SESSION_BACKEND', 'memory').lower()
+    SESSION_DB_PATH = os.getenv('SESSION_DB_PATH', os.path.join('cache', 'sessions.sqlite3'))
+    SESSION_REDIS_URL = os.getenv('SESSION_REDIS_URL', 'redis://localhost:6379/0')
+    # Attempts at a conversation update before giving up on concurrent writers
+    SESSION_MAX_RETRIES = int(os.getenv('SESSION_MAX_RETRIES', '5'))
+    # Idle sessions expire in every backend; the memory backend also evicts the least recently active
+    CONVERSATION_MAX_SESSIONS = int(os.getenv('CONVERSATION_MAX_SESSIONS', '1000'))
+    CONVERSATION_IDLE_TTL = float(os.getenv('CONVERSATION_IDLE_TTL', '3600'))
+    # Per-session caps: messages (incl. the system prompt), search summaries and listings of the last search
+    CONVERSATION_MAX_MESSAGES = int(os.getenv('CONVERSATION_MAX_MESSAGES', '40'))
+    CONVERSATION_MAX_SEARCHES = int(os.getenv('CONVERSATION_MAX_SEARCHES', '20'))
+    CONVERSATION_MAX_STORED_LISTINGS = int(os.getenv('CONVERSATION_MAX_STORED_LISTINGS', '50'))
+    
+    # Chat context sent to the LLM: newest turns up to this many tokens (system prompt included)
+    CONTEXT_TOKEN_BUDGET = int(os.getenv('CONTEXT_TOKEN_BUDGET', '1500'))
+    # Fold turns that no longer fit into a running summary instead of dropping them
+    CONTEXT_SUMMARY_ENABLED = os.getenv('CONTEXT_SUMMARY_ENABLED', 'true').lower() == 'true'
+    CONTEXT_SUMMARY_MAX_TOKENS = int(os.getenv('CONTEXT_SUMMARY_MAX_TOKENS', '200'))
+    CONTEXT_SUMMARY_CACHE_ENTRIES = int(os.getenv('CONTEXT_SUMMARY_CACHE_ENTRIES', '1024'))
+    
+    # Run the search pipeline only when the local intent model gives search/refine at least this probability
+    INTENT_SEARCH_THRESHOLD = float(os.getenv('INTENT_SEARCH_THRESHOLD', '0.5'))
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Context Builder for Car Listing Agent
+Packs chat history into a token budget and folds older turns into a cached running summary
+"""
+
+import hashlib
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
+from config import Config
+from result_cache import TTLCache, FRESH
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding('cl100k_base')
+except ImportError:
+    _ENCODING = None
+
+# Per-message framing the chat API adds on top of the content
+MESSAGE_OVERHEAD_TOKENS = 4
+CHARS_PER_TOKEN = 4
+ELLIPSIS = ' …'
+SUMMARY_PREFIX = "\n\nSummary of the earlier conversation: "
+
+
+@lru_cache(maxsize=4096)
+def count_tokens(text: str) -> int:
+    """Tokens in text: exact with tiktoken installed, otherwise estimated at ~4 characters per token"""
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text))
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def message_tokens(message: Dict) -> int:
+    return count_tokens(message["content"]) + MESSAGE_OVERHEAD_TOKENS
+
+
+def truncate_to_tokens(text: str, budget: int) -> str:
+    """Cut text down to ``budget`` tokens including the trailing ellipsis, keeping the beginning"""
+    if count_tokens(text) <= budget:
+        return text
+    if _ENCODING is not None:
+        keep = max(budget - len(_ENCODING.encode(ELLIPSIS)), 0)
+        return _ENCODING.decode(_ENCODING.encode(text)[:keep]) + ELLIPSIS
+    return text[:max(budget * CHARS_PER_TOKEN - len(ELLIPSIS), 0)] + ELLIPSIS
+
+
+def _fingerprint(message: Dict) -> str:
+    raw = '\x1f'.join((message["role"], message.get("timestamp") or '', message["content"]))
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+class ContextBuilder:
+    """Builds the message list sent to the chat API from a stored conversation.
+
+    The system prompts are merged into one system message, timestamps and other
+    stored fields are dropped, and the newest turns are kept up to the token
+    budget. When ``summarize(previous_summary, turns)`` is given, turns that no
+    longer fit are folded into a running summary. Summaries are cached by the
+    last turn they cover, and the fold point only moves when the turns after it
+    stop fitting, so a summary call happens every few turns rather than every turn.
+    """
+
+    def __init__(self, budget: int = None, summarize: Callable[[Optional[str], List[Dict]], str] = None):
+        self.budget = budget or Config.CONTEXT_TOKEN_BUDGET
+        self.summarize = summarize
+        self._summaries = TTLCache(Config.CONTEXT_SUMMARY_CACHE_ENTRIES)
+
+    def build(self, history: List[Dict], system_message: str = None) -> List[Dict]:
+        system_parts = [message["content"] for message in history if message["role"] == "system"]
+        if system_message:
+            system_parts.append(system_message)
+        system = "\n\n".join(system_parts)
+
+        stored_turns = [message for message in history if message["role"] != "system"]
+        turns = [{"role": message["role"], "content": message["content"]} for message in stored_turns]
+        budget = self.budget - self._system_tokens(system)
+
+        summary, start = self._summarize_older(stored_turns, turns, budget) if self.summarize else (None, 0)
+        if summary:
+            system += SUMMARY_PREFIX + summary
+            # Measure the final system message, prefix and joins included
+            budget = self.budget - self._system_tokens(system)
+
+        recent = turns[start:]
+        keep = self._fit(recent, budget)
+        recent = recent[len(recent) - keep:]
+        if not recent and turns:
+            # Even the latest message alone is over budget; send as much of it as fits
+            latest = turns[-1]
+            recent = [{"role": latest["role"],
+                       "content": truncate_to_tokens(latest["content"], max(budget - MESSAGE_OVERHEAD_TOKENS, 1))}]
+
+        return ([{"role": "system", "content": system}] if system else []) + recent
+
+    def _system_tokens(self, system: str) -> int:
+        return count_tokens(system) + MESSAGE_OVERHEAD_TOKENS if system else 0
+
+    def _fit(self, turns: List[Dict], budget: int) -> int:
+        """How many of the newest turns fit in the budget"""
+        used = 0
+        for kept, turn in enumerate(reversed(turns)):
+            used += message_tokens(turn)
+            if used > budget:
+                return kept
+        return len(turns)
+
+    def _summarize_older(self, stored_turns: List[Dict], turns: List[Dict], budget: int) -> Tuple[Optional[str], int]:
+        """(summary, index of the first turn it does not cover)"""
+        fingerprints = [_fingerprint(message) for message in stored_turns]
+
+        # Latest point in the history that already has a summary
+        summary, start = None, 0
+        for index in range(len(fingerprints) - 1, -1, -1):
+            cached, state = self._summaries.get(fingerprints[index])
+            if state == FRESH:
+                summary, start = cached, index + 1
+                break
+
+        summary_tokens = count_tokens(SUMMARY_PREFIX + summary) if summary else 0
+        if self._fit(turns[start:], budget - summary_tokens) == len(turns) - start:
+            return summary, start
+
+        # Fold everything except the newest half-budget of turns, leaving room for the next few turns
+        cut = len(turns) - max(self._fit(turns, budget // 2), 1)
+        if cut <= start:
+            return summary, start
+
+        try:
+            folded = self.summarize(summary, turns[start:cut])
+        except Exception as e:
+            print(f"Error summarizing conversation: {e}")
+            return summary, start
+
+        if not folded:
+            return summary, start
+        self._summaries.set(fingerprints[cut - 1], folded, Config.CONVERSATION_IDLE_TTL)
+        print(f"📝 Folded {cut - start} older messages into the conversation summary")
+        return folded, cut
@@ -4,13 +4,20 @@ Conversation Manager for Car Listing Agent
 Handles chat history, context, and conversational flow
 """
 
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional
 import json
 from datetime import datetime
+from config import Config
+from criteria_extractor import extract_criteria
+from intent_classifier import Intent, classify_intent
+from listing import Listing
+from session_backend import SessionBackend, SessionConflict, get_session_backend
+from vehicle_catalog import display_make, display_model
 
 class ConversationManager:
-    def __init__(self):
-        self.conversations = {}
+    def __init__(self, backend: SessionBackend = None):
+        # Sessions live in the backend so any worker process can serve any user
+        self.backend = backend or get_session_backend()
         self.system_prompt = """You are a helpful car buying assistant. You help users find cars by:
 
 1. Understanding their needs through conversation
@@ -21,9 +28,8 @@ class ConversationManager:
 
 Be friendly, conversational, and helpful. Always try to understand what the user is looking for before suggesting cars."""
 
-    def start_conversation(self, user_id: str = "default") -> str:
-        """Start a new conversation"""
-        self.conversations[user_id] = {
+    def _new_conversation(self) -> Dict:
+        return {
             "messages": [
                 {
                     "role": "system",
@@ -38,190 +44,151 @@ Be friendly, conversational, and helpful. Always try to understand what the user
             ],
             "last_search": None,
             "search_history": [],
+            "message_count": 0,
+            "searches_performed": 0,
             "created_at": datetime.now().isoformat()
         }
-        return self.conversations[user_id]["messages"][-1]["content"]
+
+    def _update(self, user_id: str, mutate: Callable[[Dict], None]) -> Dict:
+        """Load the conversation (starting one if needed), apply mutate and save it.
+        
+        Saves are conditional on the version loaded, so a concurrent update from
+        another request or worker makes this reload and reapply instead of losing it.
+        Raises SessionConflict after SESSION_MAX_RETRIES lost races; the web routes
+        turn that into a "try again" response.
+        """
+        for _ in range(Config.SESSION_MAX_RETRIES):
+            conv, version = self.backend.load(user_id)
+            if conv is None:
+                conv = self._new_conversation()
+            mutate(conv)
+            if self.backend.save(user_id, conv, version):
+                return conv
+        raise SessionConflict(f"Conversation {user_id} kept changing during update")
+
+    def start_conversation(self, user_id: str = "default") -> str:
+        """Start a new conversation"""
+        def reset(conv: Dict) -> None:
+            conv.clear()
+            conv.update(self._new_conversation())
+        
+        conv = self._update(user_id, reset)
+        return conv["messages"][-1]["content"]
 
     def add_message(self, user_id: str, role: str, content: str) -> None:
         """Add a message to the conversation"""
-        if user_id not in self.conversations:
-            self.start_conversation(user_id)
-        
-        self.conversations[user_id]["messages"].append({
+        message = {
             "role": role,
             "content": content,
             "timestamp": datetime.now().isoformat()
-        })
+        }
+        
+        def append(conv: Dict) -> None:
+            messages = conv["messages"]
+            messages.append(message)
+            conv["message_count"] += 1
+            
+            # Keep the system prompt and drop the oldest turns past the cap
+            excess = len(messages) - Config.CONVERSATION_MAX_MESSAGES
+            if excess > 0:
+                del messages[1:excess + 1]
+        
+        self._update(user_id, append)
 
     def get_conversation_history(self, user_id: str) -> List[Dict]:
         """Get conversation history for context"""
-        if user_id not in self.conversations:
+        conv, _ = self.backend.load(user_id)
+        if conv is None:
             return []
-        return self.conversations[user_id]["messages"]
+        return conv["messages"]
 
     def get_last_search(self, user_id: str) -> Optional[Dict]:
         """Get the last search performed"""
-        if user_id not in self.conversations:
+        conv, _ = self.backend.load(user_id)
+        if conv is None:
             return None
-        return self.conversations[user_id].get("last_search")
+        return conv.get("last_search")
 
-    def save_search_results(self, user_id: str, query: str, results: List[Dict]) -> None:
-        """Save search results to conversation history"""
-        if user_id not in self.conversations:
-            self.start_conversation(user_id)
-        
-        search_data = {
+    def save_search_results(self, user_id: str, query: str, results: List[Listing]) -> None:
+        """Save search results to conversation history.
+        
+        Only the last search keeps its listings, as references to the shared Listing
+        objects (capped at CONVERSATION_MAX_STORED_LISTINGS); older searches keep a summary.
+        """
+        timestamp = datetime.now().isoformat()
+        last_search = {
             "query": query,
-            "results": results,
-            "timestamp": datetime.now().isoformat(),
+            "results": tuple(results[:Config.CONVERSATION_MAX_STORED_LISTINGS]),
+            "timestamp": timestamp,
             "count": len(results)
         }
         
-        self.conversations[user_id]["last_search"] = search_data
-        self.conversations[user_id]["search_history"].append(search_data)
+        def record(conv: Dict) -> None:
+            conv["last_search"] = last_search
+            conv["searches_performed"] += 1
+            
+            history = conv["search_history"]
+            history.append({"query": query, "timestamp": timestamp, "count": len(results)})
+            if len(history) > Config.CONVERSATION_MAX_SEARCHES:
+                del history[:len(history) - Config.CONVERSATION_MAX_SEARCHES]
+        
+        self._update(user_id, record)
 
     def should_search_for_cars(self, message: str, conversation_history: List[Dict]) -> bool:
         """Determine if the user wants to search for cars"""
-        message_lower = message.lower()
-        
-        # Keywords that indicate car search intent
-        search_keywords = [
-            "find", "search", "looking for", "want", "need", "show me", 
-            "honda", "toyota", "ford", "bmw", "mercedes", "audi", "nissan",
-            "civic", "camry", "accord", "corolla", "mustang", "pilot",
-            "under", "budget", "price", "mileage", "year", "model",
-            "car", "vehicle", "auto", "automobile", "sedan", "suv", "truck"
-        ]
-        
-        # Check if message contains car-related keywords
-        has_car_keywords = any(keyword in message_lower for keyword in search_keywords)
-        
-        # Check for direct search requests
-        search_requests = [
-            "search for", "find cars", "show cars", "car listings",
-            "what cars", "available cars", "car options"
-        ]
-        
-        has_search_request = any(request in message_lower for request in search_requests)
-        
-        return has_car_keywords or has_search_request
+        return classify_intent(message).wants_search
+
+    def classify_intent(self, user_id: str, message: str) -> Intent:
+        """Search, refinement of the last search, or plain conversation"""
+        return classify_intent(message, has_previous_search=self.get_last_search(user_id) is not None)
+
+    def refine_criteria(self, user_id: str, criteria: Dict) -> Dict:
+        """Criteria of the last search updated with whatever the refinement message changes"""
+        last_search = self.get_last_search(user_id)
+        if not last_search:
+            return criteria
+        
+        # Search queries are generated from criteria, so parsing one recovers them
+        previous = extract_criteria(last_search["query"])
+        refined = dict(previous)
+        for key, value in criteria.items():
+            if key == "features":
+                refined["features"] = previous["features"] + [f for f in value if f not in previous["features"]]
+            elif value is not None:
+                refined[key] = value
+        
+        # A different make invalidates the old model unless a new one was given
+        if criteria["make"] and criteria["make"] != previous["make"] and not criteria["model"]:
+            refined["model"] = None
+        return refined
 
     def extract_car_criteria(self, message: str) -> Dict:
         """Extract car search criteria from user message"""
-        criteria = {
-            "make": None,
-            "model": None,
-            "year_min": None,
-            "year_max": None,
-            "price_max": None,
-            "price_min": None,
-            "mileage_max": None,
-            "features": [],
-            "body_type": None
-        }
-        
-        message_lower = message.lower()
-        
-        # Extract make and model
-        makes = ['honda', 'toyota', 'ford', 'chevrolet', 'nissan', 'bmw', 'mercedes', 
-                'audi', 'lexus', 'acura', 'infiniti', 'volkswagen', 'hyundai', 'kia',
-                'mazda', 'subaru', 'jeep', 'dodge', 'chrysler', 'buick', 'cadillac']
-        
-        for make in makes:
-            if make in message_lower:
-                criteria["make"] = make
-                break
-        
-        # Extract price information
-        import re
-        price_patterns = [
-            r'under\s+\$?([\d,]+)',
-            r'less\s+than\s+\$?([\d,]+)',
-            r'below\s+\$?([\d,]+)',
-            r'max\s+\$?([\d,]+)',
-            r'budget\s+of\s+\$?([\d,]+)',
-            r'\$?([\d,]+)\s*-\s*\$?([\d,]+)',  # price range
-        ]
-        
-        for pattern in price_patterns:
-            match = re.search(pattern, message_lower)
-            if match:
-                if len(match.groups()) == 2:  # price range
-                    criteria["price_min"] = int(match.group(1).replace(',', ''))
-                    criteria["price_max"] = int(match.group(2).replace(',', ''))
-                else:  # max price
-                    criteria["price_max"] = int(match.group(1).replace(',', ''))
-                break
-        
-        # Extract year information
-        year_patterns = [
-            r'(\d{4})\s*or\s*newer',
-            r'(\d{4})\s*and\s*up',
-            r'after\s+(\d{4})',
-            r'from\s+(\d{4})',
-            r'(\d{4})\s*-\s*(\d{4})',  # year range
-        ]
-        
-        for pattern in year_patterns:
-            match = re.search(pattern, message_lower)
-            if match:
-                if len(match.groups()) == 2:  # year range
-                    criteria["year_min"] = int(match.group(1))
-                    criteria["year_max"] = int(match.group(2))
-                else:  # min year
-                    criteria["year_min"] = int(match.group(1))
-                break
-        
-        # Extract mileage information
-        mileage_patterns = [
-            r'under\s+([\d,]+)\s*miles?',
-            r'less\s+than\s+([\d,]+)\s*miles?',
-            r'below\s+([\d,]+)\s*miles?',
-            r'max\s+([\d,]+)\s*miles?',
-            r'low\s+mileage',
-        ]
-        
-        for pattern in mileage_patterns:
-            match = re.search(pattern, message_lower)
-            if match:
-                if 'low mileage' in message_lower:
-                    criteria["mileage_max"] = 50000  # assume low mileage means under 50k
-                else:
-                    criteria["mileage_max"] = int(match.group(1).replace(',', ''))
-                break
-        
-        # Extract features
-        features = ['automatic', 'manual', 'awd', '4wd', 'leather', 'sunroof', 
-                   'bluetooth', 'backup camera', 'heated seats', 'navigation']
-        
-        for feature in features:
-            if feature in message_lower:
-                criteria["features"].append(feature)
-        
-        # Extract body type
-        body_types = ['sedan', 'suv', 'truck', 'hatchback', 'coupe', 'convertible', 'wagon']
-        for body_type in body_types:
-            if body_type in message_lower:
-                criteria["body_type"] = body_type
-                break
-        
-        return criteria
+        return extract_criteria(message)
 
     def generate_search_query(self, criteria: Dict) -> str:
         """Generate a search query from extracted criteria"""
         query_parts = []
         
         if criteria["make"]:
-            query_parts.append(criteria["make"].title())
+            query_parts.append(display_make(criteria["make"]))
         
         if criteria["model"]:
-            query_parts.append(criteria["model"].title())
+            query_parts.append(display_model(criteria["model"]))
         
-        if criteria["year_min"]:
+        if criteria["year_min"] and criteria["year_max"]:
+            query_parts.append(f"{criteria['year_min']}-{criteria['year_max']}")
+        elif criteria["year_min"]:
             query_parts.append(f"{criteria['year_min']} or newer")
+        elif criteria["year_max"]:
+            query_parts.append(f"{criteria['year_max']} or older")
         
-        if criteria["price_max"]:
+        if criteria["price_min"] and criteria["price_max"]:
+            query_parts.append(f"${criteria['price_min']:,}-${criteria['price_max']:,}")
+        elif criteria["price_max"]:
             query_parts.append(f"under ${criteria['price_max']:,}")
+        elif criteria["price_min"]:
+            query_parts.append(f"over ${criteria['price_min']:,}")
         
         if criteria["mileage_max"]:
             query_parts.append(f"under {criteria['mileage_max']:,} miles")
@@ -236,14 +203,21 @@ Be friendly, conversational, and helpful. Always try to understand what the user
 
     def get_conversation_summary(self, user_id: str) -> Dict:
         """Get a summary of the current conversation"""
-        if user_id not in self.conversations:
+        conv, _ = self.backend.load(user_id)
+        if conv is None:
             return {"message_count": 0, "searches_performed": 0}
         
-        conv = self.conversations[user_id]
+        last_search = conv.get("last_search")
+        if last_search:
+            last_search = {**last_search, "results": [listing.to_dict() for listing in last_search["results"]]}
+        
         return {
-            "message_count": len(conv["messages"]) - 2,  # exclude system and initial assistant message
-            "searches_performed": len(conv["search_history"]),
-            "last_search": conv.get("last_search"),
+            "message_count": conv["message_count"],
+            "searches_performed": conv["searches_performed"],
+            "last_search": last_search,
             "created_at": conv["created_at"]
         }
 
+    def stats(self) -> Dict:
+        """Session counts for health and debugging output"""
+        return self.backend.stats()
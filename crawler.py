@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Background Crawler for Car Listing Agent
+Keeps the most-requested make/model slices of the inventory warm between searches
+"""
+
+import threading
+import time
+from typing import Optional
+from config import Config
+from inventory_store import InventoryStore
+
+
+class BackgroundCrawler:
+    def __init__(self, scraper, store: InventoryStore = None, interval: float = None,
+                 top_n: int = None, demand_window: float = None, refresh_age: float = None,
+                 full_interval: float = None):
+        self.scraper = scraper
+        self.store = store or scraper.inventory_store
+        self.interval = interval or Config.CRAWLER_INTERVAL
+        self.top_n = top_n or Config.CRAWLER_TOP_N
+        self.demand_window = demand_window or Config.CRAWLER_DEMAND_WINDOW
+        self.refresh_age = Config.CRAWLER_REFRESH_AGE if refresh_age is None else refresh_age
+        self.full_interval = Config.CRAWLER_FULL_INTERVAL if full_interval is None else full_interval
+
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name='inventory-crawler', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def run_once(self) -> int:
+        """Refresh every popular slice that is due; returns how many were crawled"""
+        crawled = 0
+
+        for make, model, zip_code, radius in self.store.popular_slices(self.top_n, self.demand_window):
+            if self._stop.is_set():
+                break
+            # The scraper searches one configured area, so slices for other areas can't be served
+            if (zip_code, radius) != (Config.SEARCH_ZIP, Config.SEARCH_RADIUS):
+                continue
+
+            age = self.store.slice_age(make, model, zip_code, radius)
+            if age is not None and age < self.refresh_age:
+                continue
+
+            label = f"{make} {model}" if model else make
+            watermark = self.store.get_watermark(make, model, zip_code, radius)
+            started = time.time()
+            # Crawl everything now and then so sold listings get retired; in between
+            # only the pages newer than what the store already holds
+            full = watermark is None or watermark[1] is None or started - watermark[1] >= self.full_interval
+
+            try:
+                scraped, inserted, updated = self.scraper.refresh_slice(make, model, full=full)
+            except Exception as e:
+                print(f"❌ Crawler failed to refresh {label}: {e}")
+                continue
+
+            # Only advance the watermark past crawls that actually returned listings
+            if not scraped:
+                print(f"⚠️ Crawler got no listings for {label}, keeping previous watermark")
+                continue
+
+            known = self.store.advance_watermark(make, model, zip_code, radius, started, full)
+            print(f"🕷️ Crawled {label} ({'full' if full else 'incremental'}): {scraped} listings, "
+                  f"{inserted} new, {updated} changed, {known} in inventory in {time.time() - started:.1f}s")
+            crawled += 1
+
+        return crawled
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+                self.store.prune()
+            except Exception as e:
+                print(f"❌ Crawler pass failed: {e}")
+            self._stop.wait(self.interval)
+
+
+def start_background_crawler(scraper) -> Optional[BackgroundCrawler]:
+    """Start a crawler for the scraper when CRAWLER_ENABLED and it has an inventory store"""
+    if not Config.CRAWLER_ENABLED or not scraper.inventory_store:
+        return None
+
+    crawler = BackgroundCrawler(scraper)
+    crawler.start()
+    print(f"🕷️ Background crawler refreshing top {crawler.top_n} slices every {crawler.interval:.0f}s")
+    return crawler
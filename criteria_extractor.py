@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Criteria Extractor for Car Listing Agent
+Single-pass extraction of search criteria and search intent from chat messages
+"""
+
+import re
+from collections import deque
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from query_parser import parse_prices, parse_years
+from vehicle_catalog import VehicleMatch, catalog_phrases, resolve_vehicle, tokenize
+
+# Canonical feature names (as stored in criteria) and the phrases that mean them
+FEATURES = {
+    'automatic': ('automatic', 'auto transmission'),
+    'manual': ('manual', 'stick shift', 'manual transmission'),
+    'awd': ('awd', 'all wheel drive', 'all-wheel drive', 'all-wheel-drive'),
+    '4wd': ('4wd', '4x4', 'four wheel drive', '4 wheel drive', 'four-wheel drive'),
+    'leather': ('leather', 'leather seats'),
+    'sunroof': ('sunroof', 'moonroof'),
+    'bluetooth': ('bluetooth',),
+    'backup camera': ('backup camera', 'back up camera', 'rear camera', 'rearview camera'),
+    'heated seats': ('heated seats',),
+    'navigation': ('navigation', 'nav', 'gps'),
+}
+
+BODY_TYPES = {
+    'sedan': ('sedan', 'sedans'),
+    'suv': ('suv', 'suvs', 'crossover', 'crossovers'),
+    'truck': ('truck', 'trucks', 'pickup', 'pickups'),
+    'hatchback': ('hatchback', 'hatchbacks'),
+    'coupe': ('coupe', 'coupes'),
+    'convertible': ('convertible', 'convertibles'),
+    'wagon': ('wagon', 'wagons'),
+    'minivan': ('minivan', 'minivans'),
+}
+
+# Words and phrases that signal the user wants listings, matched as whole words
+SEARCH_PHRASES = (
+    'find', 'search', 'search for', 'looking for', 'want', 'need', 'show me', 'under', 'budget', 'price',
+    'mileage', 'year', 'model', 'car', 'cars', 'vehicle', 'vehicles', 'auto', 'automobile', 'listings',
+    'car listings', 'car options', 'available cars', 'what cars'
+)
+
+MILEAGE_RE = re.compile(r'\b(?:under|less\s+than|fewer\s+than|below|max(?:imum)?|no\s+more\s+than|up\s+to)\s+'
+                        r'(\d[\d,]*(?:\.\d+)?)\s*(k\b|thousand\b)?\s*(?:miles?\b|mi\b)')
+LOW_MILEAGE_RE = re.compile(r'\blow\s+(?:mileage|miles)\b')
+LOW_MILEAGE_MAX = 50000
+DIGIT_RE = re.compile(r'\d')
+
+
+class PhraseAutomaton:
+    """Aho-Corasick automaton over word tokens.
+
+    Matching is a single left-to-right pass over the tokens regardless of how
+    many phrases are loaded, and works on whole tokens, so 'kia' never matches
+    inside 'kiara'.
+    """
+
+    def __init__(self, phrases: Iterable[Tuple[Sequence[str], Any]]):
+        self._goto = [{}]
+        self._fail = [0]
+        self._outputs = [[]]
+
+        for tokens, payload in phrases:
+            if not tokens:
+                continue
+            state = 0
+            for token in tokens:
+                next_state = self._goto[state].get(token)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][token] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._outputs.append([])
+                state = next_state
+            self._outputs[state].append((len(tokens), payload))
+
+        # Breadth-first failure links; each state also reports its suffixes' matches
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(token, 0)
+                self._outputs[next_state] = self._outputs[next_state] + self._outputs[self._fail[next_state]]
+
+    def matches(self, tokens: Sequence[str]) -> List[Tuple[int, int, Any]]:
+        """Every phrase occurrence as (start, end, payload), overlapping ones included"""
+        found = []
+        state = 0
+        for end, token in enumerate(tokens, 1):
+            while state and token not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(token, 0)
+            for length, payload in self._outputs[state]:
+                found.append((end - length, end, payload))
+        return found
+
+
+def _phrases() -> Iterable[Tuple[List[str], tuple]]:
+    for tokens, entry in catalog_phrases():
+        yield tokens, ('vehicle', entry)
+    for feature, spellings in FEATURES.items():
+        for spelling in spellings:
+            yield tokenize(spelling), ('feature', feature)
+    for body_type, spellings in BODY_TYPES.items():
+        for spelling in spellings:
+            yield tokenize(spelling), ('body', body_type)
+    for phrase in SEARCH_PHRASES:
+        yield tokenize(phrase), ('intent',)
+
+
+AUTOMATON = PhraseAutomaton(_phrases())
+
+
+def _catalog_mentions(matches: List[Tuple[int, int, tuple]]) -> List[Tuple[int, int, List[tuple]]]:
+    """Leftmost-longest, non-overlapping catalog mentions, in vehicle_catalog.scan() form"""
+    spans = {}
+    for start, end, payload in matches:
+        if payload[0] == 'vehicle':
+            spans.setdefault((start, end), []).append(payload[1])
+
+    mentions = []
+    covered = 0
+    for (start, end) in sorted(spans, key=lambda span: (span[0], -span[1])):
+        if start >= covered:
+            mentions.append((start, end, spans[(start, end)]))
+            covered = end
+    return mentions
+
+
+def _mileage_max(text: str, has_digits: bool) -> Optional[int]:
+    match = MILEAGE_RE.search(text) if has_digits else None
+    if match:
+        value = float(match.group(1).replace(',', ''))
+        return int(value * 1000 if match.group(2) else value)
+    if LOW_MILEAGE_RE.search(text):
+        return LOW_MILEAGE_MAX
+    return None
+
+
+class MessageFacts:
+    """Everything found in one message"""
+
+    __slots__ = ('vehicle', 'features', 'body_type', 'intent', 'years', 'prices', 'mileage_max')
+
+    def __init__(self, vehicle: VehicleMatch, features: Tuple[str, ...], body_type: Optional[str], intent: bool,
+                 years: Tuple[Optional[int], Optional[int]], prices: Tuple[Optional[int], Optional[int]],
+                 mileage_max: Optional[int]):
+        self.vehicle = vehicle
+        self.features = features
+        self.body_type = body_type
+        self.intent = intent
+        self.years = years
+        self.prices = prices
+        self.mileage_max = mileage_max
+
+
+@lru_cache(maxsize=512)
+def scan_message(message: str) -> MessageFacts:
+    """One automaton pass plus the numeric patterns; cached since a chat turn asks about a message twice"""
+    matches = AUTOMATON.matches(tokenize(message))
+
+    features = []
+    body_type = None
+    intent = False
+    for _, _, payload in matches:
+        kind = payload[0]
+        if kind == 'feature':
+            if payload[1] not in features:
+                features.append(payload[1])
+        elif kind == 'body':
+            body_type = body_type or payload[1]
+        elif kind == 'intent':
+            intent = True
+
+    # Years, prices and mileages all need a digit, and most chat messages have none
+    text = message.lower()
+    has_digits = DIGIT_RE.search(text) is not None
+    years = parse_years(text) if has_digits else (None, None)
+    prices = parse_prices(text) if has_digits else (None, None)
+
+    vehicle = resolve_vehicle(_catalog_mentions(matches))
+    return MessageFacts(vehicle, tuple(features), body_type, intent, years, prices, _mileage_max(text, has_digits))
+
+
+def extract_criteria(message: str) -> Dict:
+    """Structured search criteria from a chat message (a new dict on every call)"""
+    facts = scan_message(message)
+    year_min, year_max = facts.years
+    price_min, price_max = facts.prices
+
+    return {
+        "make": facts.vehicle.make,
+        "model": facts.vehicle.model,
+        "year_min": year_min,
+        "year_max": year_max,
+        "price_max": price_max,
+        "price_min": price_min,
+        "mileage_max": facts.mileage_max,
+        "features": list(facts.features),
+        "body_type": facts.body_type
+    }
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Debug Capture for Car Listing Agent
+Opt-in, sampled dumps of raw result pages written by a background thread
+"""
+
+import os
+import queue
+import random
+import threading
+import time
+import uuid
+from typing import Optional
+from config import Config
+
+
+class DebugCapture:
+    def __init__(self, directory: str, sample_rate: float = None, max_pending: int = 32):
+        self.directory = directory
+        self.sample_rate = Config.DEBUG_CAPTURE_SAMPLE_RATE if sample_rate is None else sample_rate
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = threading.Thread(target=self._write_loop, name='debug-capture', daemon=True)
+        os.makedirs(directory, exist_ok=True)
+        self._thread.start()
+
+    def capture(self, site: str, content: bytes) -> Optional[str]:
+        """Queue a raw response body for writing; returns the file name if it was sampled"""
+        if random.random() >= self.sample_rate:
+            return None
+
+        timestamp = time.strftime('%Y%m%d-%H%M%S')
+        filename = os.path.join(self.directory, f"{site.replace('.', '_')}_{timestamp}_{uuid.uuid4().hex[:8]}.html")
+
+        try:
+            self._queue.put_nowait((filename, content))
+        except queue.Full:
+            # Never hold up a search for a debug file
+            return None
+        return filename
+
+    def _write_loop(self) -> None:
+        while True:
+            filename, content = self._queue.get()
+            try:
+                with open(filename, 'wb') as f:
+                    f.write(content)
+            except OSError as e:
+                print(f"Warning: could not write debug capture {filename}: {e}")
+            finally:
+                self._queue.task_done()
+
+
+_shared_capture = None
+_shared_capture_lock = threading.Lock()
+
+
+def get_debug_capture() -> Optional[DebugCapture]:
+    """Return the process-wide capture writer, or None unless DEBUG_CAPTURE_DIR is set"""
+    global _shared_capture
+
+    if not Config.DEBUG_CAPTURE_DIR:
+        return None
+
+    with _shared_capture_lock:
+        if _shared_capture is None:
+            _shared_capture = DebugCapture(Config.DEBUG_CAPTURE_DIR)
+        return _shared_capture
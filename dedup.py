@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Listing Deduplication for Car Listing Agent
+Merges the same vehicle seen on several sites, URL patterns or card selectors
+"""
+
+import re
+from typing import List
+from listing import Listing, NOT_AVAILABLE
+
+NON_ALNUM_RE = re.compile(r'[^a-z0-9]+')
+MERGEABLE_FIELDS = ('price', 'mileage', 'location', 'url', 'vin')
+# Parsed values that travel with their display field when it is filled in
+PARSED_FIELDS = {'price': 'price_value', 'mileage': 'mileage_value'}
+
+
+def _normalize(text: str) -> str:
+    if not text or text == NOT_AVAILABLE:
+        return ''
+    return NON_ALNUM_RE.sub('', text.lower())
+
+
+def listing_keys(listing: Listing) -> List[tuple]:
+    """Index keys for a listing, strongest first.
+
+    A VIN identifies a vehicle outright. Normalized year/make/model/price/
+    mileage/dealer matches the same car across sites when one of them leaves
+    the VIN out. Identical detail URLs catch the same card matched twice.
+    """
+    keys = []
+    if listing.vin:
+        keys.append(('vin', listing.vin))
+
+    if listing.make and listing.model and listing.price_value:
+        keys.append(('spec', listing.year, listing.make, listing.model, listing.price_value,
+                     listing.mileage_value, _normalize(listing.location)))
+
+    if listing.url and listing.url != NOT_AVAILABLE:
+        keys.append(('url', listing.url.split('?')[0].rstrip('/')))
+
+    if not keys:
+        keys.append(('title', _normalize(listing.title), listing.price_value, listing.mileage_value))
+
+    return keys
+
+
+def _conflicts(a: Listing, b: Listing) -> bool:
+    """Two different VINs are two different cars, whatever else they share"""
+    return bool(a.vin and b.vin and a.vin != b.vin)
+
+
+def _merge(primary: Listing, duplicate: Listing) -> Listing:
+    """Fill fields the primary is missing from the duplicate, without mutating either"""
+    missing = [field for field in MERGEABLE_FIELDS
+               if getattr(primary, field) in (None, NOT_AVAILABLE)
+               and getattr(duplicate, field) not in (None, NOT_AVAILABLE)]
+    if not missing:
+        return primary
+
+    data = primary.to_dict()
+    for field in missing:
+        data[field] = getattr(duplicate, field)
+        if field in PARSED_FIELDS:
+            data[PARSED_FIELDS[field]] = getattr(duplicate, PARSED_FIELDS[field])
+    return Listing.from_dict(data)
+
+
+def deduplicate(listings: List[Listing]) -> List[Listing]:
+    """Collapse duplicate listings in one pass, keeping first-seen order"""
+    index = {}
+    unique = []
+
+    for listing in listings:
+        keys = listing_keys(listing)
+        position = next((index[key] for key in keys
+                         if key in index and not _conflicts(unique[index[key]], listing)), None)
+
+        if position is None:
+            position = len(unique)
+            unique.append(listing)
+        else:
+            unique[position] = _merge(unique[position], listing)
+
+        # Register every key so later duplicates can match on any of them
+        for key in listing_keys(unique[position]) + keys:
+            index.setdefault(key, position)
+
+    return unique
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Async Fetch Engine for Car Listing Agent
+Runs pooled, keep-alive HTTP fetches on one shared asyncio event loop
+"""
+
+import asyncio
+import atexit
+import threading
+from typing import Dict, List, Optional
+import requests
+from requests.structures import CaseInsensitiveDict
+from config import Config
+
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+    print("Warning: aiohttp not available, falling back to blocking requests")
+
+# Neither requests nor aiohttp can decode brotli bodies without one of these
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    try:
+        import brotlicffi
+        BROTLI_AVAILABLE = True
+    except ImportError:
+        BROTLI_AVAILABLE = False
+
+ACCEPT_ENCODING = 'gzip, deflate, br' if BROTLI_AVAILABLE else 'gzip, deflate'
+
+
+class FetchResponse:
+    """Fully read HTTP response, compatible with how the scraper uses requests.Response"""
+
+    def __init__(self, url: str, status_code: int, headers: Dict, content: bytes,
+                 history: Optional[List['FetchResponse']] = None):
+        self.url = url
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers)
+        self.content = content
+        self.history = history or []
+
+    @property
+    def text(self) -> str:
+        return self.content.decode('utf-8', errors='replace')
+
+    def iter_content(self, chunk_size: int = 16384):
+        """Yield the body in chunks, like requests.Response.iter_content"""
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start:start + chunk_size]
+
+    def raise_for_status(self) -> None:
+        """Raise requests' HTTPError so callers handle both engines the same way"""
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code} Error for url: {self.url}", response=self)
+
+
+class AsyncFetchEngine:
+    def __init__(self, max_in_flight: int = None, max_per_host: int = None,
+                 keepalive_timeout: float = None, timeout: float = None):
+        self.max_in_flight = max_in_flight or Config.FETCH_MAX_IN_FLIGHT
+        self.max_per_host = max_per_host or Config.FETCH_MAX_PER_HOST
+        self.keepalive_timeout = keepalive_timeout or Config.FETCH_KEEPALIVE_TIMEOUT
+        self.timeout = timeout or Config.FETCH_TIMEOUT
+
+        self._loop = None
+        self._thread = None
+        self._session = None
+        self._semaphore = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self) -> None:
+        """Start the background event loop and connection pool on first use"""
+        with self._lock:
+            if self._loop is not None:
+                return
+
+            loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=loop.run_forever, name='fetch-engine', daemon=True)
+            self._thread.start()
+            asyncio.run_coroutine_threadsafe(self._open_session(), loop).result()
+            self._loop = loop
+
+    async def _open_session(self) -> None:
+        connector = aiohttp.TCPConnector(
+            limit=self.max_in_flight,
+            limit_per_host=self.max_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            ttl_dns_cache=300
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout)
+        )
+        self._semaphore = asyncio.Semaphore(self.max_in_flight)
+
+    async def fetch_async(self, url: str, headers: Dict = None, timeout: float = None) -> FetchResponse:
+        """Fetch a URL on the engine's loop; must be awaited from that loop"""
+        request_timeout = aiohttp.ClientTimeout(total=timeout or self.timeout)
+
+        async with self._semaphore:
+            try:
+                async with self._session.get(url, headers=headers, timeout=request_timeout,
+                                             allow_redirects=True) as resp:
+                    content = await resp.read()
+                    history = [FetchResponse(str(r.url), r.status, r.headers, b'') for r in resp.history]
+                    return FetchResponse(str(resp.url), resp.status, resp.headers, content, history)
+            except asyncio.TimeoutError as e:
+                raise requests.exceptions.Timeout(f"Timed out fetching {url}") from e
+            except aiohttp.ClientError as e:
+                raise requests.exceptions.ConnectionError(str(e)) from e
+
+    def fetch(self, url: str, headers: Dict = None, timeout: float = None) -> FetchResponse:
+        """Blocking fetch for worker threads (Flask handlers, CLI, site searchers)"""
+        self._ensure_started()
+        future = asyncio.run_coroutine_threadsafe(self.fetch_async(url, headers, timeout), self._loop)
+        return future.result()
+
+    def fetch_many(self, urls: List[str], headers: Dict = None, timeout: float = None) -> List:
+        """Fetch several URLs concurrently; failed fetches are returned as exceptions"""
+        self._ensure_started()
+
+        async def gather():
+            return await asyncio.gather(*(self.fetch_async(url, headers, timeout) for url in urls),
+                                        return_exceptions=True)
+
+        return asyncio.run_coroutine_threadsafe(gather(), self._loop).result()
+
+    def close(self) -> None:
+        """Close pooled connections and stop the event loop"""
+        with self._lock:
+            if self._loop is None:
+                return
+
+            asyncio.run_coroutine_threadsafe(self._session.close(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+            self._loop = None
+
+
+_shared_engine = None
+_shared_engine_lock = threading.Lock()
+
+
+def get_fetch_engine() -> Optional[AsyncFetchEngine]:
+    """Return the process-wide fetch engine, or None when async fetching is unavailable"""
+    global _shared_engine
+
+    if not (Config.ASYNC_FETCH and AIOHTTP_AVAILABLE):
+        return None
+
+    with _shared_engine_lock:
+        if _shared_engine is None:
+            _shared_engine = AsyncFetchEngine()
+            atexit.register(_shared_engine.close)
+        return _shared_engine
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+HTTP Cache for Car Listing Agent
+Persistent SQLite store of compressed result pages with ETag/Last-Modified revalidation
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Optional
+from config import Config
+from fetch_engine import FetchResponse
+
+# Response headers kept alongside the body
+STORED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Cache-Control')
+
+
+class CachedPage:
+    """A stored response plus the validators needed to revalidate it"""
+
+    def __init__(self, url: str, status_code: int, headers: Dict, body: bytes, fetched_at: float):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.body = body
+        self.fetched_at = fetched_at
+
+    def is_fresh(self, max_age: float) -> bool:
+        return time.time() - self.fetched_at < max_age
+
+    def validators(self) -> Dict:
+        """Conditional request headers for revalidating this page"""
+        validators = {}
+        if self.headers.get('ETag'):
+            validators['If-None-Match'] = self.headers['ETag']
+        if self.headers.get('Last-Modified'):
+            validators['If-Modified-Since'] = self.headers['Last-Modified']
+        return validators
+
+    def to_response(self) -> FetchResponse:
+        return FetchResponse(self.url, self.status_code, self.headers, self.body)
+
+
+class HTTPCache:
+    def __init__(self, db_path: str, max_age: float = None, retention: float = None):
+        self.db_path = db_path
+        self.max_age = Config.HTTP_CACHE_MAX_AGE if max_age is None else max_age
+        self.retention = Config.HTTP_CACHE_RETENTION if retention is None else retention
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.stores = 0
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._connection().execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                status_code INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                body BLOB NOT NULL,
+                fetched_at REAL NOT NULL
+            )
+        """)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+    def _count(self, counter: str) -> None:
+        with self._stats_lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def lookup(self, url: str) -> Optional[CachedPage]:
+        """Return the stored page for a URL, if any, regardless of age"""
+        row = self._connection().execute(
+            'SELECT status_code, headers, body, fetched_at FROM pages WHERE url = ?', (url,)
+        ).fetchone()
+        if not row:
+            return None
+
+        status_code, headers, body, fetched_at = row
+        return CachedPage(url, status_code, json.loads(headers), zlib.decompress(body), fetched_at)
+
+    def get_fresh(self, url: str) -> Optional[CachedPage]:
+        """Return the stored page only if it can be served without revalidation"""
+        page = self.lookup(url)
+        if page and page.is_fresh(self.max_age):
+            self._count('hits')
+            return page
+        return None
+
+    def store(self, url: str, response) -> None:
+        """Record a full download and store it unless the site forbids it"""
+        self._count('misses')
+        if response.status_code != 200:
+            return
+        if 'no-store' in response.headers.get('Cache-Control', ''):
+            return
+
+        headers = {name: response.headers[name] for name in STORED_HEADERS if response.headers.get(name)}
+        self._connection().execute(
+            'INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?)',
+            (url, response.status_code, json.dumps(headers), zlib.compress(response.content, 6), time.time())
+        )
+        self._count('stores')
+
+        if self.stores % 100 == 0:
+            self.prune()
+
+    def mark_revalidated(self, page: CachedPage) -> FetchResponse:
+        """Record a 304 for a stored page and return it as a fresh response"""
+        page.fetched_at = time.time()
+        self._connection().execute('UPDATE pages SET fetched_at = ? WHERE url = ?', (page.fetched_at, page.url))
+        self._count('revalidated')
+        return page.to_response()
+
+    def prune(self) -> None:
+        """Drop pages older than the retention period"""
+        self._connection().execute('DELETE FROM pages WHERE fetched_at < ?', (time.time() - self.retention,))
+
+    def stats(self) -> Dict:
+        with self._stats_lock:
+            requests_seen = self.hits + self.revalidated + self.misses
+            return {
+                'hits': self.hits,
+                'revalidated': self.revalidated,
+                'misses': self.misses,
+                'stores': self.stores,
+                'hit_rate': round((self.hits + self.revalidated) / requests_seen, 3) if requests_seen else 0.0
+            }
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_http_cache() -> Optional[HTTPCache]:
+    """Return the process-wide page cache, or None when HTTP_CACHE_PATH is empty"""
+    global _shared_cache
+
+    if not Config.HTTP_CACHE_PATH:
+        return None
+
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = HTTPCache(Config.HTTP_CACHE_PATH)
+        return _shared_cache
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Intent Classifier for Car Listing Agent
+Local n-gram model that decides whether a chat message needs a search, a refined search or just a reply
+"""
+
+import math
+from collections import Counter
+from typing import Dict, Iterable, List, Tuple
+from config import Config
+from criteria_extractor import scan_message
+from vehicle_catalog import tokenize
+
+SEARCH = 'search'
+REFINE = 'refine'
+CHAT = 'chat'
+
+# Bundled training examples; numbers become <num> and catalog/criteria matches add abstract features
+TRAINING_EXAMPLES = (
+    (SEARCH, "I'm looking for a Honda Civic under $20,000"),
+    (SEARCH, "find me a used toyota camry"),
+    (SEARCH, "show me bmw x3 listings"),
+    (SEARCH, "search for ford f-150 trucks near me"),
+    (SEARCH, "I want a 2018 or newer Honda CR-V"),
+    (SEARCH, "I need a cheap reliable sedan under 15k"),
+    (SEARCH, "any jeep wranglers for sale"),
+    (SEARCH, "what cars do you have under $10,000"),
+    (SEARCH, "looking for an suv with awd and leather seats"),
+    (SEARCH, "show me trucks with 4x4 under 60k miles"),
+    (SEARCH, "find a tesla model 3"),
+    (SEARCH, "can you search for minivans for my family"),
+    (SEARCH, "I'd like to buy a mazda cx-5"),
+    (SEARCH, "get me listings for a chevy silverado"),
+    (SEARCH, "honda accord 2019"),
+    (SEARCH, "used subaru outback with low mileage"),
+    (SEARCH, "my budget is $25,000 for a hybrid"),
+    (SEARCH, "looking to buy a car around 30k"),
+    (SEARCH, "show me available cars"),
+    (SEARCH, "find hatchbacks with a sunroof"),
+    (SEARCH, "I want a convertible for the summer"),
+    (SEARCH, "are there any kia telluride listings"),
+    (SEARCH, "toyota rav4 between $20,000 and $28,000"),
+    (SEARCH, "lexus rx with navigation and heated seats"),
+    (SEARCH, "please find me a pickup truck"),
+    (SEARCH, "what mercedes c class options are available"),
+    (SEARCH, "I'm shopping for a first car for my son"),
+    (SEARCH, "show me some used cars"),
+    (SEARCH, "search nissan rogue 2017-2020"),
+    (SEARCH, "find cars with a backup camera under 18k"),
+    (SEARCH, "I need a truck for work"),
+    (SEARCH, "we need a bigger car for the kids"),
+    (SEARCH, "need an affordable commuter car"),
+
+    (REFINE, "what about under $15,000 instead"),
+    (REFINE, "can you show me cheaper ones"),
+    (REFINE, "only ones newer than 2019"),
+    (REFINE, "same search but with awd"),
+    (REFINE, "what about the toyota version"),
+    (REFINE, "show me ones with lower mileage"),
+    (REFINE, "try a higher budget, maybe 30k"),
+    (REFINE, "how about in black"),
+    (REFINE, "can you narrow it down to automatic only"),
+    (REFINE, "any with less than 50,000 miles"),
+    (REFINE, "what about suvs instead"),
+    (REFINE, "those are too expensive, show me cheaper options"),
+    (REFINE, "now show me the 2020 models"),
+    (REFINE, "filter those to under 40k miles"),
+    (REFINE, "instead of the civic, what about the accord"),
+    (REFINE, "make it under 25k"),
+    (REFINE, "show me more like that but newer"),
+    (REFINE, "and with a sunroof"),
+    (REFINE, "search again with a max of $18,000"),
+    (REFINE, "change the year to 2021 or newer"),
+    (REFINE, "same thing but hybrid"),
+    (REFINE, "can you also include trucks"),
+    (REFINE, "do any of them have leather"),
+    (REFINE, "any of those with a third row"),
+    (REFINE, "how about a subaru"),
+    (REFINE, "how about something from kia"),
+
+    (CHAT, "hi"),
+    (CHAT, "hello there"),
+    (CHAT, "thanks!"),
+    (CHAT, "thank you so much, that's helpful"),
+    (CHAT, "ok cool"),
+    (CHAT, "what's the difference between awd and 4wd"),
+    (CHAT, "is the honda civic reliable"),
+    (CHAT, "what should I look for when buying a used car"),
+    (CHAT, "how many miles is too many for a used car"),
+    (CHAT, "do you think leasing is better than buying"),
+    (CHAT, "what does certified pre-owned mean"),
+    (CHAT, "how does financing work"),
+    (CHAT, "I'm not sure what I want yet"),
+    (CHAT, "can you explain what a cvt transmission is"),
+    (CHAT, "which is better, a sedan or an suv"),
+    (CHAT, "tell me about hybrid cars"),
+    (CHAT, "what year did the model 3 come out"),
+    (CHAT, "who are you"),
+    (CHAT, "what can you do"),
+    (CHAT, "goodbye"),
+    (CHAT, "the second one looks nice"),
+    (CHAT, "how much should I budget for insurance"),
+    (CHAT, "that makes sense"),
+    (CHAT, "I need some advice on negotiating with a dealer"),
+    (CHAT, "is 100k miles bad for a toyota"),
+    (CHAT, "what is a good price for a 2015 civic"),
+    (CHAT, "why are used car prices so high"),
+    (CHAT, "I want to know more about how this works"),
+    (CHAT, "tell me about yourself"),
+    (CHAT, "I need a minute to think about it"),
+    (CHAT, "ok bye"),
+    (CHAT, "talk to you later"),
+    (CHAT, "I'm done for today, have a good one"),
+    (CHAT, "which brands are the most reliable"),
+    (CHAT, "do hondas have good reliability"),
+    (CHAT, "are kias good cars"),
+    (CHAT, "does the ford escape hold its value"),
+    (CHAT, "does the jeep cherokee have reliability problems"),
+    (CHAT, "is a used bmw 3 series expensive to maintain"),
+    (CHAT, "is a high mileage truck worth it"),
+    (CHAT, "what's the mileage on the second listing"),
+    (CHAT, "can you give me details on that first car"),
+    (CHAT, "which of these listings is the best deal"),
+    (CHAT, "is the third one a good deal"),
+)
+
+
+def features(message: str) -> List[str]:
+    """Unigrams and bigrams of the message plus abstract features from the criteria extractor"""
+    tokens = ['<num>' if any(char.isdigit() for char in token) else token for token in tokenize(message)]
+    grams = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+    facts = scan_message(message)
+    if facts.vehicle.make:
+        grams.append('<make>')
+    if facts.vehicle.model:
+        grams.append('<model>')
+    if facts.body_type:
+        grams.append('<body>')
+    if facts.features:
+        grams.append('<feature>')
+    if any(facts.years) or any(facts.prices) or facts.mileage_max:
+        grams.append('<criteria>')
+    if facts.intent:
+        grams.append('<search-word>')
+    if not tokens:
+        grams.append('<empty>')
+    return grams
+
+
+class Intent:
+    """Classifier output: the winning label, its probability and every label's probability"""
+
+    __slots__ = ('label', 'confidence', 'scores')
+
+    def __init__(self, label: str, confidence: float, scores: Dict[str, float]):
+        self.label = label
+        self.confidence = confidence
+        self.scores = scores
+
+    @property
+    def wants_search(self) -> bool:
+        return self.label in (SEARCH, REFINE)
+
+    @property
+    def is_refinement(self) -> bool:
+        return self.label == REFINE
+
+    def __repr__(self) -> str:
+        return f"Intent({self.label!r}, confidence={self.confidence:.2f})"
+
+
+class IntentClassifier:
+    """Multinomial naive Bayes over n-gram features.
+
+    Training turns the examples into per-feature log weights once; classifying
+    is a dictionary lookup per feature. Features never seen in training are ignored.
+    """
+
+    def __init__(self, examples: Iterable[Tuple[str, str]] = TRAINING_EXAMPLES, smoothing: float = 0.5):
+        label_counts = Counter()
+        feature_counts = {}
+        for label, text in examples:
+            label_counts[label] += 1
+            feature_counts.setdefault(label, Counter()).update(features(text))
+
+        self.labels = tuple(label_counts)
+        vocabulary = set().union(*feature_counts.values())
+        total_examples = sum(label_counts.values())
+        self.priors = {label: math.log(label_counts[label] / total_examples) for label in self.labels}
+
+        self.weights = {}
+        for label in self.labels:
+            counts = feature_counts[label]
+            denominator = sum(counts.values()) + smoothing * len(vocabulary)
+            for feature in vocabulary:
+                self.weights.setdefault(feature, {})[label] = math.log((counts[feature] + smoothing) / denominator)
+
+    def scores(self, message: str) -> Dict[str, float]:
+        """Probability of each label"""
+        log_scores = dict(self.priors)
+        for feature in features(message):
+            weights = self.weights.get(feature)
+            if weights:
+                for label in self.labels:
+                    log_scores[label] += weights[label]
+
+        top = max(log_scores.values())
+        exps = {label: math.exp(score - top) for label, score in log_scores.items()}
+        total = sum(exps.values())
+        return {label: value / total for label, value in exps.items()}
+
+    def classify(self, message: str, has_previous_search: bool = False) -> Intent:
+        """Search, refine or chat; refinements need a previous search to refine.
+
+        A search is only worth running when search + refine together reach
+        INTENT_SEARCH_THRESHOLD, so borderline messages get a reply without a scrape.
+        """
+        scores = self.scores(message)
+        wants_search = scores[SEARCH] + scores[REFINE]
+
+        if wants_search < Config.INTENT_SEARCH_THRESHOLD:
+            return Intent(CHAT, scores[CHAT], scores)
+        if has_previous_search and scores[REFINE] > scores[SEARCH]:
+            return Intent(REFINE, wants_search, scores)
+        return Intent(SEARCH, wants_search, scores)
+
+
+CLASSIFIER = IntentClassifier()
+
+
+def classify_intent(message: str, has_previous_search: bool = False) -> Intent:
+    return CLASSIFIER.classify(message, has_previous_search)
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Inventory Store for Car Listing Agent
+Local SQLite inventory of scraped listings with indexed filtering by search criteria
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+from config import Config
+from dedup import listing_keys
+from listing import Listing
+
+LISTING_COLUMNS = ('title', 'price', 'mileage', 'location', 'url', 'source', 'vin',
+                   'price_value', 'mileage_value', 'year', 'make', 'model')
+# Structured criteria as (criteria key, column, comparison)
+RANGE_FILTERS = (
+    ('year_min', 'year', '>='), ('year_max', 'year', '<='),
+    ('price_min', 'price_value', '>='), ('price_max', 'price_value', '<='),
+    ('mileage_max', 'mileage_value', '<=')
+)
+
+
+def listing_id(listing: Listing) -> str:
+    """Stable primary key: the VIN, else the canonical detail URL.
+
+    Price and mileage stay out of the key so a price drop updates the row
+    instead of inserting a second one.
+    """
+    keys = listing_keys(listing)
+    identity = next((key for key in keys if key[0] in ('vin', 'url')), keys[0])
+    return hashlib.sha1(repr(identity).encode('utf-8')).hexdigest()
+
+
+def _text_terms(criteria: Dict) -> List[str]:
+    # Body type and features aren't structured fields yet, so they are matched in the title
+    return [term.lower() for term in [criteria.get('body_type')] + list(criteria.get('features') or []) if term]
+
+
+def matches_criteria(listing: Listing, criteria: Dict) -> bool:
+    """In-memory equivalent of InventoryStore.query's criteria filter"""
+    for key, column, comparison in RANGE_FILTERS:
+        if criteria.get(key) is None:
+            continue
+        value = getattr(listing, column)
+        if value is None:
+            return False
+        if comparison == '>=' and value < criteria[key] or comparison == '<=' and value > criteria[key]:
+            return False
+    title = listing.title.lower()
+    return all(term in title for term in _text_terms(criteria))
+
+
+def content_hash(listing: Listing) -> str:
+    """Fingerprint of the fields that change when a listing is updated"""
+    fields = (listing.title, listing.price, listing.mileage, listing.location, listing.url)
+    return hashlib.sha1('\x1f'.join(str(field) for field in fields).encode('utf-8')).hexdigest()
+
+
+class InventoryStore:
+    def __init__(self, db_path: str, retention: float = None):
+        self.db_path = db_path
+        self.retention = Config.INVENTORY_RETENTION if retention is None else retention
+        self._local = threading.local()
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._connection().executescript("""
+            CREATE TABLE IF NOT EXISTS listings (
+                id TEXT PRIMARY KEY,
+                title TEXT, price TEXT, mileage TEXT, location TEXT, url TEXT, source TEXT, vin TEXT,
+                price_value INTEGER, mileage_value INTEGER, year INTEGER, make TEXT, model TEXT,
+                content_hash TEXT NOT NULL,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL,
+                zip TEXT, radius INTEGER
+            );
+            CREATE INDEX IF NOT EXISTS idx_listings_make_model ON listings (make, model, last_seen);
+            CREATE INDEX IF NOT EXISTS idx_listings_year ON listings (make, year);
+            CREATE INDEX IF NOT EXISTS idx_listings_price ON listings (make, price_value);
+            CREATE INDEX IF NOT EXISTS idx_listings_mileage ON listings (make, mileage_value);
+
+            CREATE TABLE IF NOT EXISTS slices (
+                make TEXT NOT NULL,
+                model TEXT NOT NULL,
+                zip TEXT NOT NULL,
+                radius INTEGER NOT NULL,
+                refreshed_at REAL NOT NULL,
+                PRIMARY KEY (make, model, zip, radius)
+            );
+
+            CREATE TABLE IF NOT EXISTS demand (
+                make TEXT NOT NULL,
+                model TEXT NOT NULL,
+                zip TEXT NOT NULL,
+                radius INTEGER NOT NULL,
+                hits INTEGER NOT NULL,
+                last_requested REAL NOT NULL,
+                PRIMARY KEY (make, model, zip, radius)
+            );
+
+            CREATE TABLE IF NOT EXISTS watermarks (
+                make TEXT NOT NULL,
+                model TEXT NOT NULL,
+                zip TEXT NOT NULL,
+                radius INTEGER NOT NULL,
+                crawled_at REAL NOT NULL,
+                known_ids INTEGER NOT NULL,
+                full_crawled_at REAL,
+                PRIMARY KEY (make, model, zip, radius)
+            );
+        """)
+        self._migrate()
+
+    def _migrate(self) -> None:
+        """Add columns introduced after an inventory file was created"""
+        conn = self._connection()
+        added = (('listings', 'zip', 'TEXT'), ('listings', 'radius', 'INTEGER'),
+                 ('watermarks', 'full_crawled_at', 'REAL'))
+        with conn:
+            for table, column, column_type in added:
+                columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_listings_slice ON listings (make, model, zip, radius)')
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+    def upsert(self, listings: List[Listing], seen_at: float = None, zip_code: str = None,
+               radius: int = None) -> Tuple[int, int]:
+        """Insert new listings and update changed ones; returns (inserted, updated).
+
+        zip_code/radius record the search area the listings were scraped for.
+        """
+        conn = self._connection()
+        now = time.time() if seen_at is None else seen_at
+        inserted = updated = 0
+
+        with conn:
+            for listing in listings:
+                row_id = listing_id(listing)
+                fingerprint = content_hash(listing)
+                existing = conn.execute('SELECT content_hash FROM listings WHERE id = ?', (row_id,)).fetchone()
+
+                if existing is None:
+                    values = [getattr(listing, column) for column in LISTING_COLUMNS]
+                    values[LISTING_COLUMNS.index('source')] = listing.source.value
+                    conn.execute(
+                        f"INSERT INTO listings (id, {', '.join(LISTING_COLUMNS)}, content_hash, first_seen, last_seen, "
+                        f"zip, radius) VALUES ({', '.join('?' * (len(LISTING_COLUMNS) + 6))})",
+                        (row_id, *values, fingerprint, now, now, zip_code, radius)
+                    )
+                    inserted += 1
+                elif existing[0] != fingerprint:
+                    conn.execute(
+                        'UPDATE listings SET title = ?, price = ?, mileage = ?, location = ?, url = ?, vin = ?, '
+                        'price_value = ?, mileage_value = ?, year = ?, make = ?, model = ?, '
+                        'content_hash = ?, last_seen = ?, zip = ?, radius = ? WHERE id = ?',
+                        (listing.title, listing.price, listing.mileage, listing.location, listing.url, listing.vin,
+                         listing.price_value, listing.mileage_value, listing.year, listing.make, listing.model,
+                         fingerprint, now, zip_code, radius, row_id)
+                    )
+                    updated += 1
+                else:
+                    conn.execute('UPDATE listings SET last_seen = ?, zip = ?, radius = ? WHERE id = ?',
+                                 (now, zip_code, radius, row_id))
+
+        return inserted, updated
+
+    def is_unchanged(self, listing: Listing) -> bool:
+        """Whether the listing is already stored exactly as scraped"""
+        row = self._connection().execute('SELECT content_hash FROM listings WHERE id = ?',
+                                         (listing_id(listing),)).fetchone()
+        return row is not None and row[0] == content_hash(listing)
+
+    def retire_unseen(self, make: str, model: Optional[str], zip_code: str, radius: int, seen_at: float,
+                      sources: Iterable[str]) -> int:
+        """Delete listings of exactly this slice that a complete crawl at seen_at no longer returned.
+
+        Only rows from the given sources (the sites that were fully crawled) are
+        touched; a make-only slice covers just the rows without a model.
+        """
+        sources = list(sources)
+        if not sources:
+            return 0
+        with self._connection() as conn:
+            return conn.execute(
+                f"DELETE FROM listings WHERE make = ? AND model IS ? AND zip = ? AND radius = ? AND last_seen < ? "
+                f"AND source IN ({', '.join('?' * len(sources))})",
+                (make, model, zip_code, radius, seen_at, *sources)
+            ).rowcount
+
+    def mark_slice_refreshed(self, make: str, model: Optional[str], zip_code: str, radius: int) -> None:
+        with self._connection() as conn:
+            conn.execute('INSERT OR REPLACE INTO slices VALUES (?, ?, ?, ?, ?)',
+                         (make, model or '', zip_code, radius, time.time()))
+
+    def slice_age(self, make: str, model: Optional[str], zip_code: str, radius: int) -> Optional[float]:
+        """Seconds since the slice was last scraped, or None if it never was"""
+        row = self._connection().execute(
+            'SELECT refreshed_at FROM slices WHERE make = ? AND model = ? AND zip = ? AND radius = ?',
+            (make, model or '', zip_code, radius)
+        ).fetchone()
+        return time.time() - row[0] if row else None
+
+    def is_slice_fresh(self, make: str, model: Optional[str], zip_code: str, radius: int,
+                       max_age: float = None) -> bool:
+        age = self.slice_age(make, model, zip_code, radius)
+        return age is not None and age < (Config.INVENTORY_FRESH_AGE if max_age is None else max_age)
+
+    def record_demand(self, make: str, model: Optional[str], zip_code: str, radius: int) -> None:
+        """Count a search for a slice so the background crawler can keep it warm"""
+        with self._connection() as conn:
+            conn.execute(
+                'INSERT INTO demand VALUES (?, ?, ?, ?, 1, ?) '
+                'ON CONFLICT (make, model, zip, radius) DO UPDATE SET hits = hits + 1, last_requested = excluded.last_requested',
+                (make, model or '', zip_code, radius, time.time())
+            )
+
+    def popular_slices(self, limit: int, window: float) -> List[Tuple[str, Optional[str], str, int]]:
+        """Most-requested (make, model, zip, radius) slices searched within the window"""
+        rows = self._connection().execute(
+            'SELECT make, model, zip, radius FROM demand WHERE last_requested >= ? '
+            'ORDER BY hits DESC, last_requested DESC LIMIT ?',
+            (time.time() - window, limit)
+        ).fetchall()
+        return [(make, model or None, zip_code, radius) for make, model, zip_code, radius in rows]
+
+    def get_watermark(self, make: str, model: Optional[str], zip_code: str,
+                      radius: int) -> Optional[Tuple[float, Optional[float]]]:
+        """(crawled_at, full_crawled_at) of the slice's last completed and last full crawl, or None"""
+        row = self._connection().execute(
+            'SELECT crawled_at, full_crawled_at FROM watermarks '
+            'WHERE make = ? AND model = ? AND zip = ? AND radius = ?',
+            (make, model or '', zip_code, radius)
+        ).fetchone()
+        return tuple(row) if row else None
+
+    def advance_watermark(self, make: str, model: Optional[str], zip_code: str, radius: int,
+                          crawled_at: float, full: bool = False) -> int:
+        """Persist a completed crawl; returns how many listings the slice now holds"""
+        with self._connection() as conn:
+            query = 'SELECT COUNT(*) FROM listings WHERE make = ?' + (' AND model = ?' if model else '')
+            known = conn.execute(query, (make, model) if model else (make,)).fetchone()[0]
+            conn.execute(
+                'INSERT INTO watermarks VALUES (?, ?, ?, ?, ?, ?, ?) '
+                'ON CONFLICT (make, model, zip, radius) DO UPDATE SET crawled_at = excluded.crawled_at, '
+                'known_ids = excluded.known_ids, '
+                'full_crawled_at = COALESCE(excluded.full_crawled_at, full_crawled_at)',
+                (make, model or '', zip_code, radius, crawled_at, known, crawled_at if full else None)
+            )
+        return known
+
+    def query(self, make: str, model: Optional[str] = None, criteria: Dict = None,
+              limit: int = None) -> List[Listing]:
+        """Listings for a make/model matching the structured criteria, cheapest first"""
+        criteria = criteria or {}
+        clauses = ['make = ?', 'last_seen >= ?']
+        params = [make, time.time() - self.retention]
+
+        if model:
+            clauses.append('model = ?')
+            params.append(model)
+
+        for key, column, comparison in RANGE_FILTERS:
+            if criteria.get(key) is not None:
+                clauses.append(f"{column} {comparison} ?")
+                params.append(criteria[key])
+
+        for term in _text_terms(criteria):
+            clauses.append('LOWER(title) LIKE ?')
+            params.append(f"%{term}%")
+
+        params.append(limit or Config.INVENTORY_QUERY_LIMIT)
+        rows = self._connection().execute(
+            f"SELECT {', '.join(LISTING_COLUMNS)} FROM listings WHERE {' AND '.join(clauses)} "
+            f"ORDER BY price_value IS NULL, price_value, last_seen DESC LIMIT ?",
+            params
+        ).fetchall()
+
+        return [Listing.from_dict(dict(zip(LISTING_COLUMNS, row))) for row in rows]
+
+    def prune(self) -> int:
+        """Delete listings not seen within the retention period"""
+        with self._connection() as conn:
+            return conn.execute('DELETE FROM listings WHERE last_seen < ?',
+                                (time.time() - self.retention,)).rowcount
+
+
+_shared_store = None
+_shared_store_lock = threading.Lock()
+
+
+def get_inventory_store() -> Optional[InventoryStore]:
+    """Return the process-wide inventory store, or None when INVENTORY_DB_PATH is empty"""
+    global _shared_store
+
+    if not Config.INVENTORY_DB_PATH:
+        return None
+
+    with _shared_store_lock:
+        if _shared_store is None:
+            _shared_store = InventoryStore(Config.INVENTORY_DB_PATH)
+        return _shared_store
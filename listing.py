@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Listing model for Car Listing Agent
+Compact listing record with numeric fields parsed once at scrape time
+"""
+
+import re
+import sys
+from enum import Enum
+from typing import Dict, Optional
+from vehicle_catalog import find_vehicle, tokenize
+
+NOT_AVAILABLE = 'N/A'
+
+PRICE_RE = re.compile(r'\$\s*(\d[\d,]*(?:\.\d+)?)\s*([kK])?|(\d[\d,]{3,})')
+MILEAGE_RE = re.compile(r'(\d[\d,]*(?:\.\d+)?)\s*([kK])?\s*(?:mi\b|mi\.|miles?)', re.I)
+YEAR_RE = re.compile(r'\b(19[5-9]\d|20[0-4]\d)\b')
+
+
+class Source(str, Enum):
+    CARS_COM = 'cars.com'
+    AUTOTRADER = 'autotrader.com'
+    DEMO = 'Mock Data (Demo)'
+    OTHER = 'other'
+
+    @classmethod
+    def parse(cls, value) -> 'Source':
+        try:
+            return cls(value)
+        except ValueError:
+            return cls.OTHER
+
+
+def _to_int(number: str, thousands: Optional[str]) -> Optional[int]:
+    try:
+        value = float(number.replace(',', ''))
+    except ValueError:
+        return None
+    return int(value * 1000) if thousands else int(value)
+
+
+def parse_price(text: str) -> Optional[int]:
+    """'$18,500' -> 18500; None when no price is present"""
+    if not text or text == NOT_AVAILABLE:
+        return None
+    match = PRICE_RE.search(text)
+    if not match:
+        return None
+    if match.group(1):
+        return _to_int(match.group(1), match.group(2))
+    return _to_int(match.group(3), None)
+
+
+def parse_mileage(text: str) -> Optional[int]:
+    """'45,000 miles' / '45K mi.' -> 45000; None when no mileage is present"""
+    if not text or text == NOT_AVAILABLE:
+        return None
+    match = MILEAGE_RE.search(text)
+    if match:
+        return _to_int(match.group(1), match.group(2))
+    digits = text.replace(',', '').strip()
+    return int(digits) if digits.isdigit() else None
+
+
+def parse_title(title: str):
+    """Extract (year, make, model) from a listing title like '2020 Honda Civic LX'"""
+    if not title or title == NOT_AVAILABLE:
+        return None, None, None
+
+    year_match = YEAR_RE.search(title)
+    year = int(year_match.group(1)) if year_match else None
+
+    tokens = tokenize(title)
+    vehicle = find_vehicle(tokens)
+    if not vehicle.make:
+        return year, None, None
+
+    # Models missing from the catalog fall back to the word after the make
+    model = vehicle.model
+    if model is None and vehicle.make_end < len(tokens):
+        model = sys.intern(tokens[vehicle.make_end])
+    return year, vehicle.make, model
+
+
+class Listing:
+    """A single car listing.
+
+    Display strings are kept as scraped for rendering; price, mileage, year,
+    make and model are parsed once so filtering, deduplication and analysis
+    never re-run regexes over the strings.
+    """
+
+    __slots__ = ('title', 'price', 'mileage', 'location', 'url', 'source', 'vin',
+                 'price_value', 'mileage_value', 'year', 'make', 'model')
+
+    def __init__(self, title: str = NOT_AVAILABLE, price: str = NOT_AVAILABLE, mileage: str = NOT_AVAILABLE,
+                 location: str = NOT_AVAILABLE, url: str = NOT_AVAILABLE, source=Source.OTHER,
+                 vin: Optional[str] = None):
+        self.title = title
+        self.price = price
+        self.mileage = mileage
+        self.location = location
+        self.url = url
+        self.source = Source.parse(source)
+        self.vin = vin.upper() if vin else None
+
+        self.price_value = parse_price(price)
+        self.mileage_value = parse_mileage(mileage)
+        self.year, self.make, self.model = parse_title(title)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Listing':
+        """Build a listing from a raw scraped dict or from to_dict() output.
+
+        Dicts produced by to_dict() already carry the parsed fields, so they are
+        restored as-is instead of being parsed a second time.
+        """
+        if 'price_value' not in data:
+            return cls(
+                title=data.get('title') or NOT_AVAILABLE,
+                price=data.get('price') or NOT_AVAILABLE,
+                mileage=data.get('mileage') or NOT_AVAILABLE,
+                location=data.get('location') or NOT_AVAILABLE,
+                url=data.get('url') or NOT_AVAILABLE,
+                source=data.get('source', Source.OTHER),
+                vin=data.get('vin')
+            )
+
+        listing = cls.__new__(cls)
+        for field in cls.__slots__:
+            setattr(listing, field, data.get(field))
+        listing.source = Source.parse(listing.source)
+        if listing.make:
+            listing.make = sys.intern(listing.make)
+        if listing.model:
+            listing.model = sys.intern(listing.model)
+        return listing
+
+    def completeness(self) -> float:
+        """Share of the searchable fields that were scraped, from 0.0 to 1.0"""
+        fields = (self.price_value, self.mileage_value, self.year, self.make, self.model)
+        present = sum(field is not None for field in fields)
+        present += sum(value not in (None, NOT_AVAILABLE) for value in (self.location, self.url))
+        return present / (len(fields) + 2)
+
+    def to_dict(self) -> Dict:
+        """JSON-ready representation used by the API responses"""
+        return {
+            'title': self.title,
+            'price': self.price,
+            'mileage': self.mileage,
+            'location': self.location,
+            'url': self.url,
+            'source': self.source.value,
+            'vin': self.vin,
+            'price_value': self.price_value,
+            'mileage_value': self.mileage_value,
+            'year': self.year,
+            'make': self.make,
+            'model': self.model
+        }
+
+    def __repr__(self) -> str:
+        return f"Listing({self.title!r}, {self.price!r}, {self.source.value!r})"
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+LLM Response Cache for Car Listing Agent
+Caches completions by model, temperature and normalized prompt, with optional similarity lookup
+"""
+
+import hashlib
+import json
+import math
+import re
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from config import Config
+from query_parser import parse_query
+from result_cache import TTLCache, FRESH
+
+WHITESPACE_RE = re.compile(r'\s+')
+THOUSANDS_RE = re.compile(r'(\d+(?:\.\d+)?)\s*k\b')
+NUMBER_RE = re.compile(r'(?:\$\s*)?(\d{1,3}(?:,\d{3})+|\d+(?:\.\d+)?)')
+WORD_RE = re.compile(r'[a-z0-9]+')
+
+
+def _plain_number(match) -> str:
+    return match.group(1).replace(',', '')
+
+
+def normalize_prompt(text: str) -> str:
+    """Fold case, whitespace and price spellings so '$20,000' and '20k' hash the same"""
+    text = text.lower()
+    text = THOUSANDS_RE.sub(lambda m: str(int(float(m.group(1)) * 1000)), text)
+    text = NUMBER_RE.sub(_plain_number, text)
+    return WHITESPACE_RE.sub(' ', text).strip()
+
+
+def request_key(request: Dict, blank: str = None) -> str:
+    """Hash of everything that shapes a completion; ``blank`` is removed from the messages first"""
+    blank = normalize_prompt(blank) if blank else None
+    messages = []
+    for message in request.get('messages', []):
+        content = normalize_prompt(message.get('content') or '')
+        if blank:
+            content = content.replace(blank, '')
+        messages.append((message.get('role'), content))
+
+    payload = json.dumps([request.get('model'), request.get('temperature'), request.get('max_tokens'), messages],
+                         separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class HashingEmbedder:
+    """Local bag-of-features embedder: words and character trigrams hashed into a fixed vector.
+
+    Good enough to match rephrasings of short queries without an embeddings API.
+    Anything with an ``embed(text) -> List[float]`` method can replace it.
+    """
+
+    def __init__(self, dimensions: int = 256):
+        self.dimensions = dimensions
+
+    def _bucket(self, feature: str) -> int:
+        return zlib.crc32(feature.encode('utf-8')) % self.dimensions
+
+    def embed(self, text: str) -> List[float]:
+        vector = [0.0] * self.dimensions
+        for word in WORD_RE.findall(normalize_prompt(text)):
+            vector[self._bucket(word)] += 1.0
+            padded = f" {word} "
+            for i in range(len(padded) - 2):
+                vector[self._bucket(padded[i:i + 3])] += 0.5
+
+        norm = math.sqrt(sum(value * value for value in vector))
+        return [value / norm for value in vector] if norm else vector
+
+
+class VectorIndex:
+    """Bounded in-memory index of unit vectors, searched by cosine similarity within a scope"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._scopes = {}
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, scope: str, key: str, vector: List[float]) -> None:
+        with self._lock:
+            self._scopes.setdefault(scope, {})[key] = vector
+            self._entries[key] = scope
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                old_key, old_scope = self._entries.popitem(last=False)
+                self._discard(old_scope, old_key)
+
+    def remove(self, scope: str, key: str) -> None:
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self._discard(scope, key)
+
+    def _discard(self, scope: str, key: str) -> None:
+        vectors = self._scopes.get(scope)
+        if vectors is not None:
+            vectors.pop(key, None)
+            if not vectors:
+                del self._scopes[scope]
+
+    def nearest(self, scope: str, vector: List[float]) -> Tuple[Optional[str], float]:
+        """Most similar key in the scope and its cosine similarity"""
+        best_key, best_score = None, 0.0
+        with self._lock:
+            for key, candidate in self._scopes.get(scope, {}).items():
+                score = sum(a * b for a, b in zip(vector, candidate))
+                if score > best_score:
+                    best_key, best_score = key, score
+        return best_key, best_score
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class LLMCache:
+    """Completion cache with exact lookups on the normalized request and optional similarity lookups.
+
+    Similarity lookups only apply to calls that name the free-text part of the prompt
+    (``similar_to``); the rest of the request, the catalog make/model and every number
+    in that text must still match exactly, so "2018 civic" never answers for
+    "2019 civic" and a Civic answer never serves a Corolla query.
+    """
+
+    def __init__(self, max_entries: int = None, ttl: float = None, embedder=None,
+                 similarity_threshold: float = None):
+        self.ttl = Config.LLM_CACHE_TTL if ttl is None else ttl
+        self.embedder = embedder
+        self.similarity_threshold = (Config.LLM_CACHE_SIMILARITY if similarity_threshold is None
+                                     else similarity_threshold)
+        max_entries = max_entries or Config.LLM_CACHE_MAX_ENTRIES
+        self._responses = TTLCache(max_entries)
+        self._index = VectorIndex(max_entries) if embedder else None
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+
+    def _scope(self, request: Dict, similar_to: str) -> str:
+        numbers = sorted(NUMBER_RE.findall(normalize_prompt(similar_to)))
+        parsed = parse_query(similar_to)
+        vehicle = f"{parsed.make or ''}/{parsed.model or ''}"
+        return f"{request_key(request, blank=similar_to)}:{vehicle}:{','.join(numbers)}"
+
+    def _count(self, counter: str) -> None:
+        with self._stats_lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def get(self, request: Dict, similar_to: str = None) -> Optional[str]:
+        """Cached completion text for the request, or None"""
+        text, state = self._responses.get(request_key(request))
+        if state == FRESH:
+            self._count('hits')
+            return text
+
+        if self._index is not None and similar_to:
+            scope = self._scope(request, similar_to)
+            key, score = self._index.nearest(scope, self.embedder.embed(similar_to))
+            if key is not None and score >= self.similarity_threshold:
+                text, state = self._responses.get(key)
+                if state == FRESH:
+                    print(f"⚡ Using cached LLM response for a similar prompt (similarity {score:.2f})")
+                    self._count('similar_hits')
+                    return text
+                # Expired or evicted from the response cache
+                self._index.remove(scope, key)
+
+        self._count('misses')
+        return None
+
+    def set(self, request: Dict, text: str, similar_to: str = None) -> None:
+        key = request_key(request)
+        self._responses.set(key, text, self.ttl)
+        if self._index is not None and similar_to:
+            self._index.add(self._scope(request, similar_to), key, self.embedder.embed(similar_to))
+
+    def clear(self) -> None:
+        self._responses.clear()
+        if self._index is not None:
+            self._index = VectorIndex(self._index.max_entries)
+
+    def stats(self) -> Dict:
+        """Hit/miss counters for health and debugging output"""
+        with self._stats_lock:
+            lookups = self.hits + self.similar_hits + self.misses
+            return {
+                'entries': self._responses.stats()['entries'],
+                'hits': self.hits,
+                'similar_hits': self.similar_hits,
+                'misses': self.misses,
+                'hit_rate': round((self.hits + self.similar_hits) / lookups, 3) if lookups else 0.0
+            }
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[LLMCache]:
+    """Return the process-wide completion cache, or None when LLM_CACHE_ENABLED is off"""
+    global _shared_cache
+
+    if not Config.LLM_CACHE_ENABLED:
+        return None
+
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            embedder = HashingEmbedder() if Config.LLM_CACHE_SEMANTIC else None
+            _shared_cache = LLMCache(embedder=embedder)
+        return _shared_cache
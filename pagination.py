@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Paginated Crawl for Car Listing Agent
+Fetches result pages 2..N concurrently after page 1 and streams listings as pages finish
+"""
+
+import threading
+from concurrent.futures import FIRST_COMPLETED, wait
+from typing import Callable, Iterator, List, Optional
+from url_strategy import AttemptCancelled
+
+
+def crawl_pages(fetch_page: Callable[[int, threading.Event], List], executor, max_pages: int,
+                concurrency: int, target: Optional[int] = None,
+                is_wanted: Callable = None, keys: Callable = None, is_stale_page: Callable = None,
+                status: Optional[dict] = None) -> Iterator:
+    """Yield items from result pages as each page is parsed.
+
+    fetch_page(page, cancel_event) returns the items on a 1-based page. Page 1 is
+    fetched first; if it has results, pages 2..max_pages run on executor with at
+    most ``concurrency`` in flight, and items are yielded in page completion order.
+    An empty page marks the end of the results, so no later pages are started.
+    Crawling stops once ``target`` items satisfying is_wanted have been yielded.
+    Items sharing any key from keys(item) with an earlier item are skipped.
+    For results sorted newest first, is_stale_page(items) returning True marks
+    a page with nothing new on it: its items are kept, but no later pages are
+    started.
+
+    If status is given, status['complete'] ends up True only when every page was
+    fetched without error up to an empty page, i.e. the items cover the whole
+    result set rather than a target, max_pages or error-truncated prefix of it.
+    """
+    cancel_event = threading.Event()
+    seen = set()
+    wanted = 0
+    failed = False
+    if status is not None:
+        status['complete'] = False
+
+    def accept(items: List) -> Iterator:
+        nonlocal wanted
+        for item in items:
+            if keys is not None:
+                item_keys = keys(item)
+                if any(key in seen for key in item_keys):
+                    continue
+                seen.update(item_keys)
+            yield item
+            if is_wanted is None or is_wanted(item):
+                wanted += 1
+                if done():
+                    return
+
+    def done() -> bool:
+        return target is not None and wanted >= target
+
+    def fetch(page: int) -> List:
+        try:
+            return fetch_page(page, cancel_event)
+        except AttemptCancelled:
+            return []
+
+    def is_last(items: List) -> bool:
+        nonlocal stale
+        stale = stale or (is_stale_page is not None and is_stale_page(items))
+        return stale
+
+    stale = False
+    first_page = fetch(1)
+    yield from accept(first_page)
+    if not first_page or done() or is_last(first_page):
+        return
+
+    next_page = 2
+    last_page = max_pages
+    pending = {}
+
+    try:
+        while next_page <= last_page or pending:
+            while next_page <= last_page and len(pending) < concurrency:
+                pending[executor.submit(fetch, next_page)] = next_page
+                next_page += 1
+
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                page = pending.pop(future)
+                try:
+                    items = future.result()
+                except Exception as e:
+                    print(f"❌ Error fetching results page {page}: {e}")
+                    failed = True
+                    continue
+
+                if not items:
+                    # Past the end of the results; later pages will be empty too
+                    last_page = min(last_page, page - 1)
+                    continue
+
+                if is_last(items):
+                    last_page = min(last_page, page)
+                yield from accept(items)
+                if done():
+                    return
+
+        if status is not None:
+            status['complete'] = not failed and not stale and last_page < max_pages
+    finally:
+        # Early stop or an abandoned generator: skip queued pages and stop in-flight ones
+        cancel_event.set()
+        for future in pending:
+            future.cancel()
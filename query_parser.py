@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Query Parser for Car Listing Agent
+Resolves make, model, year and price from a search query without calling the LLM
+"""
+
+import re
+from functools import lru_cache
+from typing import Optional, Tuple
+from vehicle_catalog import display_make, display_model, resolve_vehicle, scan, tokenize
+
+YEAR = r'(19[5-9]\d|20[0-4]\d)'
+AMOUNT = r'(\$)?\s*(\d[\d,]*(?:\.\d+)?)\s*(k\b|thousand\b)?'
+# Also rules out backtracking into '60' of '60k miles'
+NOT_MILES = r'(?![\d,]|\.\d|\s*(?:k|thousand)?\s*(?:mi\b|mi\.|miles?\b))'
+
+YEAR_RANGE_RE = re.compile(rf'\b{YEAR}\s*(?:-|to|through)\s*{YEAR}\b')
+YEAR_MIN_RE = re.compile(rf'\b{YEAR}\s*(?:\+|or\s+newer|and\s+(?:up|newer)|or\s+later)|\b(?:after|newer\s+than|since|from)\s+{YEAR}\b')
+YEAR_MAX_RE = re.compile(rf'\b{YEAR}\s*(?:or|and)\s+older|\b(?:before|older\s+than)\s+{YEAR}\b')
+YEAR_RE = re.compile(rf'\b{YEAR}\b')
+
+# The lookahead lets the scan skip positions that can't start an amount
+PRICE_RANGE_RE = re.compile(rf'(?=[$\d]){AMOUNT}\s*(?:-|to|and)\s*{AMOUNT}{NOT_MILES}')
+PRICE_MAX_RE = re.compile(rf'\b(?:under|below|less\s+than|max(?:imum)?|up\s+to|budget(?:\s+of)?|no\s+more\s+than|cheaper\s+than)\s+{AMOUNT}{NOT_MILES}')
+PRICE_MIN_RE = re.compile(rf'\b(?:over|above|more\s+than|at\s+least|starting\s+at)\s+{AMOUNT}{NOT_MILES}')
+PRICE_RE = re.compile(rf'\$\s*(\d[\d,]*(?:\.\d+)?)\s*(k\b|thousand\b)?{NOT_MILES}')
+
+# Words that follow a make without being a model ("honda under 20k", "ford trucks")
+NON_MODEL_WORDS = frozenset({
+    'a', 'an', 'and', 'around', 'at', 'below', 'between', 'budget', 'car', 'cars', 'cheap', 'convertible',
+    'coupe', 'for', 'from', 'hatchback', 'in', 'less', 'like', 'listings', 'max', 'minivan', 'more',
+    'near', 'new', 'or', 'over', 'pickup', 'sedan', 'sedans', 'suv', 'suvs', 'than', 'that', 'the', 'to',
+    'truck', 'trucks', 'under', 'up', 'used', 'versus', 'vs', 'wagon', 'with', 'within'
+})
+
+# Body style and feature words kept in the normalized query, as they are displayed
+SEARCH_TERMS = {
+    'suv': 'SUV', 'suvs': 'SUV', 'truck': 'truck', 'trucks': 'truck', 'pickup': 'pickup',
+    'sedan': 'sedan', 'sedans': 'sedan', 'coupe': 'coupe', 'hatchback': 'hatchback',
+    'convertible': 'convertible', 'wagon': 'wagon', 'minivan': 'minivan', 'van': 'van',
+    'awd': 'AWD', '4wd': '4WD', '4x4': '4x4', 'hybrid': 'hybrid', 'electric': 'electric',
+    'diesel': 'diesel', 'manual': 'manual', 'automatic': 'automatic'
+}
+
+# Filler and price/year phrasing that a make-only query can contain without losing meaning
+QUERY_WORDS = NON_MODEL_WORDS | frozenset({
+    'about', 'above', 'after', 'before', 'cheaper', 'dollars', 'find', 'i', 'im', 'least', 'later',
+    'looking', 'maximum', 'me', 'mi', 'miles', 'need', 'newer', 'no', 'of', 'older', 'price', 'priced',
+    'show', 'since', 'starting', 'through', 'k', 'thousand', 'want', 'year', 'years'
+})
+
+
+class ParsedQuery:
+    """What a search query asks for, with how sure the parser is about it"""
+
+    __slots__ = ('make', 'model', 'year_min', 'year_max', 'price_min', 'price_max', 'confidence', 'terms')
+
+    def __init__(self, make: Optional[str] = None, model: Optional[str] = None,
+                 year_min: Optional[int] = None, year_max: Optional[int] = None,
+                 price_min: Optional[int] = None, price_max: Optional[int] = None, confidence: float = 0.0,
+                 terms: Tuple[str, ...] = ()):
+        self.make = make
+        self.model = model
+        self.terms = terms
+        self.year_min = year_min
+        self.year_max = year_max
+        self.price_min = price_min
+        self.price_max = price_max
+        self.confidence = confidence
+
+    def search_query(self) -> str:
+        """Normalized query text, e.g. '2018 or newer Honda CR-V AWD under $25,000'"""
+        parts = []
+
+        if self.year_min and self.year_min == self.year_max:
+            parts.append(str(self.year_min))
+        elif self.year_min and self.year_max:
+            parts.append(f"{self.year_min}-{self.year_max}")
+        elif self.year_min:
+            parts.append(f"{self.year_min} or newer")
+        elif self.year_max:
+            parts.append(f"{self.year_max} or older")
+
+        if self.make:
+            parts.append(display_make(self.make))
+        if self.model:
+            parts.append(display_model(self.model))
+        parts.extend(self.terms)
+
+        if self.price_min and self.price_max:
+            parts.append(f"${self.price_min:,}-${self.price_max:,}")
+        elif self.price_max:
+            parts.append(f"under ${self.price_max:,}")
+        elif self.price_min:
+            parts.append(f"over ${self.price_min:,}")
+
+        return ' '.join(parts)
+
+    def __repr__(self) -> str:
+        return f"ParsedQuery({self.search_query()!r}, confidence={self.confidence:.2f})"
+
+
+def _amount(dollar: Optional[str], number: str, thousands: Optional[str]) -> Optional[int]:
+    """Dollar amount from a regex match; bare years and tiny numbers without units are not prices"""
+    value = float(number.replace(',', ''))
+    if thousands or (not dollar and value < 1000):
+        # "under 20" almost always means $20k
+        value *= 1000
+    elif not dollar and 1950 <= value < 2050:
+        return None
+    return int(value) if value else None
+
+
+def parse_years(text: str) -> Tuple[Optional[int], Optional[int]]:
+    """(year_min, year_max) from lowercased text"""
+    match = YEAR_RANGE_RE.search(text)
+    if match:
+        return int(match.group(1)), int(match.group(2))
+    match = YEAR_MIN_RE.search(text)
+    if match:
+        return int(match.group(1) or match.group(2)), None
+    match = YEAR_MAX_RE.search(text)
+    if match:
+        return None, int(match.group(1) or match.group(2))
+    match = YEAR_RE.search(text)
+    if match:
+        return int(match.group(1)), int(match.group(1))
+    return None, None
+
+
+def parse_prices(text: str) -> Tuple[Optional[int], Optional[int]]:
+    """(price_min, price_max) in dollars from lowercased text"""
+    for match in PRICE_RANGE_RE.finditer(text):
+        # Needs a $ or k on at least one side so "2015-2019" stays a year range
+        if match.group(1) or match.group(3) or match.group(4) or match.group(6):
+            low = _amount(match.group(1) or match.group(4), match.group(2), match.group(3) or match.group(6))
+            high = _amount(match.group(4) or match.group(1), match.group(5), match.group(6) or match.group(3))
+            if low and high:
+                return min(low, high), max(low, high)
+    match = PRICE_MAX_RE.search(text)
+    if match:
+        return None, _amount(*match.groups())
+    match = PRICE_MIN_RE.search(text)
+    if match:
+        return _amount(*match.groups()), None
+    match = PRICE_RE.search(text)
+    if match:
+        return None, _amount('$', *match.groups())
+    return None, None
+
+
+@lru_cache(maxsize=1024)
+def parse_query(query: str) -> ParsedQuery:
+    """Parse a search query; treat the result as read-only since it is shared.
+
+    Confidence is 1.0 for a make with a catalog model, 0.95 when a model alone
+    implies the make, 0.7 for a make followed by an unknown model, 0.6 for a make
+    alone and 0 when no make is found. A make alone with other words the parser
+    can't place ("honda with heated seats") drops to 0.4, and queries naming
+    several makes (comparisons) are capped at 0.3, so both go to the LLM.
+    """
+    text = query.lower()
+    tokens = tokenize(query)
+    mentions = scan(tokens)
+    vehicle = resolve_vehicle(mentions)
+
+    model = vehicle.model
+    if vehicle.model_known:
+        confidence = 0.95 if vehicle.make_implied else 1.0
+    elif vehicle.make:
+        # An uncatalogued model usually follows the make directly
+        following = tokens[vehicle.make_end] if vehicle.make_end < len(tokens) else None
+        if (following and following not in NON_MODEL_WORDS and following not in SEARCH_TERMS
+                and not following[0].isdigit()):
+            model = following
+            confidence = 0.7
+        else:
+            confidence = 0.6
+            matched = {i for start, end, _ in mentions for i in range(start, end)}
+            if any(i not in matched and token not in QUERY_WORDS and token not in SEARCH_TERMS
+                   and not token[0].isdigit() for i, token in enumerate(tokens)):
+                confidence = 0.4
+    else:
+        confidence = 0.0
+
+    if len(vehicle.makes) > 1:
+        confidence = min(confidence, 0.3)
+
+    year_min, year_max = parse_years(text)
+    price_min, price_max = parse_prices(text)
+
+    terms = tuple(dict.fromkeys(SEARCH_TERMS[token] for token in tokens if token in SEARCH_TERMS))
+
+    return ParsedQuery(vehicle.make, model, year_min, year_max, price_min, price_max, confidence, terms)
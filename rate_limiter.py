@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Rate Limiter for Car Listing Agent
+Per-host token buckets that pace scraper requests and back off on 429/Retry-After
+"""
+
+import os
+import random
+import sqlite3
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from config import Config
+
+# Status codes that mean the site wants us to slow down
+THROTTLE_STATUS_CODES = (429, 503)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Convert a Retry-After header (seconds or HTTP date) into seconds to wait"""
+    if not value:
+        return None
+
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucketLimiter:
+    """Per-host token buckets shared by every thread in this process"""
+
+    def __init__(self, rate: float = None, burst: float = None, jitter: float = None):
+        self.rate = rate or Config.RATE_LIMIT_PER_SECOND
+        self.burst = burst or Config.RATE_LIMIT_BURST
+        self.jitter = Config.RATE_LIMIT_JITTER if jitter is None else jitter
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def _new_state(self, now: float) -> Dict:
+        return {'tokens': self.burst, 'updated_at': now, 'blocked_until': 0.0, 'rate_scale': 1.0}
+
+    def _with_state(self, host: str, update) -> float:
+        """Apply update(state, now) to the host's bucket atomically and return its result"""
+        with self._lock:
+            now = time.time()
+            state = self._buckets.setdefault(host, self._new_state(now))
+            return update(state, now)
+
+    def _take_token(self, state: Dict, now: float) -> float:
+        """Consume a token if one is available, otherwise return the seconds to wait"""
+        rate = self.rate * state['rate_scale']
+        state['tokens'] = min(self.burst, state['tokens'] + (now - state['updated_at']) * rate)
+        state['updated_at'] = now
+
+        if now < state['blocked_until']:
+            return state['blocked_until'] - now
+
+        if state['tokens'] >= 1:
+            state['tokens'] -= 1
+            return 0.0
+
+        return (1 - state['tokens']) / rate
+
+    def acquire(self, host: str) -> float:
+        """Block until the host has request budget; returns the total time waited"""
+        waited = 0.0
+        while True:
+            wait = self._with_state(host, self._take_token)
+            if wait <= 0:
+                break
+            time.sleep(wait)
+            waited += wait
+
+        # Small jitter so requests don't land on an exact cadence
+        if self.jitter:
+            pause = random.uniform(0, self.jitter)
+            time.sleep(pause)
+            waited += pause
+
+        return waited
+
+    def record_response(self, host: str, status_code: int, retry_after: Optional[str] = None) -> None:
+        """Slow a host down after throttling responses and recover gradually on success"""
+        if status_code in THROTTLE_STATUS_CODES:
+            delay = parse_retry_after(retry_after)
+            if delay is None:
+                delay = Config.RATE_LIMIT_BACKOFF
+
+            def penalize(state, now):
+                state['blocked_until'] = max(state['blocked_until'], now + delay)
+                state['rate_scale'] = max(Config.RATE_LIMIT_MIN_SCALE, state['rate_scale'] / 2)
+                state['tokens'] = 0.0
+                return 0.0
+
+            print(f"Throttled by {host} ({status_code}), pausing {delay:.0f}s")
+            self._with_state(host, penalize)
+        elif status_code < 400:
+            def recover(state, now):
+                state['rate_scale'] = min(1.0, state['rate_scale'] * 1.25)
+                return 0.0
+
+            self._with_state(host, recover)
+
+
+class SQLiteTokenBucketLimiter(TokenBucketLimiter):
+    """Token buckets kept in a SQLite file so several worker processes share one budget"""
+
+    def __init__(self, db_path: str, rate: float = None, burst: float = None, jitter: float = None):
+        super().__init__(rate, burst, jitter)
+        self.db_path = db_path
+        self._local = threading.local()
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = self._connection()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS rate_limits (
+                host TEXT PRIMARY KEY,
+                tokens REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                blocked_until REAL NOT NULL,
+                rate_scale REAL NOT NULL
+            )
+        """)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+    def _with_state(self, host: str, update) -> float:
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            now = time.time()
+            row = conn.execute(
+                'SELECT tokens, updated_at, blocked_until, rate_scale FROM rate_limits WHERE host = ?',
+                (host,)
+            ).fetchone()
+
+            if row:
+                state = dict(zip(('tokens', 'updated_at', 'blocked_until', 'rate_scale'), row))
+            else:
+                state = self._new_state(now)
+
+            result = update(state, now)
+            conn.execute(
+                'INSERT OR REPLACE INTO rate_limits VALUES (?, ?, ?, ?, ?)',
+                (host, state['tokens'], state['updated_at'], state['blocked_until'], state['rate_scale'])
+            )
+            conn.execute('COMMIT')
+            return result
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+
+_shared_limiter = None
+_shared_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> TokenBucketLimiter:
+    """Return the process-wide limiter, backed by SQLite when RATE_LIMIT_DB is set"""
+    global _shared_limiter
+
+    with _shared_limiter_lock:
+        if _shared_limiter is None:
+            if Config.RATE_LIMIT_DB:
+                _shared_limiter = SQLiteTokenBucketLimiter(Config.RATE_LIMIT_DB)
+            else:
+                _shared_limiter = TokenBucketLimiter()
+        return _shared_limiter
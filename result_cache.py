@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Result Cache for Car Listing Agent
+Thread-safe LRU cache with per-entry TTLs and an optional stale window
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+from config import Config
+
+FRESH = 'fresh'
+STALE = 'stale'
+
+
+class TTLCache:
+    """LRU cache whose entries expire after their own TTL.
+
+    Expired entries are kept for ``stale_ttl`` more seconds so callers can serve
+    them while a refresh runs in the background (stale-while-revalidate).
+    """
+
+    def __init__(self, max_entries: int, stale_ttl: float = 0):
+        self.max_entries = max_entries
+        self.stale_ttl = stale_ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Tuple[Optional[Any], Optional[str]]:
+        """Return (value, FRESH/STALE), or (None, None) on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None, None
+
+            value, expires_at = entry
+            now = time.time()
+            if now < expires_at:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value, FRESH
+
+            if now < expires_at + self.stale_ttl:
+                self._entries.move_to_end(key)
+                self.stale_hits += 1
+                return value, STALE
+
+            del self._entries[key]
+            self.misses += 1
+            return None, None
+
+    def set(self, key: Hashable, value: Any, ttl: float) -> None:
+        """Store a value, evicting the least recently used entries over the size limit"""
+        with self._lock:
+            self._entries[key] = (value, time.time() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        """Hit/miss counters for health and debugging output"""
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'stale_hits': self.stale_hits,
+                'misses': self.misses,
+                'hit_rate': round((self.hits + self.stale_hits) / lookups, 3) if lookups else 0.0
+            }
+
+
+_search_cache = None
+_search_cache_lock = threading.Lock()
+
+
+def get_search_cache() -> TTLCache:
+    """Return the process-wide cache of per-site search results"""
+    global _search_cache
+
+    with _search_cache_lock:
+        if _search_cache is None:
+            _search_cache = TTLCache(Config.RESULT_CACHE_MAX_ENTRIES, Config.RESULT_CACHE_STALE_TTL)
+        return _search_cache
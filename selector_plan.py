@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Selector Plans for Car Listing Agent
+Precompiled CSS selector fallback chains tried in priority order
+"""
+
+import threading
+from typing import Callable, Iterable, List, Optional, Tuple
+import soupsieve
+
+
+class SelectorPlan:
+    """An ordered list of CSS selectors compiled once and shared by every parse.
+
+    Selectors are always tried in their listed order, most precise first, so the
+    result for a card never depends on which cards were parsed before it. A page
+    can narrow the chain to the selectors that match anything on it (live()),
+    which skips the ones that already missed without changing the outcome.
+    """
+
+    def __init__(self, name: str, selectors: List[str]):
+        self.name = name
+        self.selectors = list(selectors)
+        self._compiled = [soupsieve.compile(selector) for selector in self.selectors]
+        self.hits = [0] * len(self.selectors)
+        self._lock = threading.Lock()
+
+    def _record(self, i: int) -> None:
+        with self._lock:
+            self.hits[i] += 1
+
+    def live(self, root) -> Tuple[int, ...]:
+        """Indexes of the selectors that match at least one element under root, in order"""
+        return tuple(i for i, compiled in enumerate(self._compiled) if compiled.select_one(root) is not None)
+
+    def select_one(self, element, accept: Callable = None, candidates: Iterable[int] = None):
+        """Return the first match, optionally requiring accept(match) to be true.
+
+        candidates limits the chain to those indexes, e.g. the live() selectors of the page.
+        """
+        for i in range(len(self._compiled)) if candidates is None else candidates:
+            match = self._compiled[i].select_one(element)
+            if match is not None and (accept is None or accept(match)):
+                self._record(i)
+                return match
+        return None
+
+    def select(self, element, min_count: int = 1) -> Tuple[List, Optional[str]]:
+        """Return (matches, selector) for the first selector with at least min_count matches"""
+        for i, compiled in enumerate(self._compiled):
+            matches = compiled.select(element)
+            if len(matches) >= min_count:
+                self._record(i)
+                return matches, self.selectors[i]
+        return [], None
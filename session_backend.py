@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Session Backends for Car Listing Agent
+Versioned chat session storage shared by every worker process: in-memory, SQLite or Redis
+"""
+
+import json
+import os
+from abc import ABC, abstractmethod
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from config import Config
+from listing import Listing
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+
+class SessionConflict(Exception):
+    """A session kept changing under a read-modify-write until the retries ran out"""
+
+
+def encode_session(session: Dict) -> bytes:
+    """Compact zlib-compressed JSON; listings are stored via Listing.to_dict()"""
+    data = dict(session)
+    if data.get("last_search"):
+        data["last_search"] = {**data["last_search"],
+                               "results": [listing.to_dict() for listing in data["last_search"]["results"]]}
+    return zlib.compress(json.dumps(data, separators=(',', ':')).encode('utf-8'))
+
+
+def decode_session(blob: bytes) -> Dict:
+    session = json.loads(zlib.decompress(blob).decode('utf-8'))
+    if session.get("last_search"):
+        session["last_search"]["results"] = tuple(Listing.from_dict(item)
+                                                  for item in session["last_search"]["results"])
+    return session
+
+
+class SessionBackend(ABC):
+    """Stores chat sessions with a version number for optimistic concurrency.
+
+    load() returns (session, version), with version 0 for a missing session.
+    save() only writes when the stored version still equals the one loaded,
+    and returns False otherwise so the caller can reload and retry.
+    """
+
+    @abstractmethod
+    def load(self, user_id: str) -> Tuple[Optional[Dict], int]:
+        ...
+
+    @abstractmethod
+    def save(self, user_id: str, session: Dict, version: int) -> bool:
+        ...
+
+    def stats(self) -> Dict:
+        return {"backend": type(self).__name__}
+
+
+class MemorySessionBackend(SessionBackend):
+    """Sessions in this process only, evicted when idle or least recently active"""
+
+    def __init__(self, max_sessions: int = None, idle_ttl: float = None):
+        self.max_sessions = max_sessions or Config.CONVERSATION_MAX_SESSIONS
+        self.idle_ttl = Config.CONVERSATION_IDLE_TTL if idle_ttl is None else idle_ttl
+        # user_id -> (version, session, last_active), least recently active first
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+        self.evicted = 0
+
+    def _evict(self, now: float) -> None:
+        """Drop idle sessions and the least recently active ones over max_sessions (lock held)"""
+        while self._sessions:
+            user_id, (_, _, last_active) = next(iter(self._sessions.items()))
+            if len(self._sessions) <= self.max_sessions and now - last_active < self.idle_ttl:
+                break
+            del self._sessions[user_id]
+            self.evicted += 1
+
+    def load(self, user_id: str) -> Tuple[Optional[Dict], int]:
+        now = time.time()
+        with self._lock:
+            self._evict(now)
+            entry = self._sessions.get(user_id)
+            if entry is None:
+                return None, 0
+            version, session, _ = entry
+            self._sessions[user_id] = (version, session, now)
+            self._sessions.move_to_end(user_id)
+
+        # Copy the containers so callers can edit them; listings stay shared references
+        session = dict(session)
+        session["messages"] = list(session["messages"])
+        session["search_history"] = list(session["search_history"])
+        return session, version
+
+    def save(self, user_id: str, session: Dict, version: int) -> bool:
+        now = time.time()
+        with self._lock:
+            entry = self._sessions.get(user_id)
+            if (entry[0] if entry else 0) != version:
+                return False
+            self._sessions[user_id] = (version + 1, session, now)
+            self._sessions.move_to_end(user_id)
+            self._evict(now)
+            return True
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "backend": "memory",
+                "sessions": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "evicted": self.evicted
+            }
+
+
+class SQLiteSessionBackend(SessionBackend):
+    """Sessions in a SQLite file, shared by every worker process on the machine"""
+
+    PRUNE_INTERVAL = 60
+
+    def __init__(self, db_path: str, idle_ttl: float = None):
+        self.db_path = db_path
+        self.idle_ttl = Config.CONVERSATION_IDLE_TTL if idle_ttl is None else idle_ttl
+        self._local = threading.local()
+        self._last_prune = 0.0
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._connection().execute("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                user_id TEXT PRIMARY KEY,
+                version INTEGER NOT NULL,
+                data BLOB NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+    def load(self, user_id: str) -> Tuple[Optional[Dict], int]:
+        row = self._connection().execute(
+            'SELECT version, data FROM sessions WHERE user_id = ? AND updated_at >= ?',
+            (user_id, time.time() - self.idle_ttl)
+        ).fetchone()
+        if row is None:
+            return None, 0
+        return decode_session(row[1]), row[0]
+
+    def save(self, user_id: str, session: Dict, version: int) -> bool:
+        conn = self._connection()
+        now = time.time()
+        blob = encode_session(session)
+
+        if version == 0:
+            # New session; an expired row under the same id may be replaced
+            saved = conn.execute("""
+                INSERT INTO sessions (user_id, version, data, updated_at) VALUES (?, 1, ?, ?)
+                ON CONFLICT (user_id) DO UPDATE SET version = 1, data = excluded.data, updated_at = excluded.updated_at
+                WHERE sessions.updated_at < ?
+            """, (user_id, blob, now, now - self.idle_ttl)).rowcount == 1
+        else:
+            saved = conn.execute(
+                'UPDATE sessions SET version = ?, data = ?, updated_at = ? WHERE user_id = ? AND version = ?',
+                (version + 1, blob, now, user_id, version)
+            ).rowcount == 1
+
+        if now - self._last_prune > self.PRUNE_INTERVAL:
+            self._last_prune = now
+            self.prune()
+        return saved
+
+    def prune(self) -> int:
+        """Delete sessions idle for longer than the TTL"""
+        return self._connection().execute('DELETE FROM sessions WHERE updated_at < ?',
+                                          (time.time() - self.idle_ttl,)).rowcount
+
+    def stats(self) -> Dict:
+        count = self._connection().execute('SELECT COUNT(*) FROM sessions WHERE updated_at >= ?',
+                                           (time.time() - self.idle_ttl,)).fetchone()[0]
+        return {"backend": "sqlite", "sessions": count}
+
+
+class RedisSessionBackend(SessionBackend):
+    """Sessions in Redis (or any server speaking its protocol), shared across machines.
+
+    Each session is a hash of its version and encoded data; saves use WATCH/MULTI
+    so a concurrent write makes the transaction fail instead of being overwritten.
+    Redis expires idle sessions itself.
+    """
+
+    KEY_PREFIX = 'car-agent:session:'
+
+    def __init__(self, url: str = None, idle_ttl: float = None, client=None):
+        self.idle_ttl = Config.CONVERSATION_IDLE_TTL if idle_ttl is None else idle_ttl
+        self.client = client or redis.Redis.from_url(url or Config.SESSION_REDIS_URL)
+
+    def load(self, user_id: str) -> Tuple[Optional[Dict], int]:
+        version, blob = self.client.hmget(self.KEY_PREFIX + user_id, 'version', 'data')
+        if blob is None:
+            return None, 0
+        return decode_session(blob), int(version)
+
+    def save(self, user_id: str, session: Dict, version: int) -> bool:
+        key = self.KEY_PREFIX + user_id
+        blob = encode_session(session)
+
+        with self.client.pipeline() as pipe:
+            try:
+                pipe.watch(key)
+                if int(pipe.hget(key, 'version') or 0) != version:
+                    pipe.unwatch()
+                    return False
+                pipe.multi()
+                pipe.hset(key, mapping={'version': version + 1, 'data': blob})
+                pipe.expire(key, max(1, int(self.idle_ttl)))
+                pipe.execute()
+                return True
+            except redis.WatchError:
+                return False
+
+    def stats(self) -> Dict:
+        return {"backend": "redis"}
+
+
+_shared_backend = None
+_shared_backend_lock = threading.Lock()
+
+
+def get_session_backend() -> SessionBackend:
+    """Return the process-wide session backend selected by SESSION_BACKEND"""
+    global _shared_backend
+
+    with _shared_backend_lock:
+        if _shared_backend is None:
+            backend = Config.SESSION_BACKEND
+            if backend == 'sqlite':
+                _shared_backend = SQLiteSessionBackend(Config.SESSION_DB_PATH)
+            elif backend == 'redis':
+                if not REDIS_AVAILABLE:
+                    raise ValueError("SESSION_BACKEND=redis requires the optional redis package "
+                                     "(pip install redis, see requirements.txt)")
+                _shared_backend = RedisSessionBackend(Config.SESSION_REDIS_URL)
+            else:
+                _shared_backend = MemorySessionBackend()
+        return _shared_backend
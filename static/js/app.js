@@ -67,7 +67,7 @@ class CarListingApp {
         this.hideError();
 
         try {
-            const response = await fetch('/search', {
+            const response = await fetch('/search/stream', {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
@@ -75,13 +75,16 @@ class CarListingApp {
                 body: JSON.stringify({ query })
             });
 
-            const data = await response.json();
-
-            if (data.success) {
-                this.displayResults(data);
-            } else {
+            if (!response.ok) {
+                const data = await response.json();
                 this.showError(data.error || 'An error occurred while searching');
+                return;
             }
+
+            this.enhancedQuery = '';
+            this.listings = [];
+            this.analysis = '';
+            await readEventStream(response, (event) => this.handleSearchEvent(event));
         } catch (error) {
             console.error('Search error:', error);
             this.showError('Network error. Please check your connection and try again.');
@@ -90,6 +93,43 @@ class CarListingApp {
         }
     }
 
+    handleSearchEvent(event) {
+        switch (event.type) {
+            case 'enhanced_query':
+                this.enhancedQuery += event.delta;
+                document.getElementById('enhancedQuery').textContent = `"${this.enhancedQuery}"`;
+                break;
+            case 'listings':
+                // First site is in: show its cars while the other sites are still loading
+                if (this.listings.length === 0) {
+                    document.getElementById('loadingIndicator').style.display = 'none';
+                    this.showResults();
+                }
+                this.listings = this.listings.concat(event.listings);
+                this.renderListings(this.listings);
+                this.updateResultsCount(this.listings.length, true);
+                break;
+            case 'results':
+                // Final merged and filtered set replaces the per-site batches
+                document.getElementById('loadingIndicator').style.display = 'none';
+                if (this.listings.length === 0) {
+                    this.showResults();
+                }
+                this.listings = event.listings;
+                this.renderListings(this.listings);
+                this.updateResultsCount(event.total_found, false);
+                document.getElementById('analysisContent').innerHTML = '<p><i class="fas fa-spinner fa-spin"></i> Analyzing listings...</p>';
+                break;
+            case 'analysis':
+                this.analysis += event.delta;
+                document.getElementById('analysisContent').innerHTML = this.formatAnalysis(this.analysis);
+                break;
+            case 'error':
+                this.showError(event.error);
+                break;
+        }
+    }
+
     showLoading() {
         document.getElementById('loadingIndicator').style.display = 'block';
         document.getElementById('searchBtn').disabled = true;
@@ -102,40 +142,35 @@ class CarListingApp {
         document.getElementById('searchBtn').innerHTML = '<i class="fas fa-search"></i><span>Search</span>';
     }
 
-    displayResults(data) {
-        // Show enhanced query
-        const enhancedQueryEl = document.getElementById('enhancedQuery');
-        enhancedQueryEl.textContent = `"${data.enhanced_query}"`;
+    showResults() {
+        document.getElementById('listingsContainer').innerHTML = '';
+        document.getElementById('analysisContent').innerHTML = '';
+        document.getElementById('resultsSection').style.display = 'block';
 
-        // Show results count
+        // Smooth scroll to results
+        document.getElementById('resultsSection').scrollIntoView({ 
+            behavior: 'smooth',
+            block: 'start'
+        });
+    }
+
+    updateResultsCount(count, stillSearching) {
         const resultsCountEl = document.getElementById('resultsCount');
-        resultsCountEl.textContent = `Found ${data.total_found} car listing${data.total_found !== 1 ? 's' : ''}`;
+        resultsCountEl.textContent = `Found ${count} car listing${count !== 1 ? 's' : ''}${stillSearching ? ' so far...' : ''}`;
+    }
 
-        // Display listings
+    renderListings(listings) {
         const listingsContainer = document.getElementById('listingsContainer');
         listingsContainer.innerHTML = '';
 
-        if (data.listings && data.listings.length > 0) {
-            data.listings.forEach((listing, index) => {
+        if (listings && listings.length > 0) {
+            listings.forEach((listing, index) => {
                 const listingEl = this.createListingElement(listing, index + 1);
                 listingsContainer.appendChild(listingEl);
             });
         } else {
             listingsContainer.innerHTML = '<p class="no-results">No listings found. Try adjusting your search criteria.</p>';
         }
-
-        // Display AI analysis
-        const analysisContent = document.getElementById('analysisContent');
-        analysisContent.innerHTML = this.formatAnalysis(data.analysis);
-
-        // Show results section
-        document.getElementById('resultsSection').style.display = 'block';
-
-        // Smooth scroll to results
-        document.getElementById('resultsSection').scrollIntoView({ 
-            behavior: 'smooth',
-            block: 'start'
-        });
     }
 
     createListingElement(listing, index) {
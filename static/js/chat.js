@@ -131,7 +131,7 @@ class ChatInterface {
         this.showTypingIndicator();
 
         try {
-            const response = await fetch('/chat', {
+            const response = await fetch('/chat/stream', {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
@@ -142,33 +142,19 @@ class ChatInterface {
                 })
             });
 
-            const data = await response.json();
-            this.hideTypingIndicator();
+            if (!response.ok) {
+                this.hideTypingIndicator();
+                this.addMessage('assistant', "I'm sorry, I encountered an error. Please try again.");
+                return;
+            }
 
-            if (data.success) {
-                // Add assistant response
-                this.addMessage('assistant', data.response);
-
-                // If it's a search request, show results
-                if (data.type === 'search_request' && data.listings) {
-                    this.showSearchResults(data);
-                    
-                    // Add follow-up message if available
-                    if (data.follow_up) {
-                        setTimeout(() => {
-                            this.addMessage('assistant', data.follow_up);
-                        }, 1000);
-                    }
-                } else if (data.search_error) {
-                    this.addMessage('assistant', data.search_error);
-                }
+            this.stream = { messageType: null, messages: {}, texts: {}, listings: [], analysis: '' };
+            await readEventStream(response, (event) => this.handleChatEvent(event));
+            this.hideTypingIndicator();
 
-                // Show quick actions for general conversation
-                if (data.type === 'conversation') {
-                    setTimeout(() => this.showQuickActions(), 1000);
-                }
-            } else {
-                this.addMessage('assistant', "I'm sorry, I encountered an error. Please try again.");
+            // Show quick actions for general conversation
+            if (this.stream.messageType === 'conversation') {
+                setTimeout(() => this.showQuickActions(), 1000);
             }
         } catch (error) {
             console.error('Error sending message:', error);
@@ -177,6 +163,52 @@ class ChatInterface {
         }
     }
 
+    handleChatEvent(event) {
+        switch (event.type) {
+            case 'message':
+                this.stream.messageType = event.message_type;
+                break;
+            case 'response':
+            case 'follow_up':
+                // Keep the typing indicator up while a search is still running
+                if (this.stream.messageType !== 'search_request' || event.type === 'follow_up') {
+                    this.typingIndicator.style.display = 'none';
+                }
+                this.appendToMessage(event.type, event.delta);
+                break;
+            case 'listings':
+                this.stream.listings = this.stream.listings.concat(event.listings);
+                this.showSearchResults({ listings: this.stream.listings });
+                break;
+            case 'results':
+                // Final merged and filtered set replaces the per-site batches
+                this.stream.listings = event.listings;
+                this.showSearchResults({ listings: this.stream.listings, analysis: this.stream.analysis });
+                break;
+            case 'analysis':
+                this.stream.analysis += event.delta;
+                this.updateAnalysis(this.stream.analysis);
+                break;
+            case 'search_error':
+                this.addMessage('assistant', event.error);
+                break;
+            case 'error':
+                this.addMessage('assistant', "I'm sorry, I encountered an error. Please try again.");
+                break;
+        }
+    }
+
+    appendToMessage(key, delta) {
+        // One assistant bubble per streamed reply, filled in as text arrives
+        if (!this.stream.messages[key]) {
+            this.stream.messages[key] = this.addMessage('assistant', '');
+            this.stream.texts[key] = '';
+        }
+        this.stream.texts[key] += delta;
+        this.stream.messages[key].querySelector('.message-text').innerHTML = this.formatMessage(this.stream.texts[key]);
+        this.scrollToBottom();
+    }
+
     addMessage(role, content, timestamp = null) {
         const messageDiv = document.createElement('div');
         messageDiv.className = `message ${role} new-message`;
@@ -188,7 +220,7 @@ class ChatInterface {
         messageDiv.innerHTML = `
             <div class="message-avatar">${avatar}</div>
             <div class="message-content">
-                ${this.formatMessage(content)}
+                <div class="message-text">${this.formatMessage(content)}</div>
                 <div class="message-time">${time}</div>
             </div>
         `;
@@ -200,6 +232,8 @@ class ChatInterface {
         setTimeout(() => {
             messageDiv.classList.remove('new-message');
         }, 500);
+
+        return messageDiv;
     }
 
     formatMessage(content) {
@@ -238,19 +272,27 @@ class ChatInterface {
 
             // Add analysis if available
             if (data.analysis) {
-                const analysisDiv = document.createElement('div');
-                analysisDiv.className = 'analysis-section';
-                analysisDiv.innerHTML = `
-                    <h4><i class="fas fa-brain"></i> AI Analysis</h4>
-                    <div class="analysis-content">${this.formatMessage(data.analysis)}</div>
-                `;
-                this.listingsContainer.appendChild(analysisDiv);
+                this.updateAnalysis(data.analysis);
             }
 
             this.listingsModal.style.display = 'flex';
         }
     }
 
+    updateAnalysis(analysis) {
+        let analysisDiv = this.listingsContainer.querySelector('.analysis-section');
+        if (!analysisDiv) {
+            analysisDiv = document.createElement('div');
+            analysisDiv.className = 'analysis-section';
+            analysisDiv.innerHTML = `
+                <h4><i class="fas fa-brain"></i> AI Analysis</h4>
+                <div class="analysis-content"></div>
+            `;
+            this.listingsContainer.appendChild(analysisDiv);
+        }
+        analysisDiv.querySelector('.analysis-content').innerHTML = this.formatMessage(analysis);
+    }
+
     createListingElement(listing, index) {
         const listingEl = document.createElement('div');
         listingEl.className = 'car-listing';
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Streaming Parser for Car Listing Agent
+Feeds result pages to lxml incrementally and only keeps listing-card subtrees
+"""
+
+from typing import Callable, Dict, Iterator, Optional
+from bs4 import BeautifulSoup
+from lxml import etree
+
+CHUNK_SIZE = 16 * 1024
+
+
+def is_cars_com_card(tag: str, attrib: Dict) -> bool:
+    if tag not in ('div', 'article'):
+        return False
+    classes = attrib.get('class', '').split()
+    return (attrib.get('data-qa') == 'vehicle-card' or attrib.get('data-cmp') == 'vehicle-card'
+            or 'vehicle-card' in classes)
+
+
+def is_autotrader_card(tag: str, attrib: Dict) -> bool:
+    if tag not in ('div', 'article'):
+        return False
+    classes = attrib.get('class', '').split()
+    return attrib.get('data-cmp') == 'inventoryListing' or 'inventory-listing' in classes
+
+
+def _iter_chunks(response) -> Iterator[bytes]:
+    """Yield the body in chunks from requests or fetch-engine responses"""
+    if hasattr(response, 'iter_content'):
+        yield from response.iter_content(CHUNK_SIZE)
+    else:
+        content = response.content
+        for start in range(0, len(content), CHUNK_SIZE):
+            yield content[start:start + CHUNK_SIZE]
+
+
+def _to_soup(element):
+    """Re-parse one card subtree so the BeautifulSoup-based field parsers can use it"""
+    html = etree.tostring(element, encoding='unicode', method='html', with_tail=False)
+    soup = BeautifulSoup(html, 'lxml')
+    return soup.body.find(recursive=False) if soup.body else soup
+
+
+def iter_listing_cards(response, is_card: Callable[[str, Dict], bool], limit: Optional[int]) -> Iterator:
+    """Yield up to ``limit`` listing cards (all when None) as BeautifulSoup tags while the page is parsed.
+
+    Everything outside a card is discarded as soon as lxml finishes it, and parsing
+    stops once the limit is reached, so the rest of the page is never processed.
+    """
+    parser = etree.HTMLPullParser(events=('start', 'end'))
+    card = None
+    found = 0
+
+    for chunk in _iter_chunks(response):
+        parser.feed(chunk)
+
+        for event, element in parser.read_events():
+            if event == 'start':
+                if card is None and is_card(element.tag, element.attrib):
+                    card = element
+                continue
+
+            if element is card:
+                yield _to_soup(card)
+                card = None
+                found += 1
+                if limit is not None and found >= limit:
+                    return
+
+            if card is None:
+                # Drop finished nodes outside cards to keep the partial tree small
+                element.clear()
+                parent = element.getparent()
+                while parent is not None and element.getprevious() is not None:
+                    del parent[0]
+
+    # Flush a card left open by truncated markup
+    parser.close()
+    if card is not None:
+        yield _to_soup(card)
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Structured Data Extraction for Car Listing Agent
+Reads listings from JSON-LD and embedded app-state JSON without building a DOM
+"""
+
+import json
+import re
+from typing import Dict, List, Optional
+from urllib.parse import urljoin
+
+JSON_LD_RE = re.compile(
+    rb'<script[^>]+type=["\']application/ld\+json["\'][^>]*>(.*?)</script>', re.S | re.I
+)
+JSON_SCRIPT_RE = re.compile(
+    rb'<script[^>]+id=["\'](?:__NEXT_DATA__|__NUXT_DATA__|initial-state)["\'][^>]*>(.*?)</script>', re.S | re.I
+)
+STATE_ASSIGNMENT_RE = re.compile(
+    rb'window\.(?:__INITIAL_STATE__|__PRELOADED_STATE__|__APOLLO_STATE__|__BONNET_DATA__)\s*=\s*'
+)
+
+VEHICLE_TYPES = {'car', 'vehicle', 'motorvehicle'}
+# A generic Product only counts as a vehicle when it carries one of these
+VEHICLE_FIELDS = ('vehicleIdentificationNumber', 'mileageFromOdometer', 'modelDate', 'vehicleModelDate')
+
+# Limits on how far we walk embedded state looking for vehicles
+MAX_DEPTH = 12
+MAX_NODES = 20000
+
+
+def _first(data: Dict, *keys):
+    """Return the first non-empty value among keys, following dotted paths.
+
+    A list along the path (e.g. several JSON-LD offers) is read through its first item.
+    """
+    for key in keys:
+        value = data
+        for part in key.split('.'):
+            if isinstance(value, list):
+                value = value[0] if value else None
+            value = value.get(part) if isinstance(value, dict) else None
+            if value is None:
+                break
+        if isinstance(value, dict):
+            value = value.get('name') or value.get('value')
+        if value not in (None, '', []):
+            return value
+    return None
+
+
+def _to_number(value) -> Optional[int]:
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str):
+        digits = re.sub(r'[^\d.]', '', value)
+        if digits:
+            try:
+                return int(float(digits))
+            except ValueError:
+                return None
+    return None
+
+
+def _vehicle_to_listing(item: Dict, source: str, base_url: str) -> Optional[Dict]:
+    """Map a JSON vehicle object onto the scraper's listing fields"""
+    make = _first(item, 'brand', 'make', 'makeName', 'manufacturer')
+    model = _first(item, 'model', 'modelName')
+    year = _first(item, 'vehicleModelDate', 'modelDate', 'modelYear', 'year')
+    title = _first(item, 'name', 'title', 'heading')
+
+    if not title and make and model:
+        title = " ".join(str(part) for part in (year, make, model, _first(item, 'trim', 'vehicleConfiguration')) if part)
+    if not title:
+        return None
+
+    price = _to_number(_first(item, 'offers.price', 'offers.lowPrice', 'price', 'listPrice',
+                              'pricingDetail.salePrice', 'pricingDetail.primary'))
+    mileage = _to_number(_first(item, 'mileageFromOdometer.value', 'mileageFromOdometer', 'mileage', 'odometer'))
+    location = _first(item, 'offers.seller.name', 'seller.name', 'dealer.name', 'dealerName', 'ownerName',
+                      'offers.seller.address.addressLocality', 'location', 'city')
+    url = _first(item, 'url', 'offers.url', 'vdpUrl', 'link', 'website')
+
+    # Page-level Product/Vehicle blocks without any listing detail aren't listings
+    if not (make or price or mileage is not None):
+        return None
+
+    listing = {
+        'title': str(title).strip(),
+        'price': f"${price:,}" if price else 'N/A',
+        'mileage': f"{mileage:,} miles" if mileage is not None else 'N/A',
+        'location': str(location).strip() if location else 'N/A',
+        'url': urljoin(base_url, url) if isinstance(url, str) else 'N/A',
+        'source': source
+    }
+
+    vin = _first(item, 'vehicleIdentificationNumber', 'vin')
+    if vin:
+        listing['vin'] = str(vin)
+
+    return listing
+
+
+def _is_json_ld_vehicle(node: Dict) -> bool:
+    node_type = node.get('@type')
+    types = [t.lower() for t in (node_type if isinstance(node_type, list) else [node_type]) if isinstance(t, str)]
+    if any(t in VEHICLE_TYPES for t in types):
+        return True
+    return 'product' in types and any(field in node for field in VEHICLE_FIELDS)
+
+
+def _is_state_vehicle(node: Dict) -> bool:
+    """Heuristic for app-state objects that describe a single vehicle"""
+    has_make = any(key in node for key in ('make', 'makeName'))
+    has_model = any(key in node for key in ('model', 'modelName'))
+    has_detail = any(key in node for key in ('price', 'listPrice', 'pricingDetail', 'mileage', 'vin'))
+    return has_make and has_model and has_detail
+
+
+def _collect(node, is_vehicle, found: List[Dict], depth: int = 0, budget: List[int] = None) -> None:
+    """Walk parsed JSON depth-first and collect vehicle objects"""
+    if budget is None:
+        budget = [MAX_NODES]
+    if depth > MAX_DEPTH or budget[0] <= 0:
+        return
+    budget[0] -= 1
+
+    if isinstance(node, dict):
+        if is_vehicle(node):
+            found.append(node)
+            return
+        for value in node.values():
+            if isinstance(value, (dict, list)):
+                _collect(value, is_vehicle, found, depth + 1, budget)
+    elif isinstance(node, list):
+        for value in node:
+            if isinstance(value, (dict, list)):
+                _collect(value, is_vehicle, found, depth + 1, budget)
+
+
+def _load_json(raw: bytes):
+    try:
+        return json.loads(raw.decode('utf-8', errors='replace'))
+    except ValueError:
+        return None
+
+
+def _embedded_states(content: bytes) -> List:
+    """Parse app-state blobs from JSON script tags and window.__STATE__ assignments"""
+    states = [_load_json(raw) for raw in JSON_SCRIPT_RE.findall(content)]
+
+    decoder = json.JSONDecoder()
+    for match in STATE_ASSIGNMENT_RE.finditer(content):
+        text = content[match.end():match.end() + 5_000_000].decode('utf-8', errors='replace')
+        try:
+            state, _ = decoder.raw_decode(text)
+            states.append(state)
+        except ValueError:
+            continue
+
+    return [state for state in states if state is not None]
+
+
+def extract_structured_listings(content: bytes, source: str, base_url: str) -> List[Dict]:
+    """Return listings embedded as JSON-LD or app state, or [] when the page has none"""
+    vehicles = []
+    for raw in JSON_LD_RE.findall(content):
+        data = _load_json(raw)
+        if data is not None:
+            _collect(data, _is_json_ld_vehicle, vehicles)
+
+    if not vehicles:
+        for state in _embedded_states(content):
+            _collect(state, _is_state_vehicle, vehicles)
+
+    listings = []
+    for vehicle in vehicles:
+        listing = _vehicle_to_listing(vehicle, source, base_url)
+        if listing:
+            listings.append(listing)
+    return listings
+
+
+def is_result_page(listings: List[Dict], min_count: int) -> bool:
+    """Whether structured listings cover a whole results page, so the DOM can be skipped"""
+    return len(listings) >= min_count and all(listing['url'] != 'N/A' for listing in listings)
+
+
+def merge_structured(dom_listings: List[Dict], structured: List[Dict]) -> List[Dict]:
+    """DOM listings followed by the structured ones they don't already include"""
+    seen_urls = {listing.get('url') for listing in dom_listings}
+    return dom_listings + [listing for listing in structured
+                           if listing['url'] == 'N/A' or listing['url'] not in seen_urls]
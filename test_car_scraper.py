@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Tests for the multi-site search fan-out
+"""
+
+import json
+import threading
+from unittest import mock
+
+import pytest
+import requests
+
+from car_scraper import CarScraper, SearchIncomplete
+from url_strategy import AttemptCancelled
+
+
+def _results_page() -> mock.Mock:
+    cars = [{'@type': 'Car', 'name': f'2019 Honda Civic #{n}', 'brand': {'name': 'Honda'},
+             'url': f'/vehicledetail/{n}/', 'offers': {'price': 18000 + n}} for n in range(3)]
+    scripts = ''.join(f'<script type="application/ld+json">{json.dumps(car)}</script>' for car in cars)
+    return mock.Mock(content=f'<html><head>{scripts}</head><body></body></html>'.encode('utf-8'))
+
+
+def _search(make_request, allow_partial: bool, site_timeout: float = 45):
+    scraper = CarScraper()
+    scraper.inventory_store = None
+    with mock.patch.object(scraper, '_make_request', side_effect=make_request), \
+            mock.patch('car_scraper.Config.RESULT_CACHE_ENABLED', False), \
+            mock.patch('car_scraper.Config.SEARCH_ALLOW_PARTIAL', allow_partial), \
+            mock.patch.dict('car_scraper.Config.SEARCH_SITE_TIMEOUTS', {'autotrader.com': site_timeout}):
+        return scraper.search_all_sites('honda civic', concurrent=True)
+
+
+def _autotrader_blocked(url, max_retries=3, cancel_event=None):
+    if 'autotrader.com' in url:
+        raise requests.exceptions.RequestException('Max retries exceeded')
+    return _results_page()
+
+
+def test_partial_results_are_returned_when_allowed():
+    listings = _search(_autotrader_blocked, allow_partial=True)
+    assert [listing.source.value for listing in listings] == ['cars.com'] * 3
+
+
+def test_failed_site_fails_the_search_when_partial_results_are_off():
+    with pytest.raises(SearchIncomplete, match='autotrader.com'):
+        _search(_autotrader_blocked, allow_partial=False)
+
+
+def test_site_with_every_url_pattern_failing_raises():
+    scraper = CarScraper()
+    with mock.patch.object(scraper, '_make_request', side_effect=requests.exceptions.RequestException('blocked')):
+        with pytest.raises(requests.exceptions.RequestException):
+            scraper.search_cars_com('honda civic')
+
+
+def test_timed_out_site_is_cancelled():
+    stopped = threading.Event()
+
+    def make_request(url, max_retries=3, cancel_event=None):
+        if 'autotrader.com' not in url:
+            return _results_page()
+        # Hang like a slow site until the search gives up on it
+        assert cancel_event.wait(5)
+        stopped.set()
+        raise AttemptCancelled()
+
+    with pytest.raises(SearchIncomplete, match='autotrader.com'):
+        _search(make_request, allow_partial=False, site_timeout=0.2)
+    assert stopped.wait(1)
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Tests for the chat turn task graph and orchestrator
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import pytest
+
+from ai_processor import SEARCH_RESPONSE_FALLBACK
+from chat_orchestrator import SEARCH_ERROR_MESSAGE, ChatOrchestrator, TaskGraph
+from listing import Listing
+
+LISTINGS = [Listing.from_dict({'title': '2019 Honda Civic EX', 'price': '$18,500'})]
+
+
+@pytest.fixture
+def executor():
+    executor = ThreadPoolExecutor(max_workers=4)
+    yield executor
+    executor.shutdown(wait=False)
+
+
+def test_tasks_run_after_their_dependencies(executor):
+    release = threading.Event()
+    order = []
+
+    def first():
+        release.wait(1)
+        order.append('first')
+        return 2
+
+    graph = TaskGraph(executor)
+    graph.add('first', first)
+    graph.add('second', lambda value: order.append('second') or value * 10, after=('first',))
+    graph.add('independent', lambda: order.append('independent'))
+
+    assert graph.result('independent', 1) is None
+    release.set()
+    assert graph.result('second', 1) == 20
+    assert order == ['independent', 'first', 'second']
+
+
+def test_failed_dependency_fails_the_dependent_task(executor):
+    dependent = mock.Mock()
+    graph = TaskGraph(executor)
+    graph.add('scrape', mock.Mock(side_effect=ValueError('blocked')))
+    graph.add('analysis', dependent, after=('scrape',))
+
+    with pytest.raises(ValueError, match='blocked'):
+        graph.result('analysis', 1)
+    dependent.assert_not_called()
+
+
+def test_rejected_submit_fails_the_task_instead_of_hanging(executor):
+    executor.shutdown()
+    graph = TaskGraph(executor)
+    graph.add('response', lambda: 'hi')
+
+    with pytest.raises(RuntimeError):
+        graph.result('response', 1)
+
+
+def _orchestrator(executor, **ai_overrides) -> ChatOrchestrator:
+    ai_processor = mock.Mock()
+    ai_processor.classify_conversational_message.return_value = (
+        {"type": "search_request", "search_query": "honda civic", "criteria": {}}, [])
+    ai_processor.generate_conversational_response.return_value = "Let me look."
+    ai_processor.enhance_search_query.return_value = "Honda Civic"
+    ai_processor.analyze_listings_with_follow_up.return_value = ("Good deals.", "Want cheaper ones?")
+    for name, value in ai_overrides.items():
+        setattr(ai_processor, name, value)
+    scraper = mock.Mock()
+    scraper.search_all_sites.return_value = LISTINGS
+    return ChatOrchestrator(ai_processor, scraper, executor)
+
+
+def test_search_turn_returns_listings_and_analysis(executor):
+    orchestrator = _orchestrator(executor)
+    with mock.patch('chat_orchestrator.Config.CHAT_MERGED_ANALYSIS', True):
+        result = orchestrator.run("find me a honda civic", "alice")
+
+    assert (result["response"], result["listings"], result["analysis"], result["follow_up"]) == \
+        ("Let me look.", LISTINGS, "Good deals.", "Want cheaper ones?")
+    orchestrator.scraper.search_all_sites.assert_called_once_with("Honda Civic", criteria={})
+    orchestrator.ai_processor.record_search_follow_up.assert_called_once_with(
+        "alice", "honda civic", LISTINGS, "Want cheaper ones?")
+
+
+def test_failed_reply_keeps_the_search(executor):
+    orchestrator = _orchestrator(executor, generate_conversational_response=mock.Mock(side_effect=RuntimeError))
+    result = orchestrator.run("find me a honda civic", "alice")
+
+    assert result["response"] == SEARCH_RESPONSE_FALLBACK
+    assert result["listings"] == LISTINGS
+
+
+def test_failed_search_is_reported_with_the_reply(executor):
+    orchestrator = _orchestrator(executor)
+    orchestrator.scraper.search_all_sites.side_effect = RuntimeError('blocked')
+    result = orchestrator.run("find me a honda civic", "alice")
+
+    assert (result["response"], result["search_error"]) == ("Let me look.", SEARCH_ERROR_MESSAGE)
+    assert "listings" not in result
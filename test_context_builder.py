@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Tests for token-budgeted chat context building
+"""
+
+from context_builder import ContextBuilder, message_tokens, truncate_to_tokens
+
+
+def _history(turns: int, words: int = 20) -> list:
+    history = [{"role": "system", "content": "You are a helpful car buying assistant.", "timestamp": "t0"}]
+    for i in range(turns):
+        role = "user" if i % 2 == 0 else "assistant"
+        history.append({"role": role, "content": f"turn {i} " + "honda civic " * words, "timestamp": f"t{i + 1}"})
+    return history
+
+
+def _total_tokens(messages: list) -> int:
+    return sum(message_tokens(message) for message in messages)
+
+
+class RecordingSummarizer:
+    def __init__(self, summary_words: int = 30):
+        self.calls = []
+        self.summary_words = summary_words
+
+    def __call__(self, previous, turns):
+        self.calls.append((previous, [turn["content"].split()[1] for turn in turns]))
+        return f"summary {len(self.calls)} " + "buyer wants a civic " * self.summary_words
+
+
+def test_newest_turns_are_packed_into_the_budget():
+    messages = ContextBuilder(budget=300).build(_history(20))
+
+    assert messages[0]["role"] == "system"
+    assert _total_tokens(messages) <= 300
+    assert messages[-1]["content"].startswith("turn 19 ")
+    # Contiguous newest turns, and one more would not have fit
+    kept = [int(message["content"].split()[1]) for message in messages[1:]]
+    assert kept == list(range(20 - len(kept), 20))
+    assert _total_tokens(messages) + message_tokens(_history(20)[20 - len(kept)]) > 300
+
+
+def test_stored_fields_are_dropped_and_system_prompts_merged():
+    messages = ContextBuilder(budget=1000).build(_history(2), system_message="Search results follow.")
+    assert messages[0] == {"role": "system",
+                           "content": "You are a helpful car buying assistant.\n\nSearch results follow."}
+    assert all(set(message) == {"role", "content"} for message in messages)
+
+
+def test_oversized_latest_message_is_truncated_to_fit():
+    history = _history(0) + [{"role": "user", "content": "honda civic " * 500}]
+    messages = ContextBuilder(budget=100).build(history)
+
+    assert len(messages) == 2
+    assert messages[1]["content"].endswith(" …")
+    assert _total_tokens(messages) <= 100
+
+
+def test_truncate_to_tokens_counts_the_ellipsis():
+    text = truncate_to_tokens("honda civic " * 100, 10)
+    assert text.endswith(" …")
+    assert len(text) <= 40
+
+
+def test_summary_and_its_prefix_stay_within_the_budget():
+    summarizer = RecordingSummarizer()
+    builder = ContextBuilder(budget=300, summarize=summarizer)
+    for turns in range(1, 30):
+        messages = builder.build(_history(turns))
+        assert _total_tokens(messages) <= 300, turns
+    assert summarizer.calls
+
+
+def test_summaries_are_cached_and_the_fold_point_moves_rarely():
+    summarizer = RecordingSummarizer(summary_words=5)
+    builder = ContextBuilder(budget=300, summarize=summarizer)
+
+    builder.build(_history(10))
+    assert len(summarizer.calls) == 1
+    previous, folded = summarizer.calls[0]
+    assert previous is None and folded[0] == "0"
+
+    # Rebuilding the same history reuses the cached summary
+    messages = builder.build(_history(10))
+    assert len(summarizer.calls) == 1
+    assert "Summary of the earlier conversation: summary 1 " in messages[0]["content"]
+
+    # The next turn still fits after the fold point, so no new summary is needed
+    builder.build(_history(11))
+    assert len(summarizer.calls) == 1
+
+    # Once the turns after the fold stop fitting, the old summary is folded forward
+    for turns in range(12, 20):
+        builder.build(_history(turns))
+    assert len(summarizer.calls) >= 2
+    previous, folded = summarizer.calls[1]
+    assert previous.startswith("summary 1 ")
+    assert int(folded[0]) == len(summarizer.calls[0][1])
+
+
+def test_summary_failure_falls_back_to_packing():
+    def failing(previous, turns):
+        raise RuntimeError("api down")
+
+    messages = ContextBuilder(budget=300, summarize=failing).build(_history(20))
+    assert _total_tokens(messages) <= 300
+    assert "Summary" not in messages[0]["content"]
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Tests for conversation storage limits
+"""
+
+import time
+from unittest import mock
+
+from conversation_manager import ConversationManager
+from listing import Listing
+from session_backend import MemorySessionBackend
+
+
+def _listings(count: int):
+    return [Listing.from_dict({'title': f'2019 Honda Civic #{i}', 'price': f'${18000 + i:,}',
+                               'url': f'https://www.cars.com/vehicledetail/{i}/', 'source': 'cars.com'})
+            for i in range(count)]
+
+
+def _manager(**backend_args) -> ConversationManager:
+    backend_args.setdefault('max_sessions', 100)
+    backend_args.setdefault('idle_ttl', 3600)
+    return ConversationManager(MemorySessionBackend(**backend_args))
+
+
+def test_least_recently_active_session_is_evicted_over_max_sessions():
+    manager = _manager(max_sessions=2)
+    manager.start_conversation('alice')
+    manager.start_conversation('bob')
+    # Touching alice makes bob the least recently active
+    manager.get_conversation_history('alice')
+    manager.start_conversation('carol')
+
+    assert manager.get_conversation_history('bob') == []
+    assert manager.get_conversation_history('alice')
+    assert manager.get_conversation_history('carol')
+    assert manager.stats()['evicted'] == 1
+
+
+def test_idle_sessions_are_evicted():
+    manager = _manager(idle_ttl=60)
+    now = time.time()
+    with mock.patch('session_backend.time.time', return_value=now):
+        manager.start_conversation('alice')
+    with mock.patch('session_backend.time.time', return_value=now + 30):
+        manager.start_conversation('bob')
+    with mock.patch('session_backend.time.time', return_value=now + 61):
+        assert manager.get_conversation_history('alice') == []
+        assert manager.get_conversation_history('bob')
+
+
+def test_message_cap_keeps_the_system_prompt():
+    manager = _manager()
+    with mock.patch('conversation_manager.Config.CONVERSATION_MAX_MESSAGES', 5):
+        for i in range(10):
+            manager.add_message('alice', 'user', f'message {i}')
+
+    messages = manager.get_conversation_history('alice')
+    assert len(messages) == 5
+    assert messages[0]['role'] == 'system'
+    assert [message['content'] for message in messages[1:]] == ['message 6', 'message 7', 'message 8', 'message 9']
+    assert manager.get_conversation_summary('alice')['message_count'] == 10
+
+
+def test_stored_listings_are_capped_but_counted():
+    manager = _manager()
+    with mock.patch('conversation_manager.Config.CONVERSATION_MAX_STORED_LISTINGS', 3):
+        manager.save_search_results('alice', 'Honda Civic', _listings(10))
+
+    last_search = manager.get_last_search('alice')
+    assert len(last_search['results']) == 3
+    assert last_search['count'] == 10
+
+
+def test_search_history_is_capped():
+    manager = _manager()
+    with mock.patch('conversation_manager.Config.CONVERSATION_MAX_SEARCHES', 2):
+        for query in ('Honda Civic', 'Toyota Corolla', 'Mazda CX-5'):
+            manager.save_search_results('alice', query, _listings(1))
+
+    conv, _ = manager.backend.load('alice')
+    assert [search['query'] for search in conv['search_history']] == ['Toyota Corolla', 'Mazda CX-5']
+    assert conv['searches_performed'] == 3
+    assert manager.get_last_search('alice')['query'] == 'Mazda CX-5'
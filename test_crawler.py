@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Tests for the background inventory crawler
+"""
+
+import time
+from unittest import mock
+
+from car_scraper import CarScraper
+from config import Config
+from crawler import BackgroundCrawler
+from inventory_store import InventoryStore
+from listing import Listing
+
+
+def _listing(n: int) -> Listing:
+    return Listing.from_dict({'title': '2019 Honda Civic EX', 'price': f'${18000 + n:,}', 'mileage': '40,000 mi.',
+                              'url': f'https://www.cars.com/vehicledetail/{n}/', 'source': 'cars.com'})
+
+
+def _crawler(tmp_path, refresh_results):
+    store = InventoryStore(str(tmp_path / 'inventory.db'))
+    store.record_demand('honda', 'civic', Config.SEARCH_ZIP, Config.SEARCH_RADIUS)
+    scraper = mock.Mock(inventory_store=store)
+    scraper.refresh_slice.side_effect = refresh_results
+    return BackgroundCrawler(scraper, full_interval=3600), store
+
+
+def test_first_crawl_is_full_and_later_ones_incremental(tmp_path):
+    crawler, store = _crawler(tmp_path, [(40, 40, 0), (12, 2, 1)])
+
+    assert crawler.run_once() == 1
+    crawled_at, full_crawled_at = store.get_watermark('honda', 'civic', Config.SEARCH_ZIP, Config.SEARCH_RADIUS)
+    assert crawled_at == full_crawled_at
+
+    assert crawler.run_once() == 1
+    assert [call.kwargs['full'] for call in crawler.scraper.refresh_slice.call_args_list] == [True, False]
+    crawled_at, last_full = store.get_watermark('honda', 'civic', Config.SEARCH_ZIP, Config.SEARCH_RADIUS)
+    assert last_full == full_crawled_at < crawled_at
+
+
+def test_full_crawl_once_the_last_one_is_too_old(tmp_path):
+    crawler, store = _crawler(tmp_path, [(12, 0, 0)])
+    store.advance_watermark('honda', 'civic', Config.SEARCH_ZIP, Config.SEARCH_RADIUS, time.time() - 7200, full=True)
+
+    crawler.run_once()
+    assert crawler.scraper.refresh_slice.call_args.kwargs['full'] is True
+
+
+def test_empty_crawl_keeps_the_watermark(tmp_path):
+    crawler, store = _crawler(tmp_path, [(0, 0, 0)])
+
+    assert crawler.run_once() == 0
+    assert store.get_watermark('honda', 'civic', Config.SEARCH_ZIP, Config.SEARCH_RADIUS) is None
+
+
+def test_incremental_refresh_stops_at_the_first_known_page(tmp_path):
+    scraper = CarScraper()
+    scraper.inventory_store = InventoryStore(str(tmp_path / 'inventory.db'))
+    scraper.inventory_store.upsert([_listing(2)], zip_code=Config.SEARCH_ZIP, radius=Config.SEARCH_RADIUS)
+    pages = {1: [_listing(1)], 2: [_listing(2)], 3: [_listing(3)]}
+    fetched = []
+
+    def fetch_page(page, cancel_event):
+        fetched.append(page)
+        return pages.get(page, [])
+
+    with mock.patch('car_scraper.Config.CRAWLER_DEEP', True), \
+            mock.patch('car_scraper.Config.DEEP_CRAWL_CONCURRENCY', 1), \
+            mock.patch.object(scraper, '_page_fetchers', return_value={'cars.com': fetch_page}) as page_fetchers:
+        assert scraper.refresh_slice('honda', 'civic', full=False) == (2, 1, 0)
+
+    assert page_fetchers.call_args.kwargs['newest_first'] is True
+    assert fetched == [1, 2]
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Tests for single-pass chat criteria extraction
+"""
+
+from criteria_extractor import PhraseAutomaton, extract_criteria
+
+
+def test_automaton_matches_whole_tokens_and_overlaps():
+    automaton = PhraseAutomaton([(['kia'], 'kia'), (['all', 'wheel', 'drive'], 'awd'), (['wheel'], 'wheel')])
+    assert automaton.matches(['kiara', 'wants', 'a', 'kia']) == [(3, 4, 'kia')]
+    assert sorted(automaton.matches(['all', 'wheel', 'drive'])) == [(0, 3, 'awd'), (1, 2, 'wheel')]
+
+
+def test_automaton_follows_failure_links():
+    automaton = PhraseAutomaton([(['a', 'b', 'c'], 'abc'), (['b', 'c', 'd'], 'bcd')])
+    assert automaton.matches(['a', 'b', 'c', 'd']) == [(0, 3, 'abc'), (1, 4, 'bcd')]
+    assert automaton.matches(['a', 'b', 'x', 'b', 'c', 'd']) == [(3, 6, 'bcd')]
+
+
+def test_names_containing_a_make_are_not_vehicles():
+    criteria = extract_criteria("My name is Kiara and I'm just browsing for now")
+    assert criteria["make"] is None and criteria["model"] is None
+
+
+def test_make_model_price_and_features():
+    criteria = extract_criteria("Show me 2018 or newer Toyota RAV4s with AWD and a sunroof under $30k")
+    assert (criteria["make"], criteria["year_min"], criteria["year_max"]) == ('toyota', 2018, None)
+    assert criteria["price_max"] == 30000
+    assert criteria["features"] == ['awd', 'sunroof']
+
+
+def test_mileage_is_not_a_price():
+    criteria = extract_criteria("chevy silverado 4x4 under 60k miles, max $35k")
+    assert (criteria["make"], criteria["model"]) == ('chevrolet', 'silverado')
+    assert criteria["mileage_max"] == 60000
+    assert criteria["price_max"] == 35000
+    assert criteria["features"] == ['4wd']
+
+
+def test_price_and_year_ranges():
+    criteria = extract_criteria("Any Mercedes C-Class between $25,000 and $32,000 with navigation and heated seats?")
+    assert (criteria["make"], criteria["model"]) == ('mercedes-benz', 'c-class')
+    assert (criteria["price_min"], criteria["price_max"]) == (25000, 32000)
+    assert criteria["features"] == ['navigation', 'heated seats']
+
+    criteria = extract_criteria("Can you find me a used Ford F-150 2015-2019 with a backup camera?")
+    assert (criteria["make"], criteria["model"]) == ('ford', 'f-150')
+    assert (criteria["year_min"], criteria["year_max"]) == (2015, 2019)
+    assert (criteria["price_min"], criteria["price_max"]) == (None, None)
+
+
+def test_multi_token_models():
+    assert (extract_criteria("bmw 3 series under 25k")["model"]) == '3-series'
+    criteria = extract_criteria("looking for a tesla model 3")
+    assert (criteria["make"], criteria["model"]) == ('tesla', 'model-3')
+    # A model alone implies its make
+    assert extract_criteria("a used model 3 please")["make"] == 'tesla'
+
+
+def test_body_type_and_low_mileage():
+    criteria = extract_criteria("I need a cheap reliable sedan for my daughter, low mileage, automatic")
+    assert criteria["body_type"] == 'sedan'
+    assert criteria["mileage_max"] == 50000
+    assert criteria["features"] == ['automatic']
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Tests for cross-source listing deduplication
+"""
+
+from dedup import deduplicate
+from listing import Listing
+
+
+def _listing(source: str = 'cars.com', url: str = 'https://www.cars.com/vehicledetail/1/', vin: str = None,
+             mileage: str = '40,000 mi.', location: str = 'Dallas Honda') -> Listing:
+    return Listing.from_dict({'title': '2019 Honda Civic EX', 'price': '$18,500', 'mileage': mileage,
+                              'location': location, 'url': url, 'source': source, 'vin': vin})
+
+
+def test_same_car_on_two_sites_is_merged():
+    cars_com = _listing()
+    autotrader = _listing('autotrader.com', 'https://www.autotrader.com/cars-for-sale/vehicle/9', '2HGFC2F59KH000001')
+
+    merged = deduplicate([cars_com, autotrader])
+    assert len(merged) == 1
+    assert (merged[0].source.value, merged[0].vin) == ('cars.com', '2HGFC2F59KH000001')
+    # Unknown mileage only matches another listing without mileage
+    assert len(deduplicate([_listing(mileage='N/A'), autotrader])) == 2
+
+
+def test_different_vins_are_never_merged():
+    first = _listing(vin='2HGFC2F59KH000001')
+    second = _listing(url='https://www.cars.com/vehicledetail/2/', vin='2HGFC2F59KH000002')
+    # Same card URL too, e.g. a dealer reusing a listing page
+    third = _listing(vin='2HGFC2F59KH000003')
+
+    assert [listing.vin for listing in deduplicate([first, second, third])] == \
+        ['2HGFC2F59KH000001', '2HGFC2F59KH000002', '2HGFC2F59KH000003']
+
+
+def test_different_dealers_are_different_cars():
+    assert len(deduplicate([_listing(), _listing(url='https://www.cars.com/vehicledetail/2/',
+                                                 location='Plano Honda')])) == 2
+
+
+def test_same_url_cards_are_merged():
+    precise = _listing(url='https://www.cars.com/vehicledetail/1/?attribution_type=isa', mileage='N/A')
+    loose = _listing(url='https://www.cars.com/vehicledetail/1', location='N/A')
+
+    merged = deduplicate([precise, loose])
+    assert len(merged) == 1
+    assert (merged[0].mileage, merged[0].location) == ('40,000 mi.', 'Dallas Honda')
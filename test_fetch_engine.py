@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Tests for the pooled async fetch engine and its blocking fallback
+"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+import pytest
+import requests
+
+import fetch_engine
+from car_scraper import CarScraper
+from fetch_engine import AsyncFetchEngine, get_fetch_engine
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == '/slow':
+            time.sleep(1)
+        body = b'<html>ok</html>'
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+@pytest.fixture
+def engine():
+    engine = AsyncFetchEngine(timeout=5)
+    yield engine
+    engine.close()
+
+
+def test_fetch_reads_the_whole_response(server, engine):
+    response = engine.fetch(f"{server}/fast")
+    assert (response.status_code, response.content) == (200, b'<html>ok</html>')
+    assert response.headers['content-length'] == '15'
+
+
+def test_slow_fetch_raises_requests_timeout(server, engine):
+    with pytest.raises(requests.exceptions.Timeout):
+        engine.fetch(f"{server}/slow", timeout=0.2)
+
+    fast, slow = engine.fetch_many([f"{server}/fast", f"{server}/slow"], timeout=0.2)
+    assert fast.status_code == 200 and isinstance(slow, requests.exceptions.Timeout)
+
+
+def test_scraper_falls_back_to_requests_without_aiohttp(server):
+    with mock.patch('fetch_engine.AIOHTTP_AVAILABLE', False):
+        assert get_fetch_engine() is None
+        scraper = CarScraper()
+    scraper.http_cache = None
+    assert scraper.fetch_engine is None
+    assert scraper._make_request(f"{server}/fast").content == b'<html>ok</html>'
+
+
+def test_brotli_is_only_requested_when_it_can_be_decoded():
+    assert ('br' in fetch_engine.ACCEPT_ENCODING) == fetch_engine.BROTLI_AVAILABLE
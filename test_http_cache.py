@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Tests for the persistent HTTP page cache and conditional requests
+"""
+
+from unittest import mock
+
+import pytest
+
+from car_scraper import CarScraper
+from fetch_engine import FetchResponse
+from http_cache import HTTPCache
+
+URL = 'https://www.cars.com/shopping/results/?zip=75201&makes[]=honda'
+PAGE = b'<html>' + b'listing ' * 500 + b'</html>'
+
+
+def _response(status_code: int = 200, content: bytes = PAGE, **headers) -> FetchResponse:
+    return FetchResponse(URL, status_code, {'Content-Type': 'text/html', **headers}, content)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return HTTPCache(str(tmp_path / 'pages.db'), max_age=60, retention=3600)
+
+
+def test_pages_round_trip_with_their_validators(cache):
+    cache.store(URL, _response(ETag='"abc"', **{'Last-Modified': 'Mon, 05 Oct 2026 10:00:00 GMT'}))
+
+    page = cache.lookup(URL)
+    assert page.body == PAGE
+    assert page.validators() == {'If-None-Match': '"abc"', 'If-Modified-Since': 'Mon, 05 Oct 2026 10:00:00 GMT'}
+    assert cache.get_fresh(URL) is not None
+    with mock.patch('http_cache.time.time', return_value=page.fetched_at + 61):
+        assert cache.get_fresh(URL) is None
+
+
+def test_errors_and_no_store_pages_are_not_kept(cache):
+    cache.store(URL, _response(503))
+    cache.store(URL, _response(**{'Cache-Control': 'private, no-store'}))
+    assert cache.lookup(URL) is None
+    assert cache.stats()['stores'] == 0
+
+
+def _scraper(cache, *responses) -> CarScraper:
+    engine = mock.Mock()
+    engine.fetch.side_effect = list(responses)
+    return CarScraper(fetch_engine=engine, rate_limiter=mock.Mock(**{'acquire.return_value': 0}), http_cache=cache)
+
+
+def test_fresh_page_skips_the_network(cache):
+    cache.store(URL, _response())
+    scraper = _scraper(cache)
+
+    assert scraper._make_request(URL).content == PAGE
+    scraper.fetch_engine.fetch.assert_not_called()
+
+
+def test_stale_page_is_revalidated_with_a_conditional_request(cache):
+    cache.store(URL, _response(ETag='"abc"'))
+    cache.max_age = 0
+    scraper = _scraper(cache, _response(304, b''))
+
+    assert scraper._make_request(URL).content == PAGE
+    assert scraper.fetch_engine.fetch.call_args.kwargs['headers']['If-None-Match'] == '"abc"'
+    assert cache.stats()['revalidated'] == 1
+
+
+def test_304_without_a_cached_copy_refetches_the_full_page(cache):
+    scraper = _scraper(cache, _response(304, b''), _response())
+
+    assert scraper._make_request(URL).content == PAGE
+    first, second = scraper.fetch_engine.fetch.call_args_list
+    assert 'If-None-Match' not in first.kwargs['headers']
+    assert second.kwargs['headers']['Cache-Control'] == 'no-cache'
+    assert cache.lookup(URL).body == PAGE
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Tests for the local chat intent classifier and search refinement
+"""
+
+import pytest
+
+from conversation_manager import ConversationManager
+from criteria_extractor import extract_criteria
+from intent_classifier import CHAT, REFINE, SEARCH, TRAINING_EXAMPLES, classify_intent
+from session_backend import MemorySessionBackend
+
+# Held-out messages, none of them in TRAINING_EXAMPLES
+LABELLED_MESSAGES = [
+    (SEARCH, "show me a used honda accord under 18k"),
+    (SEARCH, "I'm looking for a toyota tacoma"),
+    (SEARCH, "find me an suv with third row seating under $30,000"),
+    (SEARCH, "any subaru foresters near dallas"),
+    (SEARCH, "search for a 2019 mazda cx-5"),
+    (REFINE, "what about under $12,000"),
+    (REFINE, "show me cheaper ones instead"),
+    (REFINE, "only the ones newer than 2020"),
+    (REFINE, "same search but with leather"),
+    (REFINE, "what about the honda version"),
+    (CHAT, "hello!"),
+    (CHAT, "thanks, that helps a lot"),
+    (CHAT, "what is the difference between a lease and a loan"),
+    (CHAT, "is a toyota camry reliable"),
+    (CHAT, "bye for now"),
+    (SEARCH, "I need a new car"),
+    (SEARCH, "I need a minivan"),
+    (REFINE, "how about a jeep"),
+    (REFINE, "how about a nissan instead"),
+    (CHAT, "tell me more about the first listing"),
+    (CHAT, "does the first listing have a clean title"),
+    (CHAT, "how many owners did the second car have"),
+    (CHAT, "are hyundais dependable"),
+    (CHAT, "take care, bye"),
+]
+
+EMPTY_CRITERIA = {"make": None, "model": None, "year_min": None, "year_max": None, "price_max": None,
+                  "price_min": None, "mileage_max": None, "features": [], "body_type": None}
+
+
+def test_held_out_messages_are_not_training_examples():
+    training = {text.lower() for _, text in TRAINING_EXAMPLES}
+    assert not [message for _, message in LABELLED_MESSAGES if message.lower() in training]
+
+
+@pytest.mark.parametrize("label, message", LABELLED_MESSAGES)
+def test_labelled_messages(label, message):
+    assert classify_intent(message, has_previous_search=True).label == label
+
+
+def test_refinement_needs_a_previous_search():
+    intent = classify_intent("what about under $12,000", has_previous_search=False)
+    assert intent.label == SEARCH and intent.wants_search and not intent.is_refinement
+
+
+@pytest.mark.parametrize("criteria", [
+    {"make": "honda", "model": "civic", "price_max": 20000},
+    {"make": "toyota", "model": "rav4", "year_min": 2018, "features": ["awd", "sunroof"]},
+    {"make": "ford", "model": "f-150", "year_min": 2015, "year_max": 2019, "features": ["backup camera"]},
+    {"make": "chevrolet", "model": "silverado", "mileage_max": 60000, "price_max": 35000, "features": ["4wd"]},
+    {"make": "mercedes-benz", "model": "c-class", "price_min": 25000, "price_max": 32000,
+     "features": ["navigation", "heated seats"]},
+    {"make": "bmw", "model": "3-series", "price_min": 15000},
+    {"make": "tesla", "model": "model-3", "year_max": 2020},
+    {"body_type": "sedan", "mileage_max": 50000, "features": ["automatic"]},
+    {"make": "honda", "body_type": "suv"},
+])
+def test_search_query_round_trips_to_its_criteria(criteria):
+    criteria = {**EMPTY_CRITERIA, **criteria}
+    manager = ConversationManager(MemorySessionBackend())
+    assert extract_criteria(manager.generate_search_query(criteria)) == criteria
+
+
+def test_refine_criteria_updates_the_last_search():
+    manager = ConversationManager(MemorySessionBackend())
+    previous = {**EMPTY_CRITERIA, "make": "honda", "model": "civic", "price_max": 20000, "features": ["sunroof"]}
+    manager.save_search_results("alice", manager.generate_search_query(previous), [])
+
+    refined = manager.refine_criteria("alice", extract_criteria("what about under $15,000 with leather"))
+    assert refined == {**previous, "price_max": 15000, "features": ["sunroof", "leather"]}
+
+    # A different make drops the old model
+    refined = manager.refine_criteria("alice", extract_criteria("what about the toyota version"))
+    assert (refined["make"], refined["model"], refined["price_max"]) == ("toyota", None, 20000)
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Tests for the local SQLite inventory store
+"""
+
+import time
+from unittest import mock
+
+from car_scraper import CarScraper
+from config import Config
+from inventory_store import InventoryStore, matches_criteria
+from listing import Listing
+
+
+def _listing(price: str, url: str = 'https://www.cars.com/vehicledetail/123/', title: str = '2019 Honda Civic EX',
+             mileage: str = '40,000 mi.') -> Listing:
+    return Listing.from_dict({'title': title, 'price': price, 'mileage': mileage, 'location': 'Dallas, TX',
+                              'url': url, 'source': 'cars.com'})
+
+
+def test_price_drop_updates_the_same_row(tmp_path):
+    store = InventoryStore(str(tmp_path / 'inventory.db'))
+    assert store.upsert([_listing('$18,500')]) == (1, 0)
+    assert store.upsert([_listing('$17,900')]) == (0, 1)
+
+    rows = store.query('honda', 'civic')
+    assert [row.price for row in rows] == ['$17,900']
+
+
+def test_retire_unseen_drops_listings_missing_from_the_latest_refresh(tmp_path):
+    store = InventoryStore(str(tmp_path / 'inventory.db'))
+    sold = _listing('$21,000', url='https://www.cars.com/vehicledetail/456/')
+    store.upsert([_listing('$18,500'), sold], time.time() - 60, '75201', 50)
+
+    seen_at = time.time()
+    store.upsert([_listing('$18,500')], seen_at, '75201', 50)
+    assert store.retire_unseen('honda', 'civic', '75201', 50, seen_at, ['autotrader.com']) == 0
+    assert store.retire_unseen('honda', 'civic', '75201', 50, seen_at, ['cars.com']) == 1
+    assert [row.url for row in store.query('honda', 'civic')] == ['https://www.cars.com/vehicledetail/123/']
+
+
+def test_retire_unseen_is_scoped_to_the_exact_slice(tmp_path):
+    store = InventoryStore(str(tmp_path / 'inventory.db'))
+    civic = _listing('$18,500')
+    accord = _listing('$23,000', url='https://www.cars.com/vehicledetail/456/', title='2020 Honda Accord')
+    store.upsert([civic], time.time() - 60, '75201', 50)
+    store.upsert([accord], time.time() - 60, '10001', 50)
+
+    seen_at = time.time()
+    # A make-only crawl covers neither the civic slice nor another zip code
+    assert store.retire_unseen('honda', None, '75201', 50, seen_at, ['cars.com']) == 0
+    assert store.retire_unseen('honda', 'accord', '75201', 50, seen_at, ['cars.com']) == 0
+    assert len(store.query('honda')) == 2
+
+
+def test_matches_criteria_agrees_with_query(tmp_path):
+    store = InventoryStore(str(tmp_path / 'inventory.db'))
+    listings = [_listing('$18,500'), _listing('$24,000', url='https://www.cars.com/vehicledetail/789/')]
+    store.upsert(listings)
+    criteria = {'price_max': 20000, 'year_min': 2018}
+
+    assert [row.url for row in store.query('honda', 'civic', criteria)] == \
+        [listing.url for listing in listings if matches_criteria(listing, criteria)]
+    assert not matches_criteria(_listing('N/A'), {'price_max': 20000})
+
+
+def test_scraped_listings_survive_a_title_that_does_not_parse(tmp_path):
+    scraper = CarScraper()
+    scraper.inventory_store = InventoryStore(str(tmp_path / 'inventory.db'))
+    scraped = [_listing('$18,500', title='Certified Pre-Owned Sedan')]
+
+    searchers = {'cars.com': lambda query, cancel_event=None: scraped}
+    with mock.patch.object(scraper, '_get_site_searchers', return_value=searchers), \
+            mock.patch('car_scraper.Config.RESULT_CACHE_ENABLED', False):
+        assert scraper.search_all_sites('honda civic', concurrent=False) == scraped
+        assert scraper.search_all_sites('honda civic', concurrent=False, criteria={'price_max': 10000}) == scraped
+
+
+def _scraper_with_store(tmp_path, searchers: dict) -> CarScraper:
+    scraper = CarScraper()
+    scraper.inventory_store = InventoryStore(str(tmp_path / 'inventory.db'))
+    scraper._get_site_searchers = lambda: searchers
+    return scraper
+
+
+def test_make_only_search_keeps_model_slices(tmp_path):
+    civic = _listing('$18,500')
+    accord = _listing('$23,000', url='https://www.cars.com/vehicledetail/456/', title='2020 Honda Accord')
+    searchers = {'cars.com': lambda query, cancel_event=None: [civic] if 'civic' in query else [accord]}
+    scraper = _scraper_with_store(tmp_path, searchers)
+    store = scraper.inventory_store
+    civic_slice = ('honda', 'civic', Config.SEARCH_ZIP, Config.SEARCH_RADIUS)
+
+    with mock.patch('car_scraper.Config.RESULT_CACHE_ENABLED', False):
+        scraper.search_all_sites('honda civic', concurrent=False)
+        assert store.is_slice_fresh(*civic_slice)
+        scraper.search_all_sites('honda', concurrent=False)
+
+    assert [row.url for row in store.query('honda', 'civic')] == [civic.url]
+    assert store.is_slice_fresh(*civic_slice)
+
+
+def test_cached_results_do_not_refresh_the_inventory(tmp_path):
+    scraper = _scraper_with_store(tmp_path, {'cars.com': lambda query, cancel_event=None: [_listing('$18,500')]})
+    store = scraper.inventory_store
+    scraper.search_all_sites('honda civic', concurrent=False)
+
+    # The inventory has gone stale but the result cache still holds the page
+    with mock.patch('car_scraper.Config.INVENTORY_FRESH_AGE', 0), \
+            mock.patch.object(store, 'upsert', wraps=store.upsert) as upsert, \
+            mock.patch.object(store, 'mark_slice_refreshed') as mark_slice_refreshed:
+        assert [row.price for row in scraper.search_all_sites('honda civic', concurrent=False)] == ['$18,500']
+    upsert.assert_not_called()
+    mark_slice_refreshed.assert_not_called()
+
+
+def test_refresh_slice_retires_only_fully_crawled_sites(tmp_path):
+    scraper = _scraper_with_store(tmp_path, {})
+    store = scraper.inventory_store
+    zip_code, radius = Config.SEARCH_ZIP, Config.SEARCH_RADIUS
+    sold = _listing('$21,000', url='https://www.cars.com/vehicledetail/456/')
+    store.upsert([_listing('$18,500'), sold], time.time() - 60, zip_code, radius)
+
+    pages = {1: [_listing('$18,500')]}
+    fetchers = {'cars.com': lambda page, cancel_event: pages.get(page, [])}
+    with mock.patch('car_scraper.Config.CRAWLER_DEEP', True), \
+            mock.patch.object(scraper, '_page_fetchers', return_value=fetchers):
+        # Page 2 runs past the page limit, so the crawl may have missed listings
+        with mock.patch('car_scraper.Config.DEEP_CRAWL_MAX_PAGES', 1):
+            scraper.refresh_slice('honda', 'civic')
+        assert len(store.query('honda', 'civic')) == 2
+
+        scraper.refresh_slice('honda', 'civic')
+    assert [row.url for row in store.query('honda', 'civic')] == ['https://www.cars.com/vehicledetail/123/']
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Tests for the typed listing record
+"""
+
+from unittest import mock
+
+from car_scraper import CarScraper
+from listing import Listing, parse_mileage, parse_price
+
+
+def test_parse_price():
+    assert parse_price('$18,500') == 18500
+    assert parse_price('$18.5k') == 18500
+    assert parse_price('Price 12,000') == 12000
+    assert parse_price('N/A') is None
+
+
+def test_parse_mileage():
+    assert parse_mileage('45,000 miles') == 45000
+    assert parse_mileage('45K mi.') == 45000
+    assert parse_mileage('45000') == 45000
+
+
+def test_comma_only_numbers_are_not_values():
+    assert parse_price('$,') is None
+    assert parse_price(',,,,') is None
+    assert parse_mileage(', miles') is None
+    listing = Listing.from_dict({'title': '2019 Honda Civic', 'price': '$,', 'mileage': ', miles'})
+    assert (listing.price_value, listing.mileage_value) == (None, None)
+
+
+def test_autotrader_conversion_errors_fail_only_that_site():
+    scraper = CarScraper()
+    scraper.inventory_store = None
+    listing = Listing.from_dict({'title': '2019 Honda Civic', 'url': 'https://www.cars.com/vehicledetail/1/'})
+    searchers = {'cars.com': lambda query, cancel_event=None: [listing], 'autotrader.com': scraper.search_autotrader}
+    with mock.patch.object(scraper, '_get_site_searchers', return_value=searchers), \
+            mock.patch.object(scraper, '_scrape_autotrader_url', return_value=[{'title': 'x'}]), \
+            mock.patch.object(scraper, '_to_listings', side_effect=ValueError('bad listing')), \
+            mock.patch('car_scraper.Config.RESULT_CACHE_ENABLED', False), \
+            mock.patch('car_scraper.Config.SEARCH_ALLOW_PARTIAL', True), \
+            mock.patch('car_scraper.time.sleep'):
+        assert scraper.search_all_sites('honda civic', concurrent=False) == [listing]
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Tests for the LLM completion cache
+"""
+
+import time
+from unittest import mock
+
+from llm_cache import LLMCache
+
+
+class StubEmbedder:
+    """Maps every text to the same vector, so only the scope keeps entries apart"""
+
+    def embed(self, text: str):
+        return [1.0, 0.0]
+
+
+def _request(query: str) -> dict:
+    return {
+        'model': 'gpt-3.5-turbo',
+        'temperature': 0.3,
+        'max_tokens': 100,
+        'messages': [
+            {'role': 'system', 'content': 'You are a car search optimization assistant.'},
+            {'role': 'user', 'content': f'Rewrite this car search for a listings site: {query}'}
+        ]
+    }
+
+
+def _cache(**kwargs) -> LLMCache:
+    kwargs.setdefault('max_entries', 16)
+    kwargs.setdefault('ttl', 60)
+    return LLMCache(**kwargs)
+
+
+def test_price_spellings_share_an_exact_entry():
+    cache = _cache()
+    cache.set(_request('honda civic under $20,000'), 'Honda Civic under $20,000')
+    assert cache.get(_request('Honda  Civic under 20k')) == 'Honda Civic under $20,000'
+    assert cache.hits == 1
+
+
+def test_similar_prompt_hits_within_the_same_vehicle_and_numbers():
+    cache = _cache(embedder=StubEmbedder(), similarity_threshold=0.9)
+    query = 'reliable honda civic under $20,000'
+    cache.set(_request(query), 'cached answer', similar_to=query)
+
+    rephrased = 'dependable honda civic under $20,000'
+    assert cache.get(_request(rephrased), similar_to=rephrased) == 'cached answer'
+    assert cache.similar_hits == 1
+
+
+def test_no_similar_hit_across_numbers_or_vehicles():
+    cache = _cache(embedder=StubEmbedder(), similarity_threshold=0.9)
+    query = 'looking for a reliable used honda civic with low miles under $20,000 near dallas'
+    cache.set(_request(query), 'civic answer', similar_to=query)
+
+    for other in ('looking for a reliable used honda civic with low miles under $25,000 near dallas',
+                  'looking for a reliable used toyota corolla with low miles under $20,000 near dallas'):
+        assert cache.get(_request(other), similar_to=other) is None
+    assert cache.misses == 2
+
+
+def test_entries_expire_after_the_ttl():
+    cache = _cache(ttl=10)
+    now = time.time()
+    with mock.patch('result_cache.time.time', return_value=now):
+        cache.set(_request('honda civic'), 'answer')
+    with mock.patch('result_cache.time.time', return_value=now + 5):
+        assert cache.get(_request('honda civic')) == 'answer'
+    with mock.patch('result_cache.time.time', return_value=now + 11):
+        assert cache.get(_request('honda civic')) is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = _cache(max_entries=2)
+    cache.set(_request('honda civic'), 'civic')
+    cache.set(_request('toyota corolla'), 'corolla')
+    assert cache.get(_request('honda civic')) == 'civic'
+
+    cache.set(_request('ford f-150'), 'f-150')
+    assert cache.get(_request('toyota corolla')) is None
+    assert cache.get(_request('honda civic')) == 'civic'
+    assert cache.stats()['entries'] == 2
+
+
+def test_hit_rate_counters():
+    cache = _cache(embedder=StubEmbedder(), similarity_threshold=0.9)
+    cache.set(_request('honda civic'), 'civic', similar_to='honda civic')
+    cache.get(_request('honda civic'), similar_to='honda civic')
+    cache.get(_request('a honda civic'), similar_to='a honda civic')
+    cache.get(_request('mazda miata'), similar_to='mazda miata')
+
+    assert cache.stats() == {'entries': 1, 'hits': 1, 'similar_hits': 1, 'misses': 1, 'hit_rate': 0.667}
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Tests for the concurrent paginated crawl
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from pagination import crawl_pages
+
+
+@pytest.fixture
+def executor():
+    executor = ThreadPoolExecutor(max_workers=4)
+    yield executor
+    executor.shutdown(wait=True)
+
+
+def _fetcher(pages: dict, fetched: list):
+    def fetch_page(page: int, cancel_event: threading.Event):
+        fetched.append(page)
+        items = pages.get(page, [])
+        if isinstance(items, Exception):
+            raise items
+        return items
+    return fetch_page
+
+
+def test_empty_page_ends_the_crawl(executor):
+    fetched = []
+    status = {}
+    pages = {1: ['a', 'b'], 2: ['c'], 3: []}
+
+    items = list(crawl_pages(_fetcher(pages, fetched), executor, max_pages=10, concurrency=1, status=status))
+    assert items == ['a', 'b', 'c']
+    assert fetched == [1, 2, 3]
+    assert status['complete']
+
+
+def test_empty_first_page_fetches_nothing_else(executor):
+    fetched = []
+    assert list(crawl_pages(_fetcher({}, fetched), executor, max_pages=10, concurrency=3)) == []
+    assert fetched == [1]
+
+
+def test_max_pages_caps_the_crawl(executor):
+    fetched = []
+    status = {}
+    pages = {page: [f"car{page}"] for page in range(1, 10)}
+
+    items = list(crawl_pages(_fetcher(pages, fetched), executor, max_pages=3, concurrency=2, status=status))
+    assert sorted(items) == ['car1', 'car2', 'car3']
+    assert sorted(fetched) == [1, 2, 3]
+    assert not status['complete']
+
+
+def test_target_stops_early_counting_only_wanted_items(executor):
+    fetched = []
+    status = {}
+    pages = {1: ['junk', 'good1'], 2: ['good2', 'good3'], 3: ['good4']}
+
+    items = list(crawl_pages(_fetcher(pages, fetched), executor, max_pages=10, concurrency=1, target=2,
+                             is_wanted=lambda item: item.startswith('good'), status=status))
+    assert items == ['junk', 'good1', 'good2']
+    assert 3 not in fetched
+    assert not status['complete']
+
+
+def test_repeats_across_pages_are_skipped(executor):
+    pages = {1: ['a', 'b'], 2: ['b', 'c'], 3: []}
+    items = list(crawl_pages(_fetcher(pages, []), executor, max_pages=10, concurrency=1, keys=lambda item: [item]))
+    assert items == ['a', 'b', 'c']
+
+
+def test_failed_page_is_skipped_but_leaves_the_crawl_incomplete(executor):
+    status = {}
+    pages = {1: ['a'], 2: ConnectionError('blocked'), 3: ['c'], 4: []}
+
+    items = list(crawl_pages(_fetcher(pages, []), executor, max_pages=10, concurrency=1, status=status))
+    assert items == ['a', 'c']
+    assert not status['complete']
+
+
+def test_stale_page_ends_an_incremental_crawl(executor):
+    fetched = []
+    pages = {1: ['new1'], 2: ['old1'], 3: ['new2']}
+
+    items = list(crawl_pages(_fetcher(pages, fetched), executor, max_pages=10, concurrency=1,
+                             is_stale_page=lambda items: all(item.startswith('old') for item in items)))
+    assert items == ['new1', 'old1']
+    assert fetched == [1, 2]
+
+
+def test_abandoned_crawl_cancels_in_flight_pages(executor):
+    started = threading.Event()
+    cancelled = threading.Event()
+
+    def fetch_page(page, cancel_event):
+        if page <= 2:
+            return [f"car{page}"]
+        # Page 3 hangs until the crawl is abandoned
+        started.set()
+        if cancel_event.wait(5):
+            cancelled.set()
+        return [f"car{page}"]
+
+    crawl = crawl_pages(fetch_page, executor, max_pages=5, concurrency=2)
+    assert [next(crawl), next(crawl)] == ['car1', 'car2']
+    assert started.wait(5)
+    crawl.close()
+    assert cancelled.wait(5)
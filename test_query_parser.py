@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Tests for the local search query parser
+"""
+
+from car_scraper import CarScraper
+from query_parser import parse_query
+
+
+def test_make_and_catalog_model():
+    parsed = parse_query("2018 or newer honda crv under 25k")
+    assert (parsed.make, parsed.model) == ('honda', 'cr-v')
+    assert parsed.confidence == 1.0
+    assert parsed.search_query() == "2018 or newer Honda CR-V under $25,000"
+
+
+def test_make_only_queries_have_no_model():
+    for query in ("honda under 20k", "Honda under $20,000"):
+        parsed = parse_query(query)
+        assert (parsed.make, parsed.model) == ('honda', None)
+        assert parsed.price_max == 20000
+        assert parsed.confidence == 0.6
+
+
+def test_body_style_and_feature_terms_are_kept():
+    assert parse_query("toyota suv").search_query() == "Toyota SUV"
+    assert parse_query("honda civic awd under 20k").search_query() == "Honda Civic AWD under $20,000"
+    # A term right after the make is not an unknown model
+    assert parse_query("honda awd").model is None
+
+
+def test_make_only_with_unplaced_words_goes_to_the_llm():
+    assert parse_query("honda with heated seats").confidence < 0.6
+
+
+def test_demo_listings_for_make_only_query():
+    scraper = CarScraper()
+    titles = [listing.title for listing in scraper._generate_mock_listings("honda under 20k")]
+    assert titles[0] == "2020 Honda - Clean Carfax"
+    titles = [listing.title for listing in scraper._generate_mock_listings("honda crv")]
+    assert titles[0] == "2020 Honda CR-V - Clean Carfax"
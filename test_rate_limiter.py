@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Tests for the per-host token bucket rate limiter
+"""
+
+from email.utils import formatdate
+from unittest import mock
+
+import pytest
+
+from rate_limiter import SQLiteTokenBucketLimiter, TokenBucketLimiter, parse_retry_after
+
+HOST = 'www.cars.com'
+
+
+class FakeClock:
+    """Stands in for the time module; sleeping just moves the clock forward"""
+
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    clock = FakeClock()
+    with mock.patch('rate_limiter.time', clock):
+        yield clock
+
+
+def test_burst_then_steady_rate(clock):
+    limiter = TokenBucketLimiter(rate=2, burst=2, jitter=0)
+    assert [limiter.acquire(HOST), limiter.acquire(HOST)] == [0.0, 0.0]
+    assert limiter.acquire(HOST) == pytest.approx(0.5)
+    # Other hosts have their own budget
+    assert limiter.acquire('www.autotrader.com') == 0.0
+
+
+def test_tokens_refill_up_to_the_burst(clock):
+    limiter = TokenBucketLimiter(rate=2, burst=2, jitter=0)
+    limiter.acquire(HOST)
+    limiter.acquire(HOST)
+
+    clock.sleep(60)
+    assert [limiter.acquire(HOST), limiter.acquire(HOST)] == [0.0, 0.0]
+    assert limiter.acquire(HOST) == pytest.approx(0.5)
+
+
+def test_retry_after_blocks_the_host_and_halves_its_rate(clock):
+    limiter = TokenBucketLimiter(rate=2, burst=2, jitter=0)
+    limiter.record_response(HOST, 429, '10')
+
+    assert limiter.acquire(HOST) == pytest.approx(10)
+    # Tokens refilled at the halved rate during the pause
+    assert limiter.acquire(HOST) == 0.0
+    assert limiter.acquire(HOST) == pytest.approx(1.0)
+
+    limiter.record_response(HOST, 200)
+    assert limiter.acquire(HOST) == pytest.approx(0.8)
+
+
+def test_throttle_without_retry_after_uses_the_default_backoff(clock):
+    limiter = TokenBucketLimiter(rate=2, burst=2, jitter=0)
+    with mock.patch('rate_limiter.Config.RATE_LIMIT_BACKOFF', 30):
+        limiter.record_response(HOST, 503)
+    assert limiter.acquire(HOST) >= 30
+
+
+def test_parse_retry_after():
+    assert parse_retry_after('120') == 120
+    assert parse_retry_after(formatdate(1_000_090.0, usegmt=True)) is not None
+    assert parse_retry_after('soon') is None
+    assert parse_retry_after(None) is None
+
+    with mock.patch('rate_limiter.time', FakeClock()):
+        assert parse_retry_after(formatdate(1_000_090.0, usegmt=True)) == pytest.approx(90)
+
+
+def test_sqlite_limiter_shares_one_budget(clock, tmp_path):
+    first = SQLiteTokenBucketLimiter(str(tmp_path / 'limits.db'), rate=2, burst=2, jitter=0)
+    second = SQLiteTokenBucketLimiter(str(tmp_path / 'limits.db'), rate=2, burst=2, jitter=0)
+
+    assert [first.acquire(HOST), second.acquire(HOST)] == [0.0, 0.0]
+    assert first.acquire(HOST) == pytest.approx(0.5)
+    second.record_response(HOST, 429, '5')
+    assert first.acquire(HOST) >= 5
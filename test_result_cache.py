@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Tests for the TTL result cache and stale-while-revalidate searches
+"""
+
+import threading
+from unittest import mock
+
+from car_scraper import CarScraper
+from listing import Listing
+from result_cache import FRESH, STALE, TTLCache
+
+
+def _listing(price: str) -> Listing:
+    return Listing.from_dict({'title': '2019 Honda Civic EX', 'price': price, 'source': 'cars.com'})
+
+
+def test_entries_go_stale_then_expire():
+    cache = TTLCache(max_entries=10, stale_ttl=60)
+    with mock.patch('result_cache.time.time', return_value=1000.0):
+        cache.set('key', 'value', ttl=30)
+
+    with mock.patch('result_cache.time.time', return_value=1029.0):
+        assert cache.get('key') == ('value', FRESH)
+    with mock.patch('result_cache.time.time', return_value=1089.0):
+        assert cache.get('key') == ('value', STALE)
+    with mock.patch('result_cache.time.time', return_value=1090.0):
+        assert cache.get('key') == (None, None)
+    assert cache.stats()['entries'] == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(max_entries=2)
+    cache.set('a', 1, ttl=60)
+    cache.set('b', 2, ttl=60)
+    cache.get('a')
+    cache.set('c', 3, ttl=60)
+
+    assert [cache.get(key)[0] for key in ('a', 'b', 'c')] == [1, None, 3]
+    assert cache.stats()['hits'] == 3 and cache.stats()['misses'] == 1
+
+
+def test_stale_results_are_served_while_one_refresh_runs():
+    scraper = CarScraper()
+    scraper.search_cache = TTLCache(max_entries=10, stale_ttl=600)
+    key = scraper._cache_key('cars.com', 'honda civic')
+    # Expired a second ago, still inside the stale window
+    scraper.search_cache.set(key, [_listing('$18,500')], ttl=-1)
+
+    release = threading.Event()
+    refreshed = threading.Event()
+    calls = []
+
+    def searcher(query, cancel_event=None):
+        calls.append(query)
+        release.wait(5)
+        refreshed.set()
+        return [_listing('$17,900')]
+
+    with mock.patch('car_scraper.Config.RESULT_CACHE_ENABLED', True):
+        for _ in range(3):
+            listings = scraper._search_site_cached('cars.com', searcher, 'honda civic')
+            assert [listing.price for listing in listings] == ['$18,500']
+        release.set()
+        assert refreshed.wait(5)
+        scraper.executor.shutdown(wait=True)
+
+    assert calls == ['honda civic']
+    assert [listing.price for listing in scraper.search_cache.get(key)[0]] == ['$17,900']
+
+
+def test_empty_results_are_not_cached():
+    scraper = CarScraper()
+    scraper.search_cache = TTLCache(max_entries=10)
+    with mock.patch('car_scraper.Config.RESULT_CACHE_ENABLED', True):
+        scraper._search_site_cached('cars.com', lambda query, cancel_event=None: [], 'honda civic')
+    assert scraper.search_cache.get(scraper._cache_key('cars.com', 'honda civic')) == (None, None)
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Tests for precompiled selector plans
+"""
+
+from bs4 import BeautifulSoup
+
+from car_scraper import CarScraper
+from selector_plan import SelectorPlan
+
+PRECISE_CARD = '''
+<div class="vehicle-card">
+  <h2 class="title">2019 Honda Civic EX</h2>
+  <span class="price-drop-badge">Price drop</span>
+  <span class="primary-price">$18,500</span>
+  <a href="/dealers/x">Dealer</a>
+  <a class="vehicle-card-link" href="/vehicledetail/123/">Details</a>
+</div>
+'''
+
+LOOSE_CARD = '''
+<div class="vehicle-card">
+  <h2 class="title">2018 Honda Accord</h2>
+  <span class="price-drop-badge">$17,000</span>
+  <a href="/dealers/y">Dealer</a>
+</div>
+'''
+
+
+def _card(html: str):
+    return BeautifulSoup(html, 'lxml').find('div')
+
+
+def test_priority_order_does_not_depend_on_earlier_cards():
+    scraper = CarScraper()
+    # The loose card can only match the fallback selectors
+    scraper._parse_cars_com_listing(_card(LOOSE_CARD), 1)
+
+    listing = scraper._parse_cars_com_listing(_card(PRECISE_CARD), 2)
+    assert listing['price'] == '$18,500'
+    assert listing['url'] == 'https://www.cars.com/vehicledetail/123/'
+
+
+def test_live_selectors_skip_only_page_misses():
+    plan = SelectorPlan('price', ['span.primary-price', 'span[class*="price"]', 'div.missing'])
+    soup = BeautifulSoup(PRECISE_CARD + LOOSE_CARD, 'lxml')
+    live = plan.live(soup)
+    assert live == (0, 1)
+
+    cards = soup.find_all('div', class_='vehicle-card')
+    assert [plan.select_one(card, candidates=live).get_text() for card in cards] == ['$18,500', '$17,000']
+    assert plan.hits == [1, 1, 0]
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Tests for the versioned chat session backends
+"""
+
+import time
+from unittest import mock
+
+import pytest
+
+from conversation_manager import ConversationManager
+from listing import Listing
+import session_backend
+from session_backend import (MemorySessionBackend, RedisSessionBackend, SessionBackend, SessionConflict,
+                             SQLiteSessionBackend, decode_session, encode_session)
+
+
+def _session(text: str = 'hello') -> dict:
+    return {
+        'messages': [{'role': 'user', 'content': text}],
+        'last_search': None,
+        'search_history': [],
+        'message_count': 1,
+        'searches_performed': 0,
+        'created_at': '2026-01-01T00:00:00'
+    }
+
+
+class FakePipeline:
+    """The WATCH/MULTI subset of a redis pipeline used by RedisSessionBackend"""
+
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def watch(self, key):
+        pass
+
+    def unwatch(self):
+        pass
+
+    def hget(self, key, field):
+        return self.client.hashes.get(key, {}).get(field)
+
+    def multi(self):
+        pass
+
+    def hset(self, key, mapping):
+        self.commands.append(lambda: self.client.hashes.setdefault(key, {}).update(
+            {field: str(value).encode() if isinstance(value, int) else value for field, value in mapping.items()}))
+
+    def expire(self, key, seconds):
+        self.commands.append(lambda: self.client.expiries.__setitem__(key, seconds))
+
+    def execute(self):
+        for command in self.commands:
+            command()
+
+
+class FakeRedis:
+    def __init__(self):
+        self.hashes = {}
+        self.expiries = {}
+
+    def hmget(self, key, *fields):
+        return [self.hashes.get(key, {}).get(field) for field in fields]
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+
+@pytest.fixture(params=['memory', 'sqlite', 'redis'])
+def backend(request, tmp_path):
+    if request.param == 'memory':
+        return MemorySessionBackend(max_sessions=10, idle_ttl=60)
+    if request.param == 'sqlite':
+        return SQLiteSessionBackend(str(tmp_path / 'sessions.sqlite3'), idle_ttl=60)
+    return RedisSessionBackend(idle_ttl=60, client=FakeRedis())
+
+
+def test_stale_version_is_rejected(backend):
+    assert backend.load('alice') == (None, 0)
+    assert backend.save('alice', _session('first'), 0)
+
+    session, version = backend.load('alice')
+    assert version == 1 and session['messages'][0]['content'] == 'first'
+
+    # Another writer got in first with the same version
+    assert backend.save('alice', _session('second'), version)
+    assert not backend.save('alice', _session('lost'), version)
+    assert not backend.save('alice', _session('lost'), 0)
+    assert backend.load('alice')[0]['messages'][0]['content'] == 'second'
+
+
+def test_redis_sessions_expire_after_the_idle_ttl():
+    client = FakeRedis()
+    backend = RedisSessionBackend(idle_ttl=90, client=client)
+    backend.save('alice', _session(), 0)
+    assert client.expiries[RedisSessionBackend.KEY_PREFIX + 'alice'] == 90
+
+
+def test_sqlite_idle_session_expires_and_can_be_replaced(tmp_path):
+    backend = SQLiteSessionBackend(str(tmp_path / 'sessions.sqlite3'), idle_ttl=60)
+    now = time.time()
+    with mock.patch('session_backend.time.time', return_value=now):
+        assert backend.save('alice', _session('old'), 0)
+
+    with mock.patch('session_backend.time.time', return_value=now + 61):
+        assert backend.load('alice') == (None, 0)
+        # A new conversation starts at version 0 and replaces the expired row
+        assert backend.save('alice', _session('new'), 0)
+        session, version = backend.load('alice')
+    assert version == 1 and session['messages'][0]['content'] == 'new'
+
+
+def test_sqlite_live_session_is_not_replaced_by_a_new_one(tmp_path):
+    backend = SQLiteSessionBackend(str(tmp_path / 'sessions.sqlite3'), idle_ttl=60)
+    assert backend.save('alice', _session('live'), 0)
+    assert not backend.save('alice', _session('new'), 0)
+
+
+def test_memory_idle_session_expires():
+    backend = MemorySessionBackend(max_sessions=10, idle_ttl=60)
+    now = time.time()
+    with mock.patch('session_backend.time.time', return_value=now):
+        backend.save('alice', _session(), 0)
+    with mock.patch('session_backend.time.time', return_value=now + 61):
+        assert backend.load('alice') == (None, 0)
+        assert backend.save('alice', _session('new'), 0)
+    assert backend.evicted == 1
+
+
+def test_encode_decode_round_trip():
+    listing = Listing.from_dict({'title': '2019 Honda Civic EX', 'price': '$18,500', 'mileage': '40,000 mi.',
+                                 'location': 'Dallas, TX', 'url': 'https://www.cars.com/vehicledetail/1/',
+                                 'source': 'cars.com'})
+    session = _session()
+    session['last_search'] = {'query': 'Honda Civic', 'results': (listing,), 'timestamp': 'now', 'count': 1}
+
+    decoded = decode_session(encode_session(session))
+    assert decoded['messages'] == session['messages']
+    assert decoded['last_search']['query'] == 'Honda Civic'
+    assert [item.to_dict() for item in decoded['last_search']['results']] == [listing.to_dict()]
+    assert decoded['last_search']['results'][0].price_value == 18500
+
+
+def test_backends_must_implement_load_and_save():
+    class LoadOnly(SessionBackend):
+        def load(self, user_id):
+            return None, 0
+
+    with pytest.raises(TypeError):
+        LoadOnly()
+
+
+def test_redis_backend_without_redis_is_a_config_error():
+    with mock.patch.object(session_backend, '_shared_backend', None), \
+            mock.patch('session_backend.Config.SESSION_BACKEND', 'redis'), \
+            mock.patch('session_backend.REDIS_AVAILABLE', False):
+        with pytest.raises(ValueError, match='SESSION_BACKEND=redis'):
+            session_backend.get_session_backend()
+
+
+def test_update_raises_session_conflict_after_the_retries():
+    backend = mock.Mock()
+    backend.load.return_value = (None, 0)
+    backend.save.return_value = False
+
+    with mock.patch('conversation_manager.Config.SESSION_MAX_RETRIES', 3):
+        with pytest.raises(SessionConflict):
+            ConversationManager(backend).add_message('alice', 'user', 'hi')
+    assert backend.save.call_count == 3
+
+
+def test_chat_route_reports_a_busy_conversation():
+    import app as web_app
+
+    orchestrator = mock.Mock()
+    orchestrator.run.side_effect = SessionConflict('alice kept changing')
+    with mock.patch.object(web_app, 'ai_processor', mock.Mock()), \
+            mock.patch.object(web_app, 'orchestrator', orchestrator):
+        response = web_app.app.test_client().post('/chat', json={'message': 'honda civic', 'user_id': 'alice'})
+
+    assert response.status_code == 409
+    assert response.get_json()['error'] == web_app.SESSION_BUSY_MESSAGE
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Tests for JSON-LD and app-state listing extraction
+"""
+
+import json
+
+from structured_data import extract_structured_listings, is_result_page, merge_structured
+
+
+def _page(*blocks) -> bytes:
+    scripts = ''.join(f'<script type="application/ld+json">{json.dumps(block)}</script>' for block in blocks)
+    return f'<html><head>{scripts}</head><body></body></html>'.encode('utf-8')
+
+
+def _car(n: int, **fields) -> dict:
+    car = {'@type': 'Car', 'name': f'2019 Honda Civic #{n}', 'brand': {'name': 'Honda'},
+           'url': f'/vehicledetail/{n}/', 'offers': {'price': 18000 + n}}
+    car.update(fields)
+    return car
+
+
+def test_page_level_product_is_not_a_listing():
+    product = {'@type': 'Product', 'name': 'Used Honda for sale', 'brand': 'Honda',
+               'offers': {'@type': 'AggregateOffer', 'lowPrice': 3000}}
+    assert extract_structured_listings(_page(product), 'cars.com', 'https://www.cars.com') == []
+
+
+def test_product_with_vehicle_fields_is_a_listing():
+    product = {'@type': 'Product', 'name': '2020 Honda Accord', 'brand': 'Honda',
+               'vehicleIdentificationNumber': '1HGCV1F30LA000001', 'offers': {'price': 21000}}
+    listings = extract_structured_listings(_page(product), 'cars.com', 'https://www.cars.com')
+    assert [(listing['title'], listing['price'], listing['vin']) for listing in listings] == \
+        [('2020 Honda Accord', '$21,000', '1HGCV1F30LA000001')]
+
+
+def test_list_valued_offers_use_the_first_offer():
+    car = _car(1, offers=[{'price': 17500, 'url': '/vehicledetail/1/'}, {'price': 99999}])
+    listing = extract_structured_listings(_page(car), 'cars.com', 'https://www.cars.com')[0]
+    assert listing['price'] == '$17,500'
+
+
+def test_is_result_page_needs_enough_listings_with_urls():
+    listings = extract_structured_listings(_page(*(_car(n) for n in range(3))), 'cars.com', 'https://www.cars.com')
+    assert is_result_page(listings, 3)
+    assert not is_result_page(listings[:2], 3)
+
+    without_url = extract_structured_listings(_page(_car(1), _car(2), _car(3, url=None)), 'cars.com',
+                                              'https://www.cars.com')
+    assert not is_result_page(without_url, 3)
+
+
+def test_merge_structured_keeps_dom_listings_first():
+    dom = [{'title': 'DOM car', 'url': 'https://www.cars.com/vehicledetail/1/'}]
+    structured = [{'title': 'Same car', 'url': 'https://www.cars.com/vehicledetail/1/'},
+                  {'title': 'Other car', 'url': 'https://www.cars.com/vehicledetail/2/'}]
+    assert [listing['title'] for listing in merge_structured(dom, structured)] == ['DOM car', 'Other car']
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Tests for ranking and racing site URL patterns
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from url_strategy import AttemptCancelled, UrlStrategy
+
+CANDIDATES = [('standard', 'https://example.com/a'), ('with_model', 'https://example.com/b'),
+              ('mobile', 'https://example.com/c')]
+
+
+@pytest.fixture
+def executor():
+    executor = ThreadPoolExecutor(max_workers=4)
+    yield executor
+    executor.shutdown(wait=True)
+
+
+def test_patterns_are_ranked_by_past_success():
+    strategy = UrlStrategy('cars.com')
+    strategy.record('standard', False)
+    strategy.record('mobile', True)
+
+    assert [name for name, _ in strategy.rank(CANDIDATES)] == ['mobile', 'with_model', 'standard']
+
+
+def test_sequential_run_stops_at_the_first_good_pattern():
+    strategy = UrlStrategy('cars.com')
+    results = {'https://example.com/a': [], 'https://example.com/b': [{'title': 'car'}]}
+    tried = []
+
+    def attempt(url, cancel_event):
+        tried.append(url)
+        return results[url]
+
+    assert strategy.run(CANDIDATES, attempt) == [{'title': 'car'}]
+    assert tried == ['https://example.com/a', 'https://example.com/b']
+    assert strategy.stats() == {'standard': {'successes': 0, 'attempts': 1},
+                                'with_model': {'successes': 1, 'attempts': 1}}
+
+
+def test_race_returns_the_first_winner_and_cancels_the_losers(executor):
+    strategy = UrlStrategy('cars.com')
+    loser_cancelled = threading.Event()
+
+    def attempt(url, cancel_event):
+        if url == 'https://example.com/b':
+            return [{'title': 'car'}]
+        # A slow pattern that keeps going until it is told the race is over
+        if cancel_event.wait(5):
+            loser_cancelled.set()
+            raise AttemptCancelled()
+        return []
+
+    assert strategy.run(CANDIDATES, attempt, race_width=2, executor=executor) == [{'title': 'car'}]
+    assert loser_cancelled.wait(5)
+    # The cancelled loser isn't penalized for losing
+    assert 'standard' not in strategy.stats()
+
+
+def test_every_pattern_failing_raises_the_last_error(executor):
+    strategy = UrlStrategy('cars.com')
+
+    def attempt(url, cancel_event):
+        raise ConnectionError(url)
+
+    with pytest.raises(ConnectionError, match='example.com/c'):
+        strategy.run(CANDIDATES, attempt, race_width=2, executor=executor)
+    # A pattern that answers with no listings is not a failure
+    assert strategy.run(CANDIDATES, lambda url, cancel_event: []) == []
+
+
+def test_cancelling_the_run_stops_later_patterns():
+    strategy = UrlStrategy('cars.com')
+    cancel_event = threading.Event()
+    tried = []
+
+    def attempt(url, attempt_cancel_event):
+        tried.append(url)
+        cancel_event.set()
+        return []
+
+    with pytest.raises(AttemptCancelled):
+        strategy.run(CANDIDATES, attempt, cancel_event=cancel_event)
+    assert tried == ['https://example.com/a']
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+URL Strategy for Car Listing Agent
+Orders a site's URL patterns by past success and optionally races the best ones
+"""
+
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+from typing import Callable, Dict, List, Tuple
+
+
+class AttemptCancelled(Exception):
+    """Raised inside an attempt once another candidate has already won the race"""
+
+
+class _RaceEvent:
+    """Cancel flag for one race's losers that also trips when the whole run is cancelled"""
+
+    def __init__(self, parent: threading.Event):
+        self.parent = parent
+        self._won = threading.Event()
+
+    def set(self) -> None:
+        self._won.set()
+
+    def is_set(self) -> bool:
+        return self._won.is_set() or self.parent.is_set()
+
+    def wait(self, timeout: float = None) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.is_set():
+            remaining = 0.05 if deadline is None else min(0.05, deadline - time.monotonic())
+            if remaining <= 0:
+                return False
+            self._won.wait(remaining)
+        return True
+
+
+class UrlStrategy:
+    def __init__(self, site: str):
+        self.site = site
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def success_rate(self, name: str) -> float:
+        """Laplace-smoothed success rate so untried patterns start at 0.5"""
+        with self._lock:
+            successes, attempts = self._stats.get(name, (0, 0))
+        return (successes + 1) / (attempts + 2)
+
+    def record(self, name: str, success: bool) -> None:
+        with self._lock:
+            successes, attempts = self._stats.get(name, (0, 0))
+            self._stats[name] = (successes + int(success), attempts + 1)
+
+    def rank(self, candidates: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+        """Best patterns first; ties keep their declared order"""
+        return sorted(candidates, key=lambda candidate: -self.success_rate(candidate[0]))
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {name: {'successes': s, 'attempts': a} for name, (s, a) in self._stats.items()}
+
+    def run(self, candidates: List[Tuple[str, str]], attempt: Callable, min_results: int = 1,
+            race_width: int = 1, executor=None, cancel_event: threading.Event = None) -> List[Dict]:
+        """Try candidates best-first until one yields at least min_results listings.
+
+        attempt(url, cancel_event) returns a list of listings. With race_width > 1 the
+        top candidates run concurrently on executor and the losers are cancelled as
+        soon as one succeeds; any remaining candidates are then tried one at a time.
+        Setting cancel_event stops the whole run with AttemptCancelled. If every
+        candidate raised, the last error is re-raised so callers can tell a failed
+        site from one that simply has no listings.
+        """
+        ranked = self.rank(candidates)
+        cancel_event = cancel_event or threading.Event()
+        errors = []
+        best = []
+
+        if race_width > 1 and executor is not None and len(ranked) > 1:
+            racers, ranked = ranked[:race_width], ranked[race_width:]
+            listings = self._race(racers, attempt, min_results, executor, cancel_event, errors)
+            if len(listings) >= min_results:
+                return listings
+            best = listings
+
+        for name, url in ranked:
+            if cancel_event.is_set():
+                raise AttemptCancelled()
+            listings = self._attempt(name, url, attempt, min_results, cancel_event, errors)
+            if len(listings) >= min_results:
+                return listings
+            if len(listings) > len(best):
+                best = listings
+
+        if cancel_event.is_set():
+            raise AttemptCancelled()
+        if errors and len(errors) == len(candidates):
+            raise errors[-1]
+        return best
+
+    def _attempt(self, name: str, url: str, attempt: Callable, min_results: int,
+                 cancel_event: threading.Event, errors: List[Exception]) -> List[Dict]:
+        try:
+            listings = attempt(url, cancel_event)
+        except AttemptCancelled:
+            return []
+        except Exception as e:
+            print(f"❌ Error with {self.site} URL pattern '{name}': {e}")
+            errors.append(e)
+            listings = []
+
+        # Don't penalize a pattern that was only stopped because another one won
+        if not cancel_event.is_set():
+            self.record(name, len(listings) >= min_results)
+        return listings
+
+    def _race(self, racers: List[Tuple[str, str]], attempt: Callable, min_results: int,
+              executor, cancel_event: threading.Event, errors: List[Exception]) -> List[Dict]:
+        race_event = _RaceEvent(cancel_event)
+        pending = {executor.submit(self._attempt, name, url, attempt, min_results, race_event, errors)
+                   for name, url in racers}
+        best = []
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                listings = future.result()
+                if len(listings) >= min_results:
+                    race_event.set()
+                    for loser in pending:
+                        loser.cancel()
+                    return listings
+                if len(listings) > len(best):
+                    best = listings
+
+        return best
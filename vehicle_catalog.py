@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Vehicle Catalog for Car Listing Agent
+Bundled make/model catalog and a token trie that finds vehicles in free text
+"""
+
+import re
+import sys
+from typing import Dict, FrozenSet, Iterator, List, Optional, Tuple
+
+TOKEN_RE = re.compile(r"[a-z0-9]+(?:-[a-z0-9]+)*")
+
+# Canonical makes and their common models, spelled as they are displayed
+MODELS = {
+    'acura': ('ILX', 'Integra', 'MDX', 'RDX', 'TLX', 'TSX'),
+    'audi': ('A3', 'A4', 'A5', 'A6', 'A8', 'Q3', 'Q5', 'Q7', 'Q8', 'e-tron', 'TT', 'R8'),
+    'bentley': ('Bentayga', 'Continental', 'Flying Spur'),
+    'bmw': ('2 Series', '3 Series', '4 Series', '5 Series', '7 Series', 'X1', 'X3', 'X5', 'X7', 'i3', 'i4', 'iX', 'M3', 'M5'),
+    'buick': ('Enclave', 'Encore', 'Envision', 'LaCrosse', 'Regal'),
+    'cadillac': ('ATS', 'CT4', 'CT5', 'CTS', 'Escalade', 'XT4', 'XT5', 'XT6'),
+    'chevrolet': ('Blazer', 'Bolt', 'Camaro', 'Colorado', 'Corvette', 'Cruze', 'Equinox', 'Impala', 'Malibu',
+                  'Silverado', 'Sonic', 'Spark', 'Suburban', 'Tahoe', 'Traverse', 'Trax'),
+    'chrysler': ('200', '300', 'Pacifica', 'Town & Country', 'Voyager'),
+    'dodge': ('Challenger', 'Charger', 'Durango', 'Grand Caravan', 'Journey', 'Dart'),
+    'ferrari': ('488', 'F8', 'Portofino', 'Roma', 'SF90'),
+    'ford': ('Bronco', 'EcoSport', 'Edge', 'Escape', 'Expedition', 'Explorer', 'F-150', 'F-250', 'Fiesta',
+             'Focus', 'Fusion', 'Maverick', 'Mustang', 'Mustang Mach-E', 'Ranger', 'Transit'),
+    'genesis': ('G70', 'G80', 'G90', 'GV70', 'GV80'),
+    'gmc': ('Acadia', 'Canyon', 'Sierra', 'Terrain', 'Yukon'),
+    'honda': ('Accord', 'Civic', 'CR-V', 'Element', 'Fit', 'HR-V', 'Insight', 'Odyssey', 'Passport', 'Pilot',
+              'Ridgeline'),
+    'hyundai': ('Elantra', 'Ioniq', 'Ioniq 5', 'Kona', 'Palisade', 'Santa Fe', 'Sonata', 'Tucson', 'Veloster'),
+    'infiniti': ('Q50', 'Q60', 'QX50', 'QX60', 'QX80'),
+    'jeep': ('Cherokee', 'Compass', 'Gladiator', 'Grand Cherokee', 'Renegade', 'Wrangler', 'Patriot'),
+    'kia': ('Forte', 'K5', 'Niro', 'Optima', 'Rio', 'Sorento', 'Soul', 'Sportage', 'Stinger', 'Telluride', 'EV6'),
+    'lamborghini': ('Aventador', 'Huracan', 'Urus'),
+    'lexus': ('ES', 'GX', 'IS', 'LS', 'LX', 'NX', 'RX', 'UX'),
+    'lincoln': ('Aviator', 'Corsair', 'MKZ', 'Nautilus', 'Navigator'),
+    'maserati': ('Ghibli', 'Levante', 'Quattroporte'),
+    'mazda': ('CX-3', 'CX-30', 'CX-5', 'CX-50', 'CX-9', 'Mazda3', 'Mazda6', 'MX-5 Miata'),
+    'mercedes-benz': ('A-Class', 'C-Class', 'E-Class', 'S-Class', 'CLA', 'GLA', 'GLC', 'GLE', 'GLS', 'G-Class',
+                      'Sprinter'),
+    'nissan': ('Altima', 'Armada', 'Frontier', 'Kicks', 'Leaf', 'Maxima', 'Murano', 'Pathfinder', 'Rogue',
+               'Sentra', 'Titan', 'Versa'),
+    'porsche': ('911', 'Cayenne', 'Macan', 'Panamera', 'Taycan', 'Boxster', 'Cayman'),
+    'ram': ('1500', '2500', '3500', 'ProMaster'),
+    'rolls-royce': ('Cullinan', 'Ghost', 'Phantom', 'Wraith'),
+    'saab': ('9-3', '9-5'),
+    'subaru': ('Ascent', 'BRZ', 'Crosstrek', 'Forester', 'Impreza', 'Legacy', 'Outback', 'WRX'),
+    'tesla': ('Model 3', 'Model S', 'Model X', 'Model Y', 'Cybertruck'),
+    'toyota': ('4Runner', 'Avalon', 'C-HR', 'Camry', 'Corolla', 'GR86', 'Highlander', 'Prius', 'RAV4',
+               'Sequoia', 'Sienna', 'Supra', 'Tacoma', 'Tundra', 'Venza'),
+    'volkswagen': ('Atlas', 'Beetle', 'Golf', 'GTI', 'ID.4', 'Jetta', 'Passat', 'Taos', 'Tiguan'),
+    'volvo': ('S60', 'S90', 'V60', 'XC40', 'XC60', 'XC90'),
+}
+
+MAKE_ALIASES = {
+    'chevy': 'chevrolet',
+    'vw': 'volkswagen',
+    'mercedes': 'mercedes-benz',
+    'mercedes benz': 'mercedes-benz',
+    'benz': 'mercedes-benz',
+    'rolls royce': 'rolls-royce',
+}
+
+# Spellings people type that differ from the catalog, as (make, display model)
+MODEL_ALIASES = {
+    'crv': ('honda', 'CR-V'),
+    'hrv': ('honda', 'HR-V'),
+    'f150': ('ford', 'F-150'),
+    'f 150': ('ford', 'F-150'),
+    'f250': ('ford', 'F-250'),
+    'rav 4': ('toyota', 'RAV4'),
+    'chr': ('toyota', 'C-HR'),
+    'cx5': ('mazda', 'CX-5'),
+    'cx9': ('mazda', 'CX-9'),
+    'miata': ('mazda', 'MX-5 Miata'),
+    'mazda 3': ('mazda', 'Mazda3'),
+    'mazda 6': ('mazda', 'Mazda6'),
+    'model3': ('tesla', 'Model 3'),
+    'c class': ('mercedes-benz', 'C-Class'),
+    'e class': ('mercedes-benz', 'E-Class'),
+    's class': ('mercedes-benz', 'S-Class'),
+    'id4': ('volkswagen', 'ID.4'),
+    'etron': ('audi', 'e-tron'),
+}
+
+# Model names that are also everyday words (or bare numbers) only count next to their make
+AMBIGUOUS_MODELS = frozenset({
+    'fit', 'pilot', 'passport', 'element', 'insight', 'edge', 'escape', 'focus', 'ranger', 'transit',
+    'soul', 'compass', 'journey', 'spark', 'leaf', 'golf', 'atlas', 'ghost', 'phantom', 'legacy',
+    'ascent', 'kicks', 'rogue', 'titan', 'sonic', 'charger', 'voyager', 'continental', 'regal',
+    'es', 'is', 'ls', 'lx', 'gx', 'nx', 'rx', 'ux', 'gti', 'k5', 'i3', 'i4', 'ix', 'tt',
+    '200', '300', '488', '911', '1500', '2500', '3500', '9-3', '9-5',
+})
+
+# Display spellings for makes that .title() gets wrong
+MAKE_DISPLAY = {'bmw': 'BMW', 'gmc': 'GMC'}
+
+_TERMINAL = None
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_RE.findall(text.lower().replace('&', 'and').replace('.', ''))
+
+
+def model_slug(display: str) -> str:
+    """'Grand Cherokee' -> 'grand-cherokee'; the canonical model value used everywhere"""
+    return '-'.join(tokenize(display))
+
+
+DISPLAY_NAMES = {model_slug(model): model for models in MODELS.values() for model in models}
+
+
+def display_make(make: str) -> str:
+    return MAKE_DISPLAY.get(make, make.title())
+
+
+def display_model(model: str) -> str:
+    return DISPLAY_NAMES.get(model, model.title())
+
+
+def catalog_phrases() -> Iterator[Tuple[List[str], tuple]]:
+    """Every make and model spelling as (tokens, entry).
+
+    Entries are ('make', make) or ('model', make, model_slug, ambiguous).
+    """
+    for make in MODELS:
+        yield tokenize(make), ('make', sys.intern(make))
+        yield tokenize(make.replace('-', ' ')), ('make', sys.intern(make))
+        for model in MODELS[make]:
+            slug = sys.intern(model_slug(model))
+            yield tokenize(model), ('model', sys.intern(make), slug, slug in AMBIGUOUS_MODELS)
+    for alias, make in MAKE_ALIASES.items():
+        yield tokenize(alias), ('make', sys.intern(make))
+    for alias, (make, model) in MODEL_ALIASES.items():
+        slug = sys.intern(model_slug(model))
+        yield tokenize(alias), ('model', sys.intern(make), slug, slug in AMBIGUOUS_MODELS)
+
+
+def _build_trie() -> Dict:
+    trie = {}
+    for tokens, entry in catalog_phrases():
+        node = trie
+        for token in tokens:
+            node = node.setdefault(token, {})
+        node.setdefault(_TERMINAL, []).append(entry)
+    return trie
+
+
+TRIE = _build_trie()
+
+
+def scan(tokens: List[str]) -> List[Tuple[int, int, List[tuple]]]:
+    """Longest catalog phrases in the tokens, left to right, as (start, end, entries)"""
+    mentions = []
+    i = 0
+    while i < len(tokens):
+        node = TRIE
+        best = None
+        j = i
+        while j < len(tokens) and tokens[j] in node:
+            node = node[tokens[j]]
+            j += 1
+            if _TERMINAL in node:
+                best = (j, node[_TERMINAL])
+        if best:
+            mentions.append((i, best[0], best[1]))
+            i = best[0]
+        else:
+            i += 1
+    return mentions
+
+
+class VehicleMatch:
+    """Make and model found in a piece of text"""
+
+    __slots__ = ('make', 'model', 'model_known', 'make_implied', 'makes', 'make_end')
+
+    def __init__(self, make: Optional[str] = None, model: Optional[str] = None, model_known: bool = False,
+                 make_implied: bool = False, makes: FrozenSet[str] = frozenset(), make_end: int = -1):
+        self.make = make
+        self.model = model
+        self.model_known = model_known
+        self.make_implied = make_implied
+        self.makes = makes
+        self.make_end = make_end
+
+
+def find_vehicle(tokens: List[str]) -> VehicleMatch:
+    """Resolve the make and catalog model mentioned in tokenized text.
+
+    The first make named wins, and its model is looked up anywhere in the text.
+    Without a make, an unambiguous model name implies it ('civic' -> honda).
+    ``makes`` holds every make mentioned or implied, to spot comparisons.
+    """
+    return resolve_vehicle(scan(tokens))
+
+
+def resolve_vehicle(mentions: List[Tuple[int, int, List[tuple]]]) -> VehicleMatch:
+    """find_vehicle over mentions already found by scan() or an equivalent matcher"""
+    make = None
+    make_end = -1
+    makes = set()
+
+    for start, end, entries in mentions:
+        for entry in entries:
+            if entry[0] == 'make':
+                makes.add(entry[1])
+                if make is None:
+                    make, make_end = entry[1], end
+
+    for start, end, entries in mentions:
+        models = [entry for entry in entries if entry[0] == 'model']
+        if make is not None:
+            for entry in models:
+                if entry[1] == make:
+                    return VehicleMatch(make, entry[2], True, False, frozenset(makes), make_end)
+        else:
+            candidates = [entry for entry in models if not entry[3]]
+            if len(candidates) == 1:
+                makes.update(entry[1] for start, end, entries in mentions for entry in entries
+                             if entry[0] == 'model' and not entry[3])
+                return VehicleMatch(candidates[0][1], candidates[0][2], True, True, frozenset(makes), end)
+
+    return VehicleMatch(make, None, False, False, frozenset(makes), make_end)